@@ -0,0 +1,273 @@
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import unquote_to_bytes
+
+
+class Artifact:
+    """A stored blob plus the metadata needed to serve it"""
+
+    def __init__(self, artifact_id: str, data: bytes, content_type: str, stored_at: float):
+        self.id = artifact_id
+        self.data = data
+        self.content_type = content_type
+        self.stored_at = stored_at
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.id}"'
+
+
+def is_servable_image(content_type: str) -> bool:
+    """Raster image types only: artifacts are served from the API origin, and SVG can carry script"""
+    return content_type.startswith("image/") and not content_type.startswith("image/svg")
+
+
+def parse_data_uri(uri: str) -> Optional[Tuple[bytes, str]]:
+    """Decode a data: URI into (bytes, content type); None if it is malformed"""
+    if not uri.startswith("data:") or "," not in uri:
+        return None
+    header, payload = uri[5:].split(",", 1)
+    params = header.split(";")
+    content_type = (params[0] or "text/plain").strip().lower()
+    try:
+        if "base64" in params[1:]:
+            return base64.b64decode(payload), content_type
+        return unquote_to_bytes(payload), content_type
+    except (ValueError, TypeError):
+        return None
+
+
+class ArtifactStore:
+    """Content-addressed blob store for scrape artifacts (screenshots, inline images).
+
+    Blobs are keyed by the sha256 of their bytes, so storing the same image
+    twice is free, and the id doubles as a strong ETag. Blobs live on disk
+    when `directory` is set, otherwise in a size-bounded in-memory LRU; either
+    way they expire after `ttl_seconds`. The directory is capped at
+    `max_disk_bytes`, tracked by an in-memory index of blob sizes and ages
+    built once at startup: a write that takes the total over the cap drops
+    expired blobs, then the oldest, down to `DISK_LOW_WATER` of the cap.
+    """
+
+    # Evicting below the cap leaves headroom, so a full store does not sweep on every write
+    DISK_LOW_WATER = 0.9
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        base_url: str = "",
+        ttl_seconds: float = 24 * 3600,
+        max_memory_bytes: int = 256 * 1024 * 1024,
+        max_disk_bytes: int = 1024 * 1024 * 1024
+    ):
+        self.directory = directory
+        self.base_url = base_url.rstrip("/")
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, Artifact]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_lock = asyncio.Lock()
+        # Artifact id -> (stored_at, size) for every blob on disk
+        self._disk_index: Dict[str, Tuple[float, int]] = {}
+        self._disk_bytes = 0
+        self._index_lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            # Blobs left behind by earlier runs count against the cap from the start
+            self._load_disk_index()
+            self._sweep_disk()
+
+    @classmethod
+    def from_env(cls) -> "ArtifactStore":
+        return cls(
+            directory=os.getenv("ARTIFACT_DIR", ".cache/artifacts") or None,
+            base_url=os.getenv("PUBLIC_BASE_URL", "http://localhost:8000"),
+            ttl_seconds=float(os.getenv("ARTIFACT_TTL_SECONDS", str(24 * 3600))),
+            max_memory_bytes=int(os.getenv("ARTIFACT_MEMORY_MB", "256")) * 1024 * 1024,
+            max_disk_bytes=int(os.getenv("ARTIFACT_DISK_MB", "1024")) * 1024 * 1024
+        )
+
+    def url_for(self, artifact_id: str) -> str:
+        return f"{self.base_url}/artifacts/{artifact_id}"
+
+    async def put(self, data: bytes, content_type: str) -> str:
+        artifact_id = hashlib.sha256(data).hexdigest()
+        artifact = Artifact(artifact_id, data, content_type, time.time())
+        if self.directory:
+            async with self._disk_lock:
+                await asyncio.to_thread(self._write_disk, artifact)
+        else:
+            self._remember(artifact)
+        return artifact_id
+
+    async def get(self, artifact_id: str) -> Optional[Artifact]:
+        if not artifact_id.isalnum():
+            return None
+        if self.directory:
+            return await asyncio.to_thread(self._read_disk, artifact_id)
+        artifact = self._memory.get(artifact_id)
+        if artifact is None:
+            return None
+        if not self._fresh(artifact.stored_at):
+            self._forget(artifact_id)
+            return None
+        self._memory.move_to_end(artifact_id)
+        return artifact
+
+    async def exists(self, artifact_id: str) -> bool:
+        """Whether a fresh blob is stored, without reading it or touching the LRU order"""
+        if not artifact_id.isalnum():
+            return False
+        if self.directory:
+            entry = self._disk_index.get(artifact_id)
+            return entry is not None and self._fresh(entry[0])
+        artifact = self._memory.get(artifact_id)
+        return artifact is not None and self._fresh(artifact.stored_at)
+
+    async def put_data_uri(self, uri: str) -> Optional[str]:
+        """Store the payload of a data: URI; returns its artifact URL.
+
+        Anything but a raster image (HTML, SVG, script...) is refused and
+        returns None, so scraped markup is never served back from our origin.
+        """
+        decoded = parse_data_uri(uri)
+        if decoded is None or not is_servable_image(decoded[1]):
+            return None
+        return self.url_for(await self.put(*decoded))
+
+    async def externalize_screenshot(self, encoded: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """Move an encoded screenshot's image data into the store.
+
+        Returns the primary image URL and the metadata with every tile and
+        thumbnail `data` field replaced by a `url`.
+        """
+        mime_type = encoded["mime_type"]
+        info = {key: value for key, value in encoded.items() if key not in ("data", "tiles", "thumbnail")}
+        artifact_id = await self.put(base64.b64decode(encoded["data"]), mime_type)
+        info["artifact_id"] = artifact_id
+
+        info["tiles"] = []
+        for tile in encoded.get("tiles", []):
+            tile_info = {key: value for key, value in tile.items() if key != "data"}
+            tile_info["url"] = self.url_for(await self.put(base64.b64decode(tile["data"]), mime_type))
+            info["tiles"].append(tile_info)
+
+        thumbnail = encoded.get("thumbnail")
+        if thumbnail:
+            info["thumbnail"] = {key: value for key, value in thumbnail.items() if key != "data"}
+            info["thumbnail"]["url"] = self.url_for(await self.put(base64.b64decode(thumbnail["data"]), mime_type))
+
+        return self.url_for(artifact_id), info
+
+    def _fresh(self, stored_at: float) -> bool:
+        return time.time() - stored_at < self.ttl_seconds
+
+    def _remember(self, artifact: Artifact):
+        self._forget(artifact.id)
+        self._memory[artifact.id] = artifact
+        self._memory_bytes += len(artifact.data)
+        while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+            self._forget(next(iter(self._memory)))
+
+    def _forget(self, artifact_id: str):
+        artifact = self._memory.pop(artifact_id, None)
+        if artifact is not None:
+            self._memory_bytes -= len(artifact.data)
+
+    def _paths(self, artifact_id: str) -> Tuple[str, str]:
+        base = os.path.join(self.directory, artifact_id)
+        return base + ".bin", base + ".json"
+
+    def _write_disk(self, artifact: Artifact):
+        data_path, meta_path = self._paths(artifact.id)
+        if not os.path.exists(data_path):
+            tmp_path = data_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(artifact.data)
+            os.replace(tmp_path, data_path)
+        # Rewriting the metadata refreshes the TTL of a re-stored blob
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump({"content_type": artifact.content_type, "stored_at": artifact.stored_at}, f)
+        with self._index_lock:
+            self._index_add(artifact.id, artifact.stored_at, len(artifact.data))
+            over_cap = self._disk_bytes > self.max_disk_bytes
+        if over_cap:
+            self._sweep_disk()
+
+    def _load_disk_index(self):
+        """Index the blobs already on disk; the metadata file's mtime is the blob's stored_at"""
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            data_path, meta_path = self._paths(name[:-5])
+            try:
+                stored_at = os.stat(meta_path).st_mtime
+                size = os.stat(data_path).st_size
+            except OSError:
+                continue
+            self._index_add(name[:-5], stored_at, size)
+
+    def _sweep_disk(self):
+        """Drop expired blobs, then the oldest ones, until the directory is under the low-water mark"""
+        target = self.max_disk_bytes * self.DISK_LOW_WATER
+        with self._index_lock:
+            expired = [artifact_id for artifact_id, (stored_at, _) in self._disk_index.items() if not self._fresh(stored_at)]
+            oldest = sorted(
+                (stored_at, artifact_id) for artifact_id, (stored_at, _) in self._disk_index.items()
+                if self._fresh(stored_at)
+            )
+            victims = expired
+            total = self._disk_bytes - sum(self._disk_index[artifact_id][1] for artifact_id in expired)
+            for _, artifact_id in oldest:
+                if total <= target:
+                    break
+                victims.append(artifact_id)
+                total -= self._disk_index[artifact_id][1]
+            for artifact_id in victims:
+                self._index_remove(artifact_id)
+        for artifact_id in victims:
+            self._remove_files(artifact_id)
+
+    def _index_add(self, artifact_id: str, stored_at: float, size: int):
+        self._index_remove(artifact_id)
+        self._disk_index[artifact_id] = (stored_at, size)
+        self._disk_bytes += size
+
+    def _index_remove(self, artifact_id: str):
+        entry = self._disk_index.pop(artifact_id, None)
+        if entry is not None:
+            self._disk_bytes -= entry[1]
+
+    def _remove_disk(self, artifact_id: str):
+        with self._index_lock:
+            self._index_remove(artifact_id)
+        self._remove_files(artifact_id)
+
+    def _remove_files(self, artifact_id: str):
+        for path in self._paths(artifact_id):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _read_disk(self, artifact_id: str) -> Optional[Artifact]:
+        data_path, meta_path = self._paths(artifact_id)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if not self._fresh(meta["stored_at"]):
+                self._remove_disk(artifact_id)
+                return None
+            with open(data_path, "rb") as f:
+                data = f.read()
+        except (OSError, ValueError, KeyError):
+            return None
+        return Artifact(artifact_id, data, meta["content_type"], meta["stored_at"])
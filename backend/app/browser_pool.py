@@ -0,0 +1,182 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from playwright.async_api import async_playwright, Browser, BrowserContext, Playwright
+
+from .metrics import span
+
+DEFAULT_LAUNCH_ARGS = [
+    '--disable-blink-features=AutomationControlled',
+    '--disable-dev-shm-usage',
+    '--no-sandbox',
+    '--disable-setuid-sandbox',
+    '--disable-web-security',
+    '--disable-features=VizDisplayCompositor'
+]
+
+
+class BrowserPool:
+    """Process-wide warm Chromium that hands out isolated contexts per request.
+
+    A single browser is kept running and every caller gets its own
+    BrowserContext, so requests stay isolated without paying for a launch.
+    The browser is recycled after `recycle_after` contexts, or as soon as it
+    crashes or disconnects. A retired browser is closed once its last context
+    has been released.
+    """
+
+    def __init__(
+        self,
+        max_contexts: int = 4,
+        recycle_after: int = 50,
+        headless: bool = True,
+        launch_args: Optional[List[str]] = None
+    ):
+        self.max_contexts = max_contexts
+        self.recycle_after = recycle_after
+        self.headless = headless
+        self.launch_args = launch_args if launch_args is not None else list(DEFAULT_LAUNCH_ARGS)
+
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._browser_uses = 0
+        self._active: Dict[Browser, int] = {}
+        self._retired: set = set()
+        self._semaphore = asyncio.Semaphore(max_contexts)
+        self._lock = asyncio.Lock()
+        self._closed = False
+
+    @classmethod
+    def from_env(cls) -> "BrowserPool":
+        return cls(
+            max_contexts=int(os.getenv("BROWSER_POOL_MAX_CONTEXTS", "4")),
+            recycle_after=int(os.getenv("BROWSER_POOL_RECYCLE_AFTER", "50")),
+            headless=os.getenv("BROWSER_POOL_HEADLESS", "true").lower() != "false"
+        )
+
+    @property
+    def started(self) -> bool:
+        return self._playwright is not None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_contexts": self.max_contexts,
+            "active_contexts": sum(self._active.values()),
+            "browsers": len(self._active),
+            "current_browser_uses": self._browser_uses,
+            "recycle_after": self.recycle_after
+        }
+
+    async def start(self):
+        """Start Playwright and launch the first browser"""
+        async with self._lock:
+            self._closed = False
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            if self._browser is None:
+                await self._launch()
+        print(f"✅ Browser pool ready (max {self.max_contexts} contexts)")
+
+    async def stop(self):
+        """Close every browser and stop Playwright"""
+        async with self._lock:
+            self._closed = True
+            browsers = list(self._active.keys())
+            self._browser = None
+            self._active.clear()
+            self._retired.clear()
+            for browser in browsers:
+                await self._close_browser(browser)
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+        print("🛑 Browser pool stopped")
+
+    @asynccontextmanager
+    async def context(self, **context_options) -> AsyncIterator[BrowserContext]:
+        """Borrow a fresh BrowserContext; it is closed when the block exits"""
+        async with self._semaphore:
+            browser, context = await self._acquire(context_options)
+            try:
+                yield context
+            finally:
+                await self._release(browser, context)
+
+    async def _acquire(self, context_options: Dict[str, Any]):
+        async with self._lock:
+            if self._closed:
+                raise RuntimeError("Browser pool is stopped")
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            if self._browser is None or not self._browser.is_connected():
+                await self._launch()
+            elif self._browser_uses >= self.recycle_after:
+                print(f"♻️ Recycling browser after {self._browser_uses} contexts")
+                await self._retire(self._browser)
+                await self._launch()
+
+            browser = self._browser
+            self._browser_uses += 1
+            self._active[browser] = self._active.get(browser, 0) + 1
+
+        try:
+            context = await browser.new_context(**context_options)
+        except Exception:
+            # A browser that cannot open a context is treated as crashed
+            async with self._lock:
+                self._active[browser] -= 1
+                await self._retire(browser)
+            raise
+        return browser, context
+
+    async def _release(self, browser: Browser, context: BrowserContext):
+        try:
+            await context.close()
+        except Exception as e:
+            print("⚠️ Context close failed:", str(e))
+
+        async with self._lock:
+            if browser not in self._active:
+                return
+            self._active[browser] -= 1
+            if browser in self._retired and self._active[browser] <= 0:
+                await self._drop(browser)
+
+    async def _launch(self):
+        with span("browser_launch"):
+            browser = await self._playwright.chromium.launch(
+                headless=self.headless,
+                args=self.launch_args
+            )
+        browser.on("disconnected", lambda b: self._on_disconnected(b))
+        self._browser = browser
+        self._browser_uses = 0
+        self._active.setdefault(browser, 0)
+        print("🚀 Launched pooled Chromium")
+
+    def _on_disconnected(self, browser: Browser):
+        if browser is self._browser:
+            print("💥 Pooled browser disconnected, will relaunch on next request")
+            self._browser = None
+        self._retired.add(browser)
+
+    async def _retire(self, browser: Browser):
+        if browser is self._browser:
+            self._browser = None
+        self._retired.add(browser)
+        if self._active.get(browser, 0) <= 0:
+            await self._drop(browser)
+
+    async def _drop(self, browser: Browser):
+        self._active.pop(browser, None)
+        self._retired.discard(browser)
+        await self._close_browser(browser)
+
+    async def _close_browser(self, browser: Browser):
+        try:
+            if browser.is_connected():
+                await browser.close()
+        except Exception as e:
+            print("⚠️ Browser close failed:", str(e))
@@ -0,0 +1,276 @@
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a URL for cache keys: lowercase host, no fragment or default port, sorted query"""
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or "https").lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    path = parts.path or "/"
+    if len(path) > 1 and path.endswith("/"):
+        path = path.rstrip("/")
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def make_cache_key(payload: Dict[str, Any]) -> str:
+    """Stable sha256 over a JSON-serializable payload"""
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class TieredCache:
+    """In-memory LRU in front of an optional on-disk JSON store.
+
+    Both tiers expire entries after `ttl_seconds`. The memory tier is bounded
+    by entry count and approximate byte size; the disk tier by total bytes,
+    evicting least recently used files first.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        ttl_seconds: float = 3600,
+        max_memory_entries: int = 64,
+        max_memory_bytes: int = 256 * 1024 * 1024,
+        max_disk_bytes: int = 512 * 1024 * 1024
+    ):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+
+        self._memory: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._memory_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._disk_lock = asyncio.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    async def get(self, key: str, count: bool = True) -> Optional[Any]:
+        value, _ = await self.get_with_age(key, count=count)
+        return value
+
+    async def get_with_age(
+        self,
+        key: str,
+        max_stale_seconds: float = 0,
+        count: bool = True
+    ) -> Tuple[Optional[Any], float]:
+        """Return (value, age in seconds); entries up to `max_stale_seconds` past the TTL still count.
+
+        With `count=False` the lookup leaves the hit/miss counters alone, for
+        callers that try several keys and call `record_lookup` once.
+        """
+        entry = self._memory.get(key)
+        if entry is not None:
+            stored_at, _, value = entry
+            if self._fresh(stored_at, max_stale_seconds):
+                self._memory.move_to_end(key)
+                if count:
+                    self.record_lookup(True)
+                return copy.deepcopy(value), time.time() - stored_at
+            self._forget(key)
+
+        record = None
+        if self.directory:
+            record = await asyncio.to_thread(self._read_disk, key, max_stale_seconds)
+        if record is None:
+            if count:
+                self.record_lookup(False)
+            return None, 0.0
+        stored_at, value = record
+        self._remember(key, value, stored_at)
+        if count:
+            self.record_lookup(True)
+        return copy.deepcopy(value), time.time() - stored_at
+
+    def record_lookup(self, hit: bool):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes
+        }
+
+    async def set(self, key: str, value: Any):
+        stored_at = time.time()
+        size = self._remember(key, copy.deepcopy(value), stored_at)
+        if self.directory and size <= self.max_disk_bytes:
+            async with self._disk_lock:
+                await asyncio.to_thread(self._write_disk, key, value, stored_at)
+
+    async def delete(self, key: str):
+        self._forget(key)
+        if self.directory:
+            path = self._path(key)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _fresh(self, stored_at: float, grace_seconds: float = 0) -> bool:
+        return time.time() - stored_at < self.ttl_seconds + grace_seconds
+
+    def _remember(self, key: str, value: Any, stored_at: float) -> int:
+        size = len(json.dumps(value, default=str))
+        self._forget(key)
+        if size > self.max_memory_bytes:
+            return size
+        self._memory[key] = (stored_at, size, value)
+        self._memory_bytes += size
+        while self._memory and (
+            len(self._memory) > self.max_memory_entries or self._memory_bytes > self.max_memory_bytes
+        ):
+            oldest = next(iter(self._memory))
+            self._forget(oldest)
+        return size
+
+    def _forget(self, key: str):
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_bytes -= entry[1]
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".json")
+
+    def _read_disk(self, key: str, grace_seconds: float = 0) -> Optional[Tuple[float, Any]]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not self._fresh(record.get("stored_at", 0), grace_seconds):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        # Touch so disk eviction is least-recently-used rather than oldest-written
+        os.utime(path, None)
+        return record["stored_at"], record["value"]
+
+    def _write_disk(self, key: str, value: Any, stored_at: float):
+        path = self._path(key)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"stored_at": stored_at, "value": value}, f, default=str)
+        os.replace(tmp_path, path)
+        self._evict_disk()
+
+    def _evict_disk(self):
+        files = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        files.sort()
+        for _, size, path in files:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+
+class ScrapeCache(TieredCache):
+    """Cache of scrape results keyed by normalized URL plus scrape options"""
+
+    @classmethod
+    def from_env(cls) -> "ScrapeCache":
+        return cls(
+            directory=os.getenv("SCRAPE_CACHE_DIR", ".cache/scrape") or None,
+            ttl_seconds=float(os.getenv("SCRAPE_CACHE_TTL_SECONDS", "3600")),
+            max_memory_entries=int(os.getenv("SCRAPE_CACHE_MEMORY_ENTRIES", "64")),
+            max_disk_bytes=int(os.getenv("SCRAPE_CACHE_DISK_MB", "512")) * 1024 * 1024
+        )
+
+    @staticmethod
+    def key_for(url: str, **options) -> str:
+        return make_cache_key({"url": normalize_url(url), "options": options})
+
+
+class GenerationCache(TieredCache):
+    """Cache of generated HTML keyed by a hash of model, prompt and sampling parameters.
+
+    With `stale_seconds` > 0, an entry that has outlived its TTL is still
+    served for that long while a background task regenerates it
+    (stale-while-revalidate).
+    """
+
+    def __init__(self, stale_seconds: float = 0, **kwargs):
+        super().__init__(**kwargs)
+        self.stale_seconds = stale_seconds
+        self.stale_hits = 0
+        self._refreshing: Dict[str, asyncio.Task] = {}
+
+    @classmethod
+    def from_env(cls) -> "GenerationCache":
+        return cls(
+            directory=os.getenv("GENERATION_CACHE_DIR", ".cache/generation") or None,
+            ttl_seconds=float(os.getenv("GENERATION_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+            stale_seconds=float(os.getenv("GENERATION_CACHE_STALE_SECONDS", "0")),
+            max_memory_entries=int(os.getenv("GENERATION_CACHE_MEMORY_ENTRIES", "256")),
+            max_disk_bytes=int(os.getenv("GENERATION_CACHE_DISK_MB", "256")) * 1024 * 1024
+        )
+
+    @staticmethod
+    def key_for(params: Dict[str, Any]) -> str:
+        """Key on everything sent to the model (model, messages, max_tokens, temperature...)"""
+        return make_cache_key(params)
+
+    async def get_or_generate(self, key: str, generate: Callable[[], Awaitable[Any]]) -> Any:
+        value, age = await self.get_with_age(key, self.stale_seconds)
+        if value is None:
+            value = await generate()
+            await self.set(key, value)
+            return value
+
+        if age >= self.ttl_seconds and key not in self._refreshing:
+            self.stale_hits += 1
+            self._refreshing[key] = asyncio.create_task(self._revalidate(key, generate))
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats["stale_hits"] = self.stale_hits
+        stats["revalidating"] = len(self._refreshing)
+        return stats
+
+    async def _revalidate(self, key: str, generate: Callable[[], Awaitable[Any]]):
+        try:
+            await self.set(key, await generate())
+        except Exception as e:
+            print("⚠️ Background regeneration failed:", str(e))
+        finally:
+            self._refreshing.pop(key, None)
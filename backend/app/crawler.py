@@ -0,0 +1,249 @@
+import asyncio
+import hashlib
+import os
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urldefrag, urljoin, urlsplit
+from urllib.robotparser import RobotFileParser
+
+from playwright.async_api import BrowserContext, Page
+
+from .cache import normalize_url
+from .prompt_builder import image_dedupe_key
+
+# Links to these are downloads, not pages
+_SKIP_EXTENSIONS = (
+    ".pdf", ".zip", ".gz", ".dmg", ".exe", ".jpg", ".jpeg", ".png", ".gif", ".webp",
+    ".svg", ".mp4", ".webm", ".mp3", ".xml", ".json", ".csv"
+)
+
+PageScraper = Callable[[Page, str], Awaitable[Dict[str, Any]]]
+
+
+def origin_of(url: str) -> Tuple[str, str]:
+    parts = urlsplit(normalize_url(url))
+    return parts.scheme, parts.netloc
+
+
+def crawlable_link(base_url: str, href: str) -> Optional[str]:
+    """Absolute URL for a same-origin page link, or None for anything else"""
+    if not href or href.startswith(("#", "mailto:", "tel:", "javascript:")):
+        return None
+    url, _ = urldefrag(urljoin(base_url, href))
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or parts.path.lower().endswith(_SKIP_EXTENSIONS):
+        return None
+    if origin_of(url) != origin_of(base_url):
+        return None
+    return url
+
+
+class AssetIndex:
+    """Images seen across a crawl, one entry per asset however many pages use it"""
+
+    def __init__(self):
+        self.assets: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, page_url: str, images: List[Dict[str, Any]]) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """Register a page's images; returns the asset ids it uses and the assets first seen on it"""
+        ids: List[str] = []
+        new: List[Dict[str, Any]] = []
+        for img in images:
+            asset_id = hashlib.sha1(image_dedupe_key(img.get("src", "")).encode()).hexdigest()[:16]
+            asset = self.assets.get(asset_id)
+            if asset is None:
+                asset = {**img, "id": asset_id, "pages": []}
+                self.assets[asset_id] = asset
+                new.append(asset)
+            if page_url not in asset["pages"]:
+                asset["pages"].append(page_url)
+            if asset_id not in ids:
+                ids.append(asset_id)
+        return ids, new
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "assets": len(self.assets),
+            "shared": sum(1 for asset in self.assets.values() if len(asset["pages"]) > 1)
+        }
+
+
+class SiteCrawler:
+    """Breadth-first crawl of one site, following same-origin navigation links.
+
+    Pages are scraped by a bounded pool of tabs in a single browser context,
+    so they share its HTTP cache and cookies. Each tab is reused for page
+    after page. The crawl stops at `max_pages` pages or `max_depth` link hops
+    from the start URL, and skips paths robots.txt disallows for our user
+    agent. Images are indexed across pages, so an asset used site-wide (logo,
+    icons) is described once.
+    """
+
+    def __init__(
+        self,
+        scrape_page: PageScraper,
+        max_pages: int = 10,
+        max_depth: int = 2,
+        concurrency: int = 3,
+        respect_robots: bool = True,
+        user_agent: str = "*"
+    ):
+        self.scrape_page = scrape_page
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.concurrency = concurrency
+        self.respect_robots = respect_robots
+        self.user_agent = user_agent
+
+    @classmethod
+    def from_env(
+        cls,
+        scrape_page: PageScraper,
+        max_pages: Optional[int] = None,
+        max_depth: Optional[int] = None,
+        **kwargs
+    ) -> "SiteCrawler":
+        """Requested limits are clamped to CRAWL_MAX_PAGES / CRAWL_MAX_DEPTH.
+
+        robots.txt rules are matched for CRAWL_ROBOTS_USER_AGENT (default "*").
+        """
+        kwargs.setdefault("user_agent", os.getenv("CRAWL_ROBOTS_USER_AGENT", "*"))
+        page_cap = int(os.getenv("CRAWL_MAX_PAGES", "10"))
+        depth_cap = int(os.getenv("CRAWL_MAX_DEPTH", "2"))
+        return cls(
+            scrape_page,
+            max_pages=max(1, min(max_pages or page_cap, page_cap)),
+            max_depth=max(0, min(depth_cap if max_depth is None else max_depth, depth_cap)),
+            concurrency=int(os.getenv("CRAWL_CONCURRENCY", "3")),
+            **kwargs
+        )
+
+    async def load_robots(self, context: BrowserContext, start_url: str) -> Optional[RobotFileParser]:
+        """robots.txt for the start URL's origin, fetched through the crawl's own context.
+
+        A missing file (4xx) allows everything; a server error or unreachable
+        host disallows everything, as RFC 9309 asks.
+        """
+        scheme, netloc = origin_of(start_url)
+        parser = RobotFileParser(f"{scheme}://{netloc}/robots.txt")
+        try:
+            response = await context.request.get(parser.url, timeout=10000)
+            if 400 <= response.status < 500:
+                return None
+            if response.status >= 500:
+                parser.disallow_all = True
+            else:
+                parser.parse((await response.text()).splitlines())
+        except Exception as e:
+            print("⚠️ robots.txt unreachable, not crawling:", str(e))
+            parser.disallow_all = True
+        return parser
+
+    async def crawl(self, context: BrowserContext, start_url: str) -> AsyncIterator[Dict[str, Any]]:
+        """Yield one event per page as it finishes, then a summary.
+
+        Events are dicts with an "event" key: "page" (scrape data, or an
+        error), "skipped" (disallowed by robots.txt) and finally "done".
+        """
+        start = time.perf_counter()
+        robots = await self.load_robots(context, start_url) if self.respect_robots else None
+        frontier: asyncio.Queue = asyncio.Queue()
+        events: asyncio.Queue = asyncio.Queue()
+        assets = AssetIndex()
+        seen = set()
+        counts = {"scheduled": 0, "scraped": 0, "failed": 0, "skipped": 0}
+
+        def schedule(url: str, depth: int):
+            key = normalize_url(url)
+            if key in seen or counts["scheduled"] >= self.max_pages:
+                return
+            seen.add(key)
+            if robots is not None and not robots.can_fetch(self.user_agent, url):
+                counts["skipped"] += 1
+                events.put_nowait({"event": "skipped", "url": url, "depth": depth, "reason": "robots.txt"})
+                return
+            counts["scheduled"] += 1
+            frontier.put_nowait((url, depth))
+
+        async def visit(page: Page, url: str, depth: int) -> Dict[str, Any]:
+            page_start = time.perf_counter()
+            try:
+                data = await self.scrape_page(page, url)
+            except Exception as e:
+                data = {"error": str(e)}
+            elapsed_ms = round((time.perf_counter() - page_start) * 1000, 1)
+            if "error" in data:
+                counts["failed"] += 1
+                return {"event": "page", "url": url, "depth": depth, "error": data["error"], "elapsed_ms": elapsed_ms}
+
+            counts["scraped"] += 1
+            links = []
+            # A redirect off the start origin must not widen the crawl to the new site
+            final_url = data.get("url") or url
+            if depth < self.max_depth and origin_of(final_url) == origin_of(start_url):
+                for nav in data.get("navigation", []):
+                    link = crawlable_link(start_url, urljoin(final_url, nav.get("href", "")))
+                    if link:
+                        links.append(link)
+                        schedule(link, depth + 1)
+            asset_ids, new_assets = assets.add(url, data.pop("allImages", []))
+            # The index keeps appending to each asset's pages; emit a snapshot
+            new_assets = [{**asset, "pages": list(asset["pages"])} for asset in new_assets]
+            return {
+                "event": "page",
+                "url": url,
+                "depth": depth,
+                "elapsed_ms": elapsed_ms,
+                "links": links,
+                "asset_ids": asset_ids,
+                "new_assets": new_assets,
+                "data": data
+            }
+
+        async def worker():
+            page = await context.new_page()
+            try:
+                while True:
+                    url, depth = await frontier.get()
+                    try:
+                        if page.is_closed():
+                            page = await context.new_page()
+                        events.put_nowait(await visit(page, url, depth))
+                    finally:
+                        frontier.task_done()
+            finally:
+                if not page.is_closed():
+                    await page.close()
+
+        schedule(start_url, 0)
+        workers = [asyncio.create_task(worker()) for _ in range(max(1, min(self.concurrency, self.max_pages)))]
+        finished = asyncio.create_task(frontier.join())
+        try:
+            # Relay events until every scheduled page has been visited
+            while True:
+                getter = asyncio.ensure_future(events.get())
+                done, _ = await asyncio.wait({getter, finished}, return_when=asyncio.FIRST_COMPLETED)
+                if getter in done:
+                    yield getter.result()
+                else:
+                    getter.cancel()
+                    break
+            while not events.empty():
+                yield events.get_nowait()
+        finally:
+            finished.cancel()
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        yield {
+            "event": "done",
+            "start_url": start_url,
+            "pages_scraped": counts["scraped"],
+            "pages_failed": counts["failed"],
+            "pages_skipped": counts["skipped"],
+            "max_pages": self.max_pages,
+            "max_depth": self.max_depth,
+            "assets": assets.stats(),
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1)
+        }
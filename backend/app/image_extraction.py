@@ -0,0 +1,240 @@
+import re
+from typing import Any, Dict, List, Optional
+
+# One compound selector: optional tag, then any number of .class / [attr] / [attr="v"] / [attr*="v"]
+_COMPOUND_RE = re.compile(r'^(?P<tag>[a-zA-Z][\w-]*)?(?P<rest>(?:\.[\w-]+|\[[^\]]+\])*)$')
+_PART_RE = re.compile(r'\.(?P<cls>[\w-]+)|\[(?P<attr>[\w-]+)(?:(?P<op>\*?=)"(?P<value>[^"]*)")?\]')
+
+
+def _compile_compound(compound: str) -> Optional[Dict[str, Any]]:
+    match = _COMPOUND_RE.match(compound)
+    if not match or not compound:
+        return None
+    spec = {"tag": (match.group("tag") or "").lower() or None, "classes": [], "attrs": []}
+    for part in _PART_RE.finditer(match.group("rest")):
+        if part.group("cls"):
+            spec["classes"].append(part.group("cls"))
+        else:
+            spec["attrs"].append({
+                "name": part.group("attr"),
+                "op": part.group("op"),
+                "value": part.group("value")
+            })
+    return spec
+
+
+def compile_selectors(selectors: List[str]) -> List[Dict[str, Any]]:
+    """Compile CSS selectors into specs the single-pass walker can test without querySelectorAll.
+
+    Supports `compound` and `ancestor compound` forms; anything else is kept
+    as a raw selector and tested with `Element.matches`.
+    """
+    specs = []
+    for selector in selectors:
+        parts = selector.split()
+        compiled = [_compile_compound(p) for p in parts]
+        if len(parts) in (1, 2) and all(compiled):
+            specs.append({
+                "self": compiled[-1],
+                "ancestor": compiled[0] if len(parts) == 2 else None
+            })
+        else:
+            specs.append({"raw": selector})
+    return specs
+
+
+# Single DOM traversal that reproduces the old per-selector querySelectorAll
+# passes: each element records the index of the first selector it matches, so
+# sorting candidates by (selector index, document order) gives the exact order
+# (and therefore the same dedupe winners) the 60 separate passes produced.
+COLLECT_IMAGES_JS = r"""
+function collectImages(selectorSpecs) {
+    function resolveUrl(url) {
+        if (!url) return null;
+        if (url.startsWith('data:')) return url;
+        if (url.startsWith('//')) return 'https:' + url;
+        if (url.startsWith('/')) return window.location.origin + url;
+        if (!url.startsWith('http')) return window.location.origin + '/' + url;
+        return url;
+    }
+
+    function getImageFormat(src) {
+        if (src.startsWith('data:')) {
+            const match = src.match(/data:image\/(\w+)/);
+            return match ? match[1] : 'unknown';
+        }
+        const match = src.match(/\.([a-zA-Z0-9]+)(?:\?|$)/);
+        return match ? match[1].toLowerCase() : 'unknown';
+    }
+
+    function matchCompound(el, c) {
+        if (c.tag && el.localName !== c.tag) return false;
+        for (const cls of c.classes) {
+            if (!el.classList || !el.classList.contains(cls)) return false;
+        }
+        for (const a of c.attrs) {
+            const v = el.getAttribute(a.name);
+            if (v === null) return false;
+            if (a.op === '*=' && (!a.value || !v.includes(a.value))) return false;
+            if (a.op === '=' && v !== a.value) return false;
+        }
+        return true;
+    }
+
+    function matchSpec(el, spec) {
+        if (spec.raw) {
+            try { return el.matches(spec.raw); } catch (e) { return false; }
+        }
+        if (!matchCompound(el, spec.self)) return false;
+        if (!spec.ancestor) return true;
+        for (let p = el.parentElement; p; p = p.parentElement) {
+            if (matchCompound(p, spec.ancestor)) return true;
+        }
+        return false;
+    }
+
+    // Bucket specs by tag so most elements only test a handful of them
+    const byTag = {};
+    const generic = [];
+    selectorSpecs.forEach((spec, index) => {
+        const tag = spec.raw ? null : spec.self.tag;
+        const entry = { index, spec };
+        if (tag) (byTag[tag] = byTag[tag] || []).push(entry);
+        else generic.push(entry);
+    });
+
+    function firstMatch(el) {
+        let best = -1;
+        const tagged = byTag[el.localName];
+        if (tagged) {
+            for (const entry of tagged) {
+                if (matchSpec(el, entry.spec)) { best = entry.index; break; }
+            }
+        }
+        // Untagged compiled specs all need a class or attribute to match
+        const hasAttributes = el.hasAttributes();
+        for (const entry of generic) {
+            if (best !== -1 && entry.index >= best) break;
+            if (!hasAttributes && !entry.spec.raw) continue;
+            if (matchSpec(el, entry.spec)) { best = entry.index; break; }
+        }
+        return best;
+    }
+
+    function describe(el) {
+        let src = null, width = 0, height = 0, alt = '', context = '';
+        if (el.tagName === 'IMG') {
+            src = el.src || el.getAttribute('data-src') ||
+                  el.getAttribute('data-lazy') || el.getAttribute('data-original') ||
+                  el.getAttribute('data-img') || el.getAttribute('data-image');
+            width = el.naturalWidth || el.width || el.offsetWidth || 0;
+            height = el.naturalHeight || el.height || el.offsetHeight || 0;
+            alt = el.alt || el.title || '';
+            context = 'img-element';
+        } else if (el.tagName === 'SOURCE') {
+            src = el.srcset?.split(',')[0]?.trim()?.split(' ')[0] || el.src;
+            width = parseInt(el.getAttribute('width')) || 0;
+            height = parseInt(el.getAttribute('height')) || 0;
+            alt = 'source-element';
+            context = 'source-element';
+        } else if (el.tagName === 'VIDEO') {
+            src = el.poster;
+            width = el.videoWidth || el.width || el.offsetWidth || 0;
+            height = el.videoHeight || el.height || el.offsetHeight || 0;
+            alt = 'video-thumbnail';
+            context = 'video-poster';
+        } else if (el.tagName === 'SVG') {
+            // Inline SVG reports a lowercase tagName in HTML documents, so like
+            // the original script it is normally handled by the data-attribute branch
+            const serializer = new XMLSerializer();
+            const svgString = serializer.serializeToString(el);
+            src = 'data:image/svg+xml;base64,' + btoa(unescape(encodeURIComponent(svgString)));
+            width = el.width?.baseVal?.value || el.offsetWidth || 0;
+            height = el.height?.baseVal?.value || el.offsetHeight || 0;
+            alt = 'svg-image';
+            context = 'svg-element';
+        } else if (el.tagName === 'CANVAS') {
+            src = el.toDataURL();
+            width = el.width || el.offsetWidth || 0;
+            height = el.height || el.offsetHeight || 0;
+            alt = 'canvas-image';
+            context = 'canvas-element';
+        } else {
+            src = el.getAttribute('data-src') || el.getAttribute('data-lazy') ||
+                  el.getAttribute('data-original') || el.getAttribute('data-img') ||
+                  el.getAttribute('data-image') || el.getAttribute('data-background');
+            width = el.offsetWidth || 0;
+            height = el.offsetHeight || 0;
+            alt = el.getAttribute('aria-label') || el.getAttribute('title') || '';
+            context = 'data-attribute';
+        }
+        return { src, width, height, alt, context };
+    }
+
+    const bySrc = new Map();      // resolved src -> best selector candidate
+    const backgrounds = [];       // css-background candidates in document order
+    const seenBackgrounds = new Set();
+    const bgUrlRe = /url\(["']?([^"')]+)["']?\)/g;
+
+    const walker = document.createTreeWalker(document.documentElement, NodeFilter.SHOW_ELEMENT);
+    let docIndex = 0;
+    for (let el = walker.currentNode; el; el = walker.nextNode(), docIndex++) {
+        const selectorIndex = firstMatch(el);
+        if (selectorIndex !== -1) {
+            try {
+                const info = describe(el);
+                const resolvedUrl = info.src ? resolveUrl(info.src) : null;
+                if (resolvedUrl) {
+                    const existing = bySrc.get(resolvedUrl);
+                    if (!existing || selectorIndex < existing.selectorIndex) {
+                        bySrc.set(resolvedUrl, {
+                            selectorIndex, docIndex,
+                            image: {
+                                src: resolvedUrl,
+                                alt: info.alt,
+                                width: info.width,
+                                height: info.height,
+                                format: getImageFormat(resolvedUrl),
+                                context: info.context,
+                                is_base64: resolvedUrl.startsWith('data:')
+                            }
+                        });
+                    }
+                }
+            } catch (e) {
+                // Unserializable SVG or tainted canvas: skip the element
+            }
+        }
+
+        const bgImage = window.getComputedStyle(el).backgroundImage;
+        if (bgImage && bgImage !== 'none' && bgImage.includes('url(')) {
+            for (const match of bgImage.matchAll(bgUrlRe)) {
+                const resolvedUrl = resolveUrl(match[1]);
+                if (resolvedUrl && !seenBackgrounds.has(resolvedUrl)) {
+                    seenBackgrounds.add(resolvedUrl);
+                    backgrounds.push({
+                        src: resolvedUrl,
+                        alt: 'background-image',
+                        width: el.offsetWidth || 0,
+                        height: el.offsetHeight || 0,
+                        format: getImageFormat(resolvedUrl),
+                        context: 'css-background',
+                        is_base64: resolvedUrl.startsWith('data:')
+                    });
+                }
+            }
+        }
+    }
+
+    const allImages = Array.from(bySrc.values())
+        .sort((a, b) => (a.selectorIndex - b.selectorIndex) || (a.docIndex - b.docIndex))
+        .map(candidate => candidate.image);
+    for (const bg of backgrounds) {
+        if (!bySrc.has(bg.src)) allImages.push(bg);
+    }
+
+    // Sort images by size (stable, so ties keep discovery order)
+    allImages.sort((a, b) => (b.width * b.height) - (a.width * a.height));
+    return allImages;
+}
+"""
@@ -0,0 +1,160 @@
+import asyncio
+import os
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class Job:
+    """One queued unit of work and its progress as seen by pollers"""
+
+    def __init__(self, key: str, payload: Dict[str, Any]):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.payload = payload
+        self.status = "queued"
+        self.phase = "queued"
+        self.message = "Waiting for a worker..."
+        self.progress = 0.0
+        self.result: Optional[Any] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def update(self, phase: str, message: str, progress: Optional[float] = None):
+        self.phase = phase
+        self.message = message
+        if progress is not None:
+            # Never move backwards, e.g. when a cache hit skips ahead
+            self.progress = max(self.progress, progress)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "phase": self.phase,
+            "message": self.message,
+            "progress": round(self.progress, 3),
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+
+class JobManager:
+    """Bounded worker pool behind an asyncio queue.
+
+    Submitting a key that already has a queued or running job returns that
+    job instead of enqueueing duplicate work. Finished jobs are kept for
+    `result_ttl` seconds so clients can poll for the result.
+    """
+
+    def __init__(
+        self,
+        runner: Callable[[Job], Awaitable[Any]],
+        workers: int = 2,
+        max_queue: int = 100,
+        result_ttl: float = 3600
+    ):
+        self.runner = runner
+        self.worker_count = workers
+        self.result_ttl = result_ttl
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._jobs: Dict[str, Job] = {}
+        self._inflight: Dict[str, Job] = {}
+        self._workers: list = []
+
+    @classmethod
+    def from_env(cls, runner: Callable[[Job], Awaitable[Any]]) -> "JobManager":
+        return cls(
+            runner,
+            workers=int(os.getenv("JOB_WORKERS", "2")),
+            max_queue=int(os.getenv("JOB_MAX_QUEUE", "100")),
+            result_ttl=float(os.getenv("JOB_RESULT_TTL_SECONDS", "3600"))
+        )
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._workers),
+            "queue_depth": self.queue_depth,
+            "in_flight": len(self._inflight),
+            "retained": len(self._jobs)
+        }
+
+    async def start(self):
+        for i in range(self.worker_count):
+            self._workers.append(asyncio.create_task(self._worker(i)))
+        print(f"✅ Job queue ready ({self.worker_count} workers)")
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+
+    def submit(self, key: str, payload: Dict[str, Any]) -> Tuple[Job, bool]:
+        """Enqueue a job; returns (job, deduplicated)"""
+        self._purge_expired()
+        existing = self._inflight.get(key)
+        if existing is not None:
+            return existing, True
+
+        job = Job(key, payload)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFullError("Job queue is full, try again later")
+        self._jobs[job.id] = job
+        self._inflight[key] = job
+        return job, False
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self._purge_expired()
+        return self._jobs.get(job_id)
+
+    async def _worker(self, index: int):
+        while True:
+            job = await self._queue.get()
+            job.status = "running"
+            job.started_at = time.time()
+            try:
+                job.result = await self.runner(job)
+                job.status = "succeeded"
+                job.update("done", "Complete!", 1.0)
+            except asyncio.CancelledError:
+                job.status = "failed"
+                job.error = "Cancelled"
+                raise
+            except Exception as e:
+                print(f"❌ Job {job.id} failed:", str(e))
+                job.status = "failed"
+                job.error = str(e)
+                job.update("failed", "Failed")
+            finally:
+                job.finished_at = time.time()
+                if self._inflight.get(job.key) is job:
+                    del self._inflight[job.key]
+                self._queue.task_done()
+
+    def _purge_expired(self):
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.done and job.finished_at and now - job.finished_at > self.result_ttl
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
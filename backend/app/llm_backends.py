@@ -0,0 +1,173 @@
+import abc
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from anthropic import AsyncAnthropic
+
+
+class LLMBackend(abc.ABC):
+    """What LLMClient needs from a model provider.
+
+    `create_message` takes Anthropic messages.create keyword arguments and
+    returns an object with `.content[0].text` and `.usage`; `stream_text`
+    is an async generator of text deltas for the same arguments.
+    """
+
+    name = "base"
+
+    @abc.abstractmethod
+    async def create_message(self, timeout: float, **kwargs) -> Any:
+        ...
+
+    @abc.abstractmethod
+    def stream_text(self, timeout: float, **kwargs) -> AsyncIterator[str]:
+        ...
+
+    async def close(self):
+        pass
+
+
+class AnthropicBackend(LLMBackend):
+    """The real Anthropic API (or anything speaking it, via `base_url`)"""
+
+    name = "anthropic"
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        timeout: float = 120.0,
+        max_retries: int = 2
+    ):
+        api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
+        if not api_key:
+            raise ValueError("ANTHROPIC_API_KEY required")
+        self.client = AsyncAnthropic(
+            api_key=api_key,
+            base_url=base_url,
+            timeout=timeout,
+            max_retries=max_retries
+        )
+
+    async def create_message(self, timeout: float, **kwargs) -> Any:
+        return await self.client.messages.create(timeout=timeout, **kwargs)
+
+    async def stream_text(self, timeout: float, **kwargs) -> AsyncIterator[str]:
+        async with self.client.messages.stream(timeout=timeout, **kwargs) as stream:
+            async for text in stream.text_stream:
+                yield text
+
+    async def close(self):
+        await self.client.close()
+
+
+# Rough chars-per-token ratio for English prose and HTML
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def prompt_text(kwargs: Dict[str, Any]) -> str:
+    """Flatten system and message content of a messages.create call into one string"""
+    parts: List[str] = []
+    for block in [kwargs.get("system")] + [m.get("content") for m in kwargs.get("messages", [])]:
+        if isinstance(block, str):
+            parts.append(block)
+        elif isinstance(block, list):
+            parts.extend(item.get("text", "") for item in block if isinstance(item, dict))
+    return "\n".join(parts)
+
+
+def stub_html(prompt: str, output_tokens: int) -> str:
+    """A well-formed page of roughly `output_tokens` tokens, derived from the prompt"""
+    head = (
+        "<!DOCTYPE html>\n<html lang=\"en\">\n<head>\n<meta charset=\"utf-8\">\n"
+        "<title>Stub Clone</title>\n<style>body{font-family:system-ui,sans-serif;margin:0}"
+        "section{padding:24px 40px}</style>\n</head>\n<body>\n"
+        f"<!-- stub response for a {estimate_tokens(prompt)}-token prompt -->\n"
+    )
+    tail = "</body>\n</html>"
+    sections = []
+    budget = output_tokens * CHARS_PER_TOKEN - len(head) - len(tail)
+    i = 0
+    while budget > 0:
+        section = f"<section class=\"s{i}\"><h2>Section {i + 1}</h2><p>Placeholder content generated offline.</p></section>\n"
+        sections.append(section)
+        budget -= len(section)
+        i += 1
+    return head + "".join(sections) + tail
+
+
+class StubBackend(LLMBackend):
+    """Offline stand-in that simulates time-to-first-token and token throughput.
+
+    Returns deterministic placeholder HTML, so the whole clone pipeline can be
+    load tested without an API key or per-request cost.
+    """
+
+    name = "stub"
+
+    def __init__(
+        self,
+        first_token_ms: float = 500,
+        tokens_per_second: float = 80,
+        output_tokens: int = 1500,
+        chunk_tokens: int = 8
+    ):
+        self.first_token_ms = first_token_ms
+        self.tokens_per_second = tokens_per_second
+        self.output_tokens = output_tokens
+        self.chunk_tokens = chunk_tokens
+
+    @classmethod
+    def from_env(cls) -> "StubBackend":
+        return cls(
+            first_token_ms=float(os.getenv("LLM_STUB_FIRST_TOKEN_MS", "500")),
+            tokens_per_second=float(os.getenv("LLM_STUB_TOKENS_PER_SECOND", "80")),
+            output_tokens=int(os.getenv("LLM_STUB_OUTPUT_TOKENS", "1500"))
+        )
+
+    def _output_tokens(self, kwargs: Dict[str, Any]) -> int:
+        return min(self.output_tokens, kwargs.get("max_tokens") or self.output_tokens)
+
+    async def create_message(self, timeout: float, **kwargs) -> Any:
+        prompt = prompt_text(kwargs)
+        text = stub_html(prompt, self._output_tokens(kwargs))
+        output_tokens = estimate_tokens(text)
+        await asyncio.sleep(self.first_token_ms / 1000 + output_tokens / self.tokens_per_second)
+        return SimpleNamespace(
+            id=f"msg_stub_{int(time.time() * 1000)}",
+            model=kwargs.get("model"),
+            role="assistant",
+            stop_reason="end_turn",
+            content=[SimpleNamespace(type="text", text=text)],
+            usage=SimpleNamespace(
+                input_tokens=estimate_tokens(prompt),
+                output_tokens=output_tokens,
+                cache_creation_input_tokens=0,
+                cache_read_input_tokens=0
+            )
+        )
+
+    async def stream_text(self, timeout: float, **kwargs) -> AsyncIterator[str]:
+        text = stub_html(prompt_text(kwargs), self._output_tokens(kwargs))
+        await asyncio.sleep(self.first_token_ms / 1000)
+        chunk_chars = self.chunk_tokens * CHARS_PER_TOKEN
+        for start in range(0, len(text), chunk_chars):
+            await asyncio.sleep(self.chunk_tokens / self.tokens_per_second)
+            yield text[start:start + chunk_chars]
+
+
+def backend_from_env(timeout: float) -> LLMBackend:
+    """LLM_BACKEND=anthropic (default) or stub; LLM_BASE_URL points anthropic at another server"""
+    name = os.getenv("LLM_BACKEND", "anthropic").lower()
+    if name == "stub":
+        return StubBackend.from_env()
+    if name == "anthropic":
+        return AnthropicBackend(base_url=os.getenv("LLM_BASE_URL") or None, timeout=timeout)
+    raise ValueError(f"Unknown LLM_BACKEND: {name}")
@@ -0,0 +1,70 @@
+import asyncio
+import os
+from typing import Any, AsyncIterator, Optional
+
+from dotenv import load_dotenv
+
+from .llm_backends import LLMBackend, backend_from_env
+
+load_dotenv()
+
+
+class LLMClient:
+    """Shared LLM client with bounded concurrency and per-request timeouts.
+
+    One instance is reused by every request so the underlying HTTP connection
+    pool stays warm, and the semaphore stops a burst of clones from opening an
+    unbounded number of concurrent generations. The provider itself is an
+    LLMBackend (Anthropic, or the offline stub).
+    """
+
+    def __init__(
+        self,
+        backend: LLMBackend,
+        max_concurrency: int = 4,
+        timeout: float = 120.0
+    ):
+        self.backend = backend
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    @classmethod
+    def from_env(cls) -> "LLMClient":
+        timeout = float(os.getenv("LLM_TIMEOUT_SECONDS", "120"))
+        return cls(
+            backend_from_env(timeout),
+            max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "4")),
+            timeout=timeout
+        )
+
+    async def create_message(self, timeout: Optional[float] = None, **kwargs) -> Any:
+        """Call messages.create once a concurrency slot is free"""
+        async with self._semaphore:
+            return await self.backend.create_message(timeout=timeout or self.timeout, **kwargs)
+
+    async def stream_text(self, timeout: Optional[float] = None, **kwargs) -> AsyncIterator[str]:
+        """Stream text deltas, holding a concurrency slot until done"""
+        async with self._semaphore:
+            async for text in self.backend.stream_text(timeout=timeout or self.timeout, **kwargs):
+                yield text
+
+    async def close(self):
+        await self.backend.close()
+
+
+_shared_client: Optional[LLMClient] = None
+
+
+def get_llm_client() -> LLMClient:
+    """Return the process-wide LLM client, creating it on first use"""
+    global _shared_client
+    if _shared_client is None:
+        _shared_client = LLMClient.from_env()
+    return _shared_client
+
+
+async def close_llm_client():
+    global _shared_client
+    if _shared_client is not None:
+        await _shared_client.close()
+        _shared_client = None
@@ -1,14 +1,122 @@
-import os
-from typing import Dict, Any, List
-import json
-from anthropic import Anthropic
+from typing import Dict, Any, List, Optional, Union
 from dotenv import load_dotenv
 
+from .llm_client import get_llm_client
+from .metrics import LLM_TOKENS
+from .prompt_format import CompactPrompt
+from .schema import ScrapeResult
+from .scraper import WebsiteScraper
+
 load_dotenv()
 
+SYSTEM_PROMPT = """You are an expert web developer and designer with years of experience creating pixel-perfect HTML replicas of websites. Your mission is to analyze comprehensive website data and generate a complete, standalone HTML page that replicates the original design with exceptional accuracy.
+
+CORE PRINCIPLES:
+1. **Visual Fidelity**: Recreate the exact visual appearance - layouts, spacing, colors, typography, shadows
+2. **Modern Standards**: Use semantic HTML5, CSS Grid, Flexbox, CSS custom properties, modern CSS features
+3. **Component Design**: Create reusable, modular components with clean CSS architecture
+4. **Responsive Excellence**: Ensure flawless behavior across all devices with mobile-first approach
+5. **Interactive Polish**: Include hover effects, transitions, and smooth animations
+6. **Performance**: Efficient CSS, minimal redundancy, fast loading
+7. **Accessibility**: Proper semantic markup, ARIA labels, keyboard navigation
+
+TECHNICAL REQUIREMENTS:
+- Create a complete, self-contained HTML document with internal CSS
+- Use CSS custom properties (--variables) for consistent theming
+- Implement CSS Grid for layouts, Flexbox for component alignment
+- Use modern CSS functions: clamp(), min(), max(), calc() for responsive design
+- Include smooth transitions and micro-interactions
+- Ensure pixel-perfect spacing using consistent spacing scale
+- Implement proper semantic HTML structure
+- Use CSS animations for dynamic elements
+- Include hover and focus states for interactive elements
+- Make it production-ready with clean, well-commented CSS
+
+OUTPUT FORMAT:
+Respond with ONLY the complete HTML document. Start with <!DOCTYPE html> and end with </html>. Include no explanations, markdown formatting, or additional text - just the pure HTML code."""
+
+# The same for every site, so it lives in the cached system prefix rather than the user prompt
+CLONING_REQUIREMENTS = """=== CLONING REQUIREMENTS ===
+
+1. **Exact Visual Recreation**: Match the layout, spacing, colors, and typography precisely
+2. **Component Fidelity**: Recreate all identified UI components (buttons, cards, forms, navigation)
+3. **Responsive Behavior**: Implement the responsive patterns observed at different breakpoints
+4. **Interactive States**: Include hover effects, focus states, and transitions
+5. **Modern Implementation**: Use CSS Grid for layouts, Flexbox for components, CSS custom properties for theming
+6. **Content Strategy**: Use meaningful placeholder content that matches the original's tone and structure
+7. **Performance**: Optimize CSS with efficient selectors and minimal redundancy
+"""
+
+# How to read the user prompt; also stable, and together with the text above it
+# takes the cached prefix past the model's minimum cacheable length
+SCRAPE_DATA_GUIDE = """=== READING THE WEBSITE DATA ===
+
+The request that follows describes one scraped page in compact sections. Sections with nothing in them are left out, so a missing section means the scraper found nothing of that kind, not that the page lacks it entirely.
+
+Format:
+- Tables list one row per item under a header of |-separated column names. Columns that were empty for every row are omitted; an empty cell means that item had no value.
+- Plain lists are written on one line, separated by "; ".
+- Nested values are written as compact JSON.
+- "(+N more)" means N further items were scraped but left out to save space; extrapolate them from the pattern of the items shown.
+- "(truncated)" means the section was cut at its length limit.
+- "[inline image/png, 12KB omitted]" stands for an image that was embedded in the page as a data: URI.
+- Long cell values end in "…" where they were shortened.
+
+Sections:
+- VISUAL HIERARCHY: the most prominent heading and how many headings there are per level. Use it to size the type scale.
+- LAYOUT STRUCTURE: the page's scroll width and height in CSS pixels and the opening text of each <section>, in document order. Reproduce the sections in that order with comparable proportions.
+- RESPONSIVE BREAKPOINTS: for each probed viewport width, the viewport size and whether a <nav> element was present. Write media queries around these widths.
+- UI COMPONENTS IDENTIFIED: buttons (label and classes), cards (classes and the start of their markup) and forms. Class names hint at the design system in use (utility classes, BEM blocks, component libraries); keep their visual intent, not the names themselves.
+- PRIMARY COLORS: computed colors in order of first appearance, as rgb()/rgba() or hex. Early entries are usually body text and backgrounds. Define them as CSS custom properties and use these exact values.
+- TYPOGRAPHY STACK: computed font-family stacks. Keep each stack with its generic fallback; load a web font only if it is a well-known Google Font.
+- HEADINGS HIERARCHY: heading level, text and id in document order. Keep the text verbatim and the same levels.
+- TEXT CONTENT: the page's visible text. Reuse it where it fits the layout; otherwise write placeholder text in the same tone and length.
+- MEDIA CONTENT: images (src, alt, classes) and videos (src, poster). Use each src exactly as given; it is absolute and loadable. For omitted inline images, draw a neutral placeholder of a plausible size.
+- INTERACTIVE ELEMENTS: how many modals and animated elements were found. Include matching transitions and, where modals exist, one accessible dialog pattern.
+- HTML STRUCTURE REFERENCE: the start of the page's cleaned body markup, with scripts and styles removed. Follow its nesting and landmarks (header, nav, main, footer) rather than copying it.
+
+Output:
+- One complete HTML document with all CSS in a single <style> element in the <head>.
+- No external JavaScript frameworks; a small inline <script> is fine for menus, tabs or dialogs.
+- Mobile-first CSS, with the breakpoints above as min-width media queries.
+- Every image gets a meaningful alt attribute, width and height, and loading="lazy" below the fold.
+
+Following these requirements, generate a complete, production-ready HTML page that perfectly replicates the website described in the request.
+"""
+
+# Minimum prompt length, in tokens, the API will cache; a shorter prefix is sent uncached
+PROMPT_CACHE_MIN_TOKENS = {
+    "claude-sonnet-4-20250514": 1024,
+    "claude-3-5-sonnet-20241022": 1024
+}
+
+# Per-section caps on list items and characters in the user prompt
+SECTION_CAPS: Dict[str, Dict[str, int]] = {
+    "visual_hierarchy": {"max_items": 20, "max_chars": 1500},
+    "layout": {"max_items": 20, "max_chars": 1500},
+    "responsive_behavior": {"max_items": 10, "max_chars": 1000},
+    "components": {"max_items": 15, "max_chars": 2500},
+    "colors": {"max_items": 8},
+    "fonts": {"max_items": 3},
+    "headings": {"max_items": 15},
+    "text_content": {"max_items": 20, "max_chars": 2000},
+    "media_content": {"max_items": 30, "max_chars": 3000},
+    "interactions": {"max_items": 10, "max_chars": 1500},
+}
+
+# The ScrapeResult fields the user prompt is built from; clone_url leaves the rest
+# (screenshots above all) unscraped
+CLONER_FIELDS = frozenset({
+    "html_structure", "visual_elements", "interactive_elements", "media_content",
+    "design_system", "layout_analysis", "typography", "animations", "responsive_behavior"
+})
+
+USAGE_FIELDS = ("input_tokens", "cache_creation_input_tokens", "cache_read_input_tokens", "output_tokens")
+
+
 class LLMWebsiteCloner:
     def __init__(self, model="claude-3.5"):
-        self.client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+        self.client = get_llm_client()
         self.model = model
         
         # Model selection
@@ -17,7 +125,17 @@ class LLMWebsiteCloner:
         else:
             self.model_name = "claude-3-5-sonnet-20241022"
         
-    async def clone_website(self, scrape_data: Dict[str, Any]) -> str:
+        # Token usage of the last call and running totals, split into
+        # uncached input, cache writes, cache reads and output
+        self.last_usage: Dict[str, int] = {}
+        self.usage_totals: Dict[str, int] = {field: 0 for field in USAGE_FIELDS}
+        
+    async def clone_url(self, url: str, scraper: Optional[WebsiteScraper] = None) -> str:
+        """Scrape `url`, computing only the fields the prompt uses, and clone it"""
+        result = await (scraper or WebsiteScraper()).scrape(url, fields=CLONER_FIELDS)
+        return await self.clone_website(result)
+    
+    async def clone_website(self, scrape_data: Union[ScrapeResult, Dict[str, Any]]) -> str:
         """
         Use Claude to analyze the scraped website data and generate a cloned HTML page
         """
@@ -30,7 +148,7 @@ class LLMWebsiteCloner:
         
         try:
             # Call Claude API
-            response = self.client.messages.create(
+            response = await self.client.create_message(
                 model=self.model_name,
                 max_tokens=8000,
                 temperature=0.1,
@@ -40,6 +158,8 @@ class LLMWebsiteCloner:
                 ]
             )
             
+            self._record_usage(response)
+            
             # Extract HTML from response
             html_content = response.content[0].text
             
@@ -54,128 +174,116 @@ class LLMWebsiteCloner:
         except Exception as e:
             raise Exception(f"LLM cloning failed: {str(e)}")
     
-    def _prepare_context(self, scrape_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Prepare and clean the scraped data for LLM consumption"""
+    def _record_usage(self, response: Any):
+        usage = getattr(response, "usage", None)
+        self.last_usage = {field: getattr(usage, field, 0) or 0 for field in USAGE_FIELDS}
+        for field, count in self.last_usage.items():
+            self.usage_totals[field] += count
+            LLM_TOKENS.inc(count, kind=field)
+        print(
+            f"🧾 Tokens: {self.last_usage['input_tokens']} input, "
+            f"{self.last_usage['cache_read_input_tokens']} cache read, "
+            f"{self.last_usage['cache_creation_input_tokens']} cache write, "
+            f"{self.last_usage['output_tokens']} output"
+        )
+    
+    def _prepare_context(self, scrape_data: Union[ScrapeResult, Dict[str, Any]]) -> Dict[str, Any]:
+        """Prepare the scraped data for LLM consumption.
+
+        Reads the typed ScrapeResult directly; plain dicts (cached or API
+        payloads) are loaded into one first. Screenshots are described by
+        their metadata, never sent as base64.
+        """
+        result = scrape_data if isinstance(scrape_data, ScrapeResult) else ScrapeResult.from_dict(scrape_data)
+        html = result.html_structure
         
-        # Remove base64 screenshots to reduce token usage
-        screenshots_info = {}
-        if "screenshots" in scrape_data:
-            for device, screenshot_b64 in scrape_data["screenshots"].items():
-                screenshots_info[device] = {
-                    "has_screenshot": True,
-                    "size_kb": len(screenshot_b64) // 1024 if screenshot_b64 else 0
-                }
+        screenshots_info = {
+            device: {"has_screenshot": True, "size_kb": info.get("bytes", 0) // 1024}
+            for device, info in result.screenshot_info.items()
+        }
+        headings = [
+            {"level": heading.get("level"), "text": heading.get("text", ""), "id": heading.get("id", "")}
+            for heading in html.headings
+        ]
+        top_heading = min(headings, key=lambda heading: heading["level"] or 6) if headings else None
+        heading_counts: Dict[str, int] = {}
+        for heading in headings:
+            heading_counts[f"h{heading['level']}"] = heading_counts.get(f"h{heading['level']}", 0) + 1
         
         return {
-            "url": scrape_data.get("url", ""),
-            "title": scrape_data.get("title", ""),
+            "url": result.url,
+            "title": result.title,
             "screenshots_info": screenshots_info,
             "html_structure": {
-                "headings": scrape_data.get("html_structure", {}).get("headings", []),
-                "navigation": scrape_data.get("html_structure", {}).get("navigation", []),
-                "body_html_preview": scrape_data.get("html_structure", {}).get("body_html", "")[:4000],
-                "sections": scrape_data.get("html_structure", {}).get("sections", []),
-                "semantic_tags": scrape_data.get("html_structure", {}).get("semantic_tags", {})
+                "headings": headings,
+                "body_html_preview": html.cleaned_html[:4000]
+            },
+            "text_content": {"summary": html.text_content},
+            "media_content": {
+                "images": result.media_content.images,
+                "videos": result.media_content.videos
+            },
+            "colors": result.design_system.colors[:15],
+            "fonts": result.typography.fonts[:5],
+            "layout": {
+                "width": result.layout_analysis.width,
+                "height": result.layout_analysis.height,
+                "sections": result.layout_analysis.sections
+            },
+            "components": {
+                "buttons": [
+                    {"text": button.get("text", ""), "classList": button.get("classList", "")}
+                    for button in result.visual_elements.buttons
+                ],
+                "cards": [
+                    {"classList": card.get("classList", ""), "html": card.get("html", "")[:200]}
+                    for card in result.visual_elements.cards
+                ],
+                "forms": result.interactive_elements.forms
             },
-            "text_content": scrape_data.get("text_content", {}),
-            "media_content": scrape_data.get("media_content", {}),
-            "colors": scrape_data.get("colors", [])[:15],
-            "fonts": scrape_data.get("fonts", [])[:5],
-            "layout": scrape_data.get("layout_analysis", {}),
-            "components": scrape_data.get("components", {}),
-            "interactions": scrape_data.get("interactions", {}),
-            "responsive_behavior": scrape_data.get("responsive_behavior", {}),
-            "visual_hierarchy": scrape_data.get("visual_hierarchy", {}),
-            "meta_info": scrape_data.get("meta_info", {}),
+            "interactions": {
+                "modals": len(result.interactive_elements.modals),
+                "animated_elements": result.animations.animated_elements
+            },
+            "responsive_behavior": result.responsive_behavior,
+            "visual_hierarchy": {
+                "primary_heading": top_heading["text"] if top_heading else "",
+                "heading_counts": heading_counts
+            }
         }
     
-    def _create_system_prompt(self) -> str:
-        """Create the system prompt for Claude"""
-        return """You are an expert web developer and designer with years of experience creating pixel-perfect HTML replicas of websites. Your mission is to analyze comprehensive website data and generate a complete, standalone HTML page that replicates the original design with exceptional accuracy.
-
-CORE PRINCIPLES:
-1. **Visual Fidelity**: Recreate the exact visual appearance - layouts, spacing, colors, typography, shadows
-2. **Modern Standards**: Use semantic HTML5, CSS Grid, Flexbox, CSS custom properties, modern CSS features
-3. **Component Design**: Create reusable, modular components with clean CSS architecture
-4. **Responsive Excellence**: Ensure flawless behavior across all devices with mobile-first approach
-5. **Interactive Polish**: Include hover effects, transitions, and smooth animations
-6. **Performance**: Efficient CSS, minimal redundancy, fast loading
-7. **Accessibility**: Proper semantic markup, ARIA labels, keyboard navigation
-
-TECHNICAL REQUIREMENTS:
-- Create a complete, self-contained HTML document with internal CSS
-- Use CSS custom properties (--variables) for consistent theming
-- Implement CSS Grid for layouts, Flexbox for component alignment
-- Use modern CSS functions: clamp(), min(), max(), calc() for responsive design
-- Include smooth transitions and micro-interactions
-- Ensure pixel-perfect spacing using consistent spacing scale
-- Implement proper semantic HTML structure
-- Use CSS animations for dynamic elements
-- Include hover and focus states for interactive elements
-- Make it production-ready with clean, well-commented CSS
-
-OUTPUT FORMAT:
-Respond with ONLY the complete HTML document. Start with <!DOCTYPE html> and end with </html>. Include no explanations, markdown formatting, or additional text - just the pure HTML code."""
+    def _create_system_prompt(self) -> List[Dict[str, Any]]:
+        """Create the system prompt for Claude as cacheable content blocks"""
+        return [
+            # Identical on every call, so it is the cacheable prefix; the
+            # breakpoint on the last block caches everything up to it
+            {"type": "text", "text": SYSTEM_PROMPT},
+            {"type": "text", "text": CLONING_REQUIREMENTS + "\n" + SCRAPE_DATA_GUIDE, "cache_control": {"type": "ephemeral"}}
+        ]
     
     def _create_user_prompt(self, context: Dict[str, Any]) -> str:
         """Create the user prompt with website context"""
+        html_structure = context.get('html_structure', {})
+        
+        sections = CompactPrompt()
+        sections.add("VISUAL HIERARCHY", context.get('visual_hierarchy'), **SECTION_CAPS["visual_hierarchy"])
+        sections.add("LAYOUT STRUCTURE", context.get('layout'), **SECTION_CAPS["layout"])
+        sections.add("RESPONSIVE BREAKPOINTS", context.get('responsive_behavior'), **SECTION_CAPS["responsive_behavior"])
+        sections.add("UI COMPONENTS IDENTIFIED", context.get('components'), **SECTION_CAPS["components"])
+        sections.add("PRIMARY COLORS (use these exact colors)", context.get('colors', []), **SECTION_CAPS["colors"])
+        sections.add("TYPOGRAPHY STACK", context.get('fonts', []), **SECTION_CAPS["fonts"])
+        sections.add("HEADINGS HIERARCHY", html_structure.get('headings'), **SECTION_CAPS["headings"])
+        sections.add("TEXT CONTENT", context.get('text_content'), **SECTION_CAPS["text_content"])
+        sections.add("MEDIA CONTENT", context.get('media_content'), **SECTION_CAPS["media_content"])
+        sections.add("INTERACTIVE ELEMENTS", context.get('interactions'), **SECTION_CAPS["interactions"])
+        sections.add_text("HTML STRUCTURE REFERENCE", html_structure.get('body_html_preview', ''), fence="html")
         
-        prompt = f"""WEBSITE CLONING REQUEST
+        return f"""WEBSITE CLONING REQUEST
 
 Target Website: {context['url']}
 Page Title: {context['title']}
 
-=== VISUAL HIERARCHY ===
-{json.dumps(context.get('visual_hierarchy', {}), indent=2)}
-
-=== LAYOUT STRUCTURE ===
-Layout Analysis:
-{json.dumps(context.get('layout', {}), indent=2)}
-
-Responsive Breakpoints:
-{json.dumps(context.get('responsive_behavior', {}), indent=2)}
-
-=== UI COMPONENTS IDENTIFIED ===
-{json.dumps(context.get('components', {}), indent=2)}
-
-=== DESIGN SYSTEM ===
-Primary Colors (use these exact colors):
-{context.get('colors', [])[:8]}
-
-Typography Stack:
-{context.get('fonts', [])[:3]}
-
-=== CONTENT STRUCTURE ===
-Navigation Items: {context.get('html_structure', {}).get('navigation', [])[:10]}
-Headings Hierarchy: {context.get('html_structure', {}).get('headings', [])[:15]}
-
-Text Content:
-{json.dumps(context.get('text_content', {}), indent=2)}
-
-Media Content:
-{json.dumps(context.get('media_content', {}), indent=2)}
-
-=== INTERACTIVE ELEMENTS ===
-{json.dumps(context.get('interactions', {}), indent=2)}
-
-=== HTML STRUCTURE REFERENCE ===
-```html
-{context.get('html_structure', {}).get('body_html_preview', '')}
-```
-
-=== CLONING REQUIREMENTS ===
-
-1. **Exact Visual Recreation**: Match the layout, spacing, colors, and typography precisely
-2. **Component Fidelity**: Recreate all identified UI components (buttons, cards, forms, navigation)
-3. **Responsive Behavior**: Implement the responsive patterns observed at different breakpoints
-4. **Interactive States**: Include hover effects, focus states, and transitions
-5. **Modern Implementation**: Use CSS Grid for layouts, Flexbox for components, CSS custom properties for theming
-6. **Content Strategy**: Use meaningful placeholder content that matches the original's tone and structure
-7. **Performance**: Optimize CSS with efficient selectors and minimal redundancy
-
-Generate a complete, production-ready HTML page that perfectly replicates this website's design and functionality."""
-
-        return prompt
+{sections.render()}"""
     
     def _extract_html_from_response(self, response: str) -> str:
         """Extract HTML from Claude's response"""
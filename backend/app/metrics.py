@@ -0,0 +1,251 @@
+import abc
+import asyncio
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+# Covers ~5ms DOM queries up to multi-minute LLM calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(abc.ABC):
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abc.abstractmethod
+    def samples(self) -> List[str]:
+        ...
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonic count; pass `fn` to report a counter some other object already keeps"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (), fn: Optional[Callable[[], float]] = None):
+        super().__init__(name, help_text, labelnames)
+        self.fn = fn
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> List[str]:
+        if self.fn is not None:
+            return [f"{self.name} {_format_value(self.fn())}"]
+        with self._lock:
+            values = dict(self._values)
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in values.items()]
+
+
+class Gauge(_Metric):
+    """Point-in-time value; pass `fn` to read it when /metrics is scraped"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (), fn: Optional[Callable[[], float]] = None):
+        super().__init__(name, help_text, labelnames)
+        self.fn = fn
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def samples(self) -> List[str]:
+        if self.fn is not None:
+            try:
+                value = self.fn()
+            except Exception:
+                # The component may not be started yet
+                return []
+            return [f"{self.name} {_format_value(value)}"]
+        with self._lock:
+            values = dict(self._values)
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in values.items()]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # label values -> ([per-bucket counts], sum, count)
+        self._series: Dict[LabelValues, Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total, count = self._series.get(key) or ([0] * len(self.buckets), 0.0, 0)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._series[key] = (counts, total + value, count + 1)
+
+    def totals(self) -> Dict[LabelValues, Tuple[float, int]]:
+        """(sum, count) per label set, for callers that want raw totals rather than buckets"""
+        with self._lock:
+            return {key: (total, count) for key, (_, total, count) in self._series.items()}
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            series = {key: (list(counts), total, count) for key, (counts, total, count) in self._series.items()}
+        lines = []
+        for key, (counts, total, count) in series.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """In-process metrics rendered in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = (), fn: Optional[Callable[[], float]] = None) -> Counter:
+        return self.register(Counter(name, help_text, labelnames, fn))
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = (), fn: Optional[Callable[[], float]] = None) -> Gauge:
+        return self.register(Gauge(name, help_text, labelnames, fn))
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help_text, labelnames, buckets))
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+PHASE_SECONDS = REGISTRY.histogram(
+    "cloner_phase_duration_seconds",
+    "Wall time of each clone pipeline phase",
+    ["phase"]
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    "cloner_http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route", "status"]
+)
+SCRAPE_CACHE_LOOKUPS = REGISTRY.counter(
+    "cloner_scrape_cache_lookups_total",
+    "Scrape cache lookups by result",
+    ["result"]
+)
+PLAYWRIGHT_FAILURES = REGISTRY.counter(
+    "cloner_playwright_failures_total",
+    "Playwright scrapes that ended in an error"
+)
+MCP_FALLBACKS = REGISTRY.counter(
+    "cloner_mcp_fallbacks_total",
+    "Clones that fell back from Playwright to MCP or minimal data",
+    ["outcome"]
+)
+CRAWL_PAGES = REGISTRY.counter(
+    "cloner_crawl_pages_total",
+    "Pages visited by /crawl, by outcome (scraped, failed, skipped)",
+    ["outcome"]
+)
+LLM_TOKENS = REGISTRY.counter(
+    "cloner_llm_tokens_total",
+    "LLM tokens by kind (input, cache_creation_input, cache_read_input, output)",
+    ["kind"]
+)
+EVENT_LOOP_LAG = REGISTRY.histogram(
+    "cloner_event_loop_lag_seconds",
+    "How late a periodic event-loop tick fired",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+)
+
+
+@contextmanager
+def span(phase: str) -> Iterator[None]:
+    """Time a pipeline phase into PHASE_SECONDS; works around sync and async code alike"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        PHASE_SECONDS.observe(time.perf_counter() - start, phase=phase)
+
+
+class EventLoopLagMonitor:
+    """Schedules a tick every `interval` seconds and records how late it runs.
+
+    Lag means something is blocking the loop (CPU-heavy parsing, sync I/O)
+    and every in-flight request is stalled for that long.
+    """
+
+    def __init__(self, interval: float = 0.1):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            EVENT_LOOP_LAG.observe(max(0.0, loop.time() - expected))
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
@@ -0,0 +1,128 @@
+from typing import FrozenSet, Iterable, Optional
+
+from .image_extraction import COLLECT_IMAGES_JS
+from .schema import validate_fields
+
+# Field group -> JS statements filling `out` with that group's keys. Each runs
+# in its own block inside one page.evaluate, with `selectorSpecs` in scope.
+PAGE_EXTRACTORS = {
+    "images": COLLECT_IMAGES_JS + """
+        const allImages = collectImages(selectorSpecs);
+        out.allImages = allImages.slice(0, 100); // Limit to 100 best images
+        out.totalImagesFound = allImages.length;
+    """,
+    "theme": """
+        const bodyStyles = window.getComputedStyle(document.body);
+
+        let bgColor = bodyStyles.backgroundColor;
+        if (!bgColor || bgColor === 'rgba(0, 0, 0, 0)') {
+            bgColor = '#ffffff';
+        }
+
+        out.backgroundColor = bgColor;
+        out.textColor = bodyStyles.color || '#333333';
+        out.isDark = bgColor.includes('rgb(0') || bgColor.includes('#000') ||
+                     bgColor.includes('#202124') || bgColor.includes('rgb(18');
+        out.fontFamily = bodyStyles.fontFamily;
+    """,
+    "logo": """
+        let logo = null;
+        const logoSelectors = [
+            'img[alt*="logo" i]', 'img[src*="logo" i]', '.logo img', '.brand img',
+            'nav img', '.navbar-brand img', '.site-logo img', '.header-logo img'
+        ];
+
+        for (const selector of logoSelectors) {
+            const logoImg = document.querySelector(selector);
+            if (logoImg && logoImg.src) {
+                logo = {
+                    type: 'image',
+                    src: logoImg.src,
+                    alt: logoImg.alt || ''
+                };
+                break;
+            }
+        }
+
+        if (!logo) {
+            const textLogoSelectors = ['.logo', '.brand', 'h1', '.site-title'];
+            for (const selector of textLogoSelectors) {
+                const logoText = document.querySelector(selector);
+                if (logoText && logoText.textContent.trim()) {
+                    logo = { type: 'text', text: logoText.textContent.trim() };
+                    break;
+                }
+            }
+        }
+        out.logo = logo;
+    """,
+    "navigation": """
+        const navLinks = [];
+        const navSelectors = ['nav a', '.nav a', 'header a', '.navbar a', '.menu a'];
+
+        for (const selector of navSelectors) {
+            document.querySelectorAll(selector).forEach(link => {
+                const text = link.textContent.trim();
+                if (text && text.length < 50 && navLinks.length < 10) {
+                    navLinks.push({
+                        text: text,
+                        href: link.href || '#'
+                    });
+                }
+            });
+        }
+        out.navigation = navLinks;
+    """,
+    "headings": """
+        const headings = [];
+        document.querySelectorAll('h1, h2, h3').forEach(h => {
+            const text = h.textContent.trim();
+            if (text && headings.length < 8) {
+                headings.push({
+                    text: text,
+                    level: h.tagName.toLowerCase()
+                });
+            }
+        });
+        out.headings = headings;
+    """,
+    "features": """
+        out.hasSearch = !!document.querySelector('input[type="search"], input[name="q"], .search');
+        out.hasVideo = !!document.querySelector('video');
+    """
+}
+
+# Not a DOM query: the full-page capture taken before extraction
+SCREENSHOT_FIELD = "screenshot"
+
+# Field groups of the super scrape (main.py); not the ScrapeResult fields in schema.SCRAPE_FIELDS
+SUPER_SCRAPE_FIELDS = frozenset(PAGE_EXTRACTORS) | {SCREENSHOT_FIELD}
+
+# What /extract-images reads from a scrape
+IMAGE_FIELDS = frozenset({"images", SCREENSHOT_FIELD})
+
+
+def resolve_fields(include: Optional[Iterable[str]] = None) -> FrozenSet[str]:
+    """The field groups to scrape: all of them when `include` is None"""
+    fields = validate_fields(include, SUPER_SCRAPE_FIELDS)
+    return SUPER_SCRAPE_FIELDS if fields is None else fields
+
+
+def extraction_script(fields: Iterable[str]) -> str:
+    """One page.evaluate function running only the extractors for `fields`"""
+    blocks = "".join(
+        "{" + PAGE_EXTRACTORS[name] + "}\n"
+        for name in PAGE_EXTRACTORS
+        if name in fields
+    )
+    return """
+        (selectorSpecs) => {
+            const out = {
+                url: window.location.href,
+                siteType: 'standard',
+                title: document.title
+            };
+            """ + blocks + """
+            return out;
+        }
+    """
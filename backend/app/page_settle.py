@@ -0,0 +1,178 @@
+import asyncio
+import os
+import time
+from typing import Any, Dict
+
+from playwright.async_api import Page, Request
+
+# Installed once per document: tracks DOM activity and newly inserted images
+SETTLE_OBSERVER_JS = """
+() => {
+    if (window.__pageSettle) return;
+    const state = { lastActivity: performance.now(), mutations: 0, newImages: 0 };
+    const observer = new MutationObserver((records) => {
+        for (const record of records) {
+            state.mutations++;
+            for (const node of record.addedNodes) {
+                if (node.nodeType !== 1) continue;
+                if (node.tagName === 'IMG') {
+                    state.newImages++;
+                } else if (node.querySelectorAll) {
+                    state.newImages += node.querySelectorAll('img').length;
+                }
+            }
+        }
+        state.lastActivity = performance.now();
+    });
+    observer.observe(document.documentElement, {
+        childList: true,
+        subtree: true,
+        attributes: true,
+        attributeFilter: ['src', 'srcset', 'style', 'class']
+    });
+    window.__pageSettle = state;
+}
+"""
+
+SETTLE_STATE_JS = """
+() => {
+    const s = window.__pageSettle || { lastActivity: 0, mutations: 0, newImages: 0 };
+    return {
+        idle_ms: performance.now() - s.lastActivity,
+        mutations: s.mutations,
+        new_images: s.newImages,
+        scroll_y: window.scrollY,
+        viewport_height: window.innerHeight,
+        scroll_height: Math.max(document.body ? document.body.scrollHeight : 0,
+                                document.documentElement.scrollHeight)
+    };
+}
+"""
+
+
+class PageSettler:
+    """Scrolls a page incrementally and waits until it has gone quiet.
+
+    "Quiet" means no tracked network request in flight and no DOM mutation for
+    `quiet_ms`. Every phase shares one `max_ms` budget, so a page that never
+    settles (long polling, animated carousels) is still bounded.
+    """
+
+    def __init__(
+        self,
+        quiet_ms: int = 500,
+        step_quiet_ms: int = 250,
+        max_ms: int = 10000,
+        poll_ms: int = 100,
+        max_scroll_steps: int = 40,
+        stale_request_ms: int = 5000
+    ):
+        self.quiet_ms = quiet_ms
+        self.step_quiet_ms = step_quiet_ms
+        self.max_ms = max_ms
+        self.poll_ms = poll_ms
+        self.max_scroll_steps = max_scroll_steps
+        # Requests older than this (beacons, long polling) no longer block settling
+        self.stale_request_ms = stale_request_ms
+
+    @classmethod
+    def from_env(cls) -> "PageSettler":
+        return cls(
+            quiet_ms=int(os.getenv("SETTLE_QUIET_MS", "500")),
+            step_quiet_ms=int(os.getenv("SETTLE_STEP_QUIET_MS", "250")),
+            max_ms=int(os.getenv("SETTLE_MAX_MS", "10000"))
+        )
+
+    async def settle(self, page: Page, scroll: bool = True) -> Dict[str, Any]:
+        """Wait for the page to settle, optionally scrolling it to trigger lazy loading.
+
+        Returns a report with per-phase timings in milliseconds.
+        """
+        inflight: Dict[Request, float] = {}
+        counters = {"requests": 0, "last_network": time.monotonic()}
+
+        def on_request(request: Request):
+            inflight[request] = counters["last_network"] = time.monotonic()
+            counters["requests"] += 1
+
+        def on_done(request: Request):
+            inflight.pop(request, None)
+            counters["last_network"] = time.monotonic()
+
+        page.on("request", on_request)
+        page.on("requestfinished", on_done)
+        page.on("requestfailed", on_done)
+
+        start = time.monotonic()
+        deadline = start + self.max_ms / 1000
+        phases: Dict[str, float] = {}
+        report: Dict[str, Any] = {"timed_out": False, "scroll_steps": 0}
+        state: Dict[str, Any] = {}
+
+        try:
+            await page.evaluate(SETTLE_OBSERVER_JS)
+
+            phase_start = time.monotonic()
+            state, quiet = await self._wait_quiet(page, inflight, counters, self.quiet_ms, deadline)
+            phases["initial"] = _elapsed_ms(phase_start)
+            report["timed_out"] = not quiet
+
+            if scroll:
+                phase_start = time.monotonic()
+                steps = 0
+                while steps < self.max_scroll_steps and time.monotonic() < deadline:
+                    if state["scroll_y"] + state["viewport_height"] >= state["scroll_height"] - 1:
+                        break
+                    await page.evaluate("() => window.scrollBy(0, Math.max(window.innerHeight * 0.9, 200))")
+                    steps += 1
+                    state, quiet = await self._wait_quiet(page, inflight, counters, self.step_quiet_ms, deadline)
+                    report["timed_out"] = report["timed_out"] or not quiet
+                phases["scroll"] = _elapsed_ms(phase_start)
+                report["scroll_steps"] = steps
+
+                phase_start = time.monotonic()
+                await page.evaluate("() => window.scrollTo(0, 0)")
+                state, quiet = await self._wait_quiet(page, inflight, counters, self.step_quiet_ms, deadline)
+                phases["return_top"] = _elapsed_ms(phase_start)
+                report["timed_out"] = report["timed_out"] or not quiet
+        finally:
+            page.remove_listener("request", on_request)
+            page.remove_listener("requestfinished", on_done)
+            page.remove_listener("requestfailed", on_done)
+
+        report["phases"] = phases
+        report["total_ms"] = _elapsed_ms(start)
+        report["requests_seen"] = counters["requests"]
+        report["mutations"] = state.get("mutations", 0)
+        report["new_images"] = state.get("new_images", 0)
+        return report
+
+    async def _wait_quiet(
+        self,
+        page: Page,
+        inflight: Dict[Request, float],
+        counters: Dict[str, Any],
+        quiet_ms: int,
+        deadline: float
+    ):
+        """Poll until the page has been quiet for `quiet_ms`; returns (state, settled)"""
+        # Quiet time only counts from now, so activity triggered by the
+        # preceding scroll has a chance to start before we declare idle
+        since = time.monotonic()
+        while True:
+            now = time.monotonic()
+            state = await page.evaluate(SETTLE_STATE_JS)
+
+            active = any((now - t) * 1000 < self.stale_request_ms for t in inflight.values())
+            network_idle_ms = 0 if active else (now - max(since, counters["last_network"])) * 1000
+            dom_idle_ms = min(state["idle_ms"], (now - since) * 1000)
+
+            if network_idle_ms >= quiet_ms and dom_idle_ms >= quiet_ms:
+                return state, True
+            if now >= deadline:
+                return state, False
+            await asyncio.sleep(self.poll_ms / 1000)
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.monotonic() - start) * 1000, 1)
@@ -0,0 +1,140 @@
+import os
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+from .llm_backends import estimate_tokens
+
+# Resize hints that make the same asset show up under several URLs
+_SIZE_SUFFIX_RE = re.compile(r"(?:[-_@](?:\d+x\d+|\d+w|[1-4]x)|-scaled)(?=\.[a-z0-9]+$)", re.IGNORECASE)
+_SIZE_QUERY_PARAMS = {"w", "h", "width", "height", "q", "quality", "dpr", "fit", "crop", "auto", "fm", "format", "size", "resize"}
+
+
+def elide_data_uri(uri: str) -> str:
+    """Replace a data: URI with a short description the model can still reason about"""
+    header = uri[5:].split(",", 1)[0]
+    mime_type = header.split(";")[0] or "text/plain"
+    return f"[inline {mime_type}, {len(uri) // 1024}KB omitted]"
+
+
+def image_dedupe_key(src: str) -> str:
+    """Collapse URLs that only differ in resize parameters, size suffixes or scheme"""
+    if src.startswith("data:"):
+        return src
+    parsed = urlparse(src)
+    path = _SIZE_SUFFIX_RE.sub("", parsed.path.lower())
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parsed.query) if k.lower() not in _SIZE_QUERY_PARAMS))
+    return f"{parsed.netloc.lower()}{path}?{query}"
+
+
+def rank_images(images: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+    """Largest-first, keeping only the biggest variant of near-identical URLs; returns (images, duplicates dropped)"""
+    ranked = sorted(images, key=lambda img: -(img.get("width", 0) or 0) * (img.get("height", 0) or 0))
+    seen = set()
+    unique = []
+    for img in ranked:
+        key = image_dedupe_key(img.get("src", ""))
+        if key in seen:
+            continue
+        seen.add(key)
+        unique.append(img)
+    return unique, len(ranked) - len(unique)
+
+
+class PromptBuilder:
+    """Assembles a prompt from sections under an estimated token budget.
+
+    Required sections are always kept. Optional sections are filled in
+    priority order with whatever budget is left, item by item, so a long
+    image list is cut short instead of crowding out everything else. The
+    prompt keeps the order in which sections were added.
+    """
+
+    def __init__(self, token_budget: int = 3000):
+        self.token_budget = token_budget
+        self._sections: List[Dict[str, Any]] = []
+
+    @classmethod
+    def from_env(cls) -> "PromptBuilder":
+        return cls(token_budget=int(os.getenv("PROMPT_TOKEN_BUDGET", "3000")))
+
+    def add(self, name: str, text: str, required: bool = False, priority: int = 0):
+        self._sections.append({"name": name, "header": text, "items": [], "required": required, "priority": priority})
+
+    def add_items(
+        self,
+        name: str,
+        header: str,
+        items: List[str],
+        priority: int = 0,
+        overflow: Optional[Callable[[int], str]] = None,
+        omitted: int = 0
+    ):
+        """A header followed by as many items as fit.
+
+        `overflow(n)` describes the n items left out, counting the `omitted`
+        ones the caller already dropped before handing the list over.
+        """
+        self._sections.append({
+            "name": name, "header": header, "items": items, "required": False,
+            "priority": priority, "overflow": overflow, "omitted": omitted
+        })
+
+    def build(self) -> Tuple[str, Dict[str, Any]]:
+        rendered: Dict[int, str] = {}
+        report: Dict[str, Dict[str, Any]] = {}
+        remaining = self.token_budget
+
+        for index, section in enumerate(self._sections):
+            if section["required"]:
+                rendered[index] = section["header"]
+                tokens = estimate_tokens(section["header"])
+                remaining -= tokens
+                report[section["name"]] = {"tokens": tokens, "required": True}
+
+        optional = [(i, s) for i, s in enumerate(self._sections) if not s["required"]]
+        for index, section in sorted(optional, key=lambda pair: -pair[1]["priority"]):
+            text, included = self._fit(section, remaining)
+            tokens = estimate_tokens(text) if text else 0
+            remaining -= tokens
+            if text:
+                rendered[index] = text
+            report[section["name"]] = {"tokens": tokens, "items_included": included, "items_total": len(section["items"])}
+
+        prompt = "".join(rendered[i] for i in sorted(rendered))
+        tokens = estimate_tokens(prompt)
+        return prompt, {
+            "token_budget": self.token_budget,
+            "estimated_tokens": tokens,
+            "chars": len(prompt),
+            "over_budget": tokens > self.token_budget,
+            "sections": report
+        }
+
+    @staticmethod
+    def _fit(section: Dict[str, Any], budget: int) -> Tuple[str, int]:
+        header, items, omitted = section["header"], section["items"], section.get("omitted", 0)
+        if estimate_tokens(header) > budget:
+            return "", 0
+        if not items:
+            return header, 0
+
+        text = header
+        used = estimate_tokens(header)
+        included = 0
+        overflow = section.get("overflow")
+        for item in items:
+            # Leave room for the "... and N more" line
+            reserve = estimate_tokens(overflow(len(items) - included - 1 + omitted)) if overflow else 0
+            cost = estimate_tokens(item)
+            if used + cost + reserve > budget:
+                break
+            text += item
+            used += cost
+            included += 1
+        if included == 0:
+            return "", 0
+        left_out = len(items) - included + omitted
+        if left_out and overflow:
+            text += overflow(left_out)
+        return text, included
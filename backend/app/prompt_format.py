@@ -0,0 +1,121 @@
+import json
+from typing import Any, Dict, List, Optional
+
+from .prompt_builder import elide_data_uri
+
+MAX_CELL_CHARS = 80
+
+
+def compact_json(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def is_empty(value: Any) -> bool:
+    """None, blank strings and containers holding nothing but empty values"""
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return not value.strip()
+    if isinstance(value, dict):
+        return all(is_empty(v) for v in value.values())
+    if isinstance(value, (list, tuple, set)):
+        return all(is_empty(v) for v in value)
+    return False
+
+
+def _scalar(value: Any, max_chars: int = MAX_CELL_CHARS) -> str:
+    if isinstance(value, str):
+        text = elide_data_uri(value) if value.startswith("data:") else " ".join(value.split())
+    elif isinstance(value, (list, tuple)) and all(not isinstance(v, (dict, list)) for v in value):
+        text = " ".join(_scalar(v, max_chars) for v in value)
+    else:
+        text = compact_json(value)
+    text = text.replace("|", "/")
+    return text if len(text) <= max_chars else text[:max_chars - 1] + "…"
+
+
+def table(rows: List[Dict[str, Any]]) -> str:
+    """Rows of similar dicts as a header line plus one `|`-separated line per row.
+
+    Keys are written once instead of once per object, and columns that are
+    empty in every row are left out.
+    """
+    columns: List[str] = []
+    for row in rows:
+        for key in row:
+            if key not in columns:
+                columns.append(key)
+    columns = [c for c in columns if not all(is_empty(row.get(c)) for row in rows)]
+    lines = ["|".join(columns)]
+    for row in rows:
+        lines.append("|".join("" if is_empty(row.get(c)) else _scalar(row[c]) for c in columns))
+    return "\n".join(lines)
+
+
+def serialize(value: Any, max_items: Optional[int] = None) -> str:
+    """Token-lean text for a scraped value.
+
+    Lists of objects become tables, lists of scalars a `; `-joined line and
+    dicts one `key: value` line per non-empty entry, with anything nested
+    deeper written as compact JSON. Lists are cut to `max_items` with a note
+    saying how many were left out.
+    """
+    if isinstance(value, (list, tuple)):
+        items = [v for v in value if not is_empty(v)]
+        shown = items[:max_items] if max_items is not None else items
+        if shown and all(isinstance(v, dict) for v in shown):
+            text = table(shown)
+        elif all(not isinstance(v, (dict, list)) for v in shown):
+            text = "; ".join(_scalar(v) for v in shown)
+        else:
+            text = "\n".join(compact_json(v) for v in shown)
+        if len(items) > len(shown):
+            text += f"\n(+{len(items) - len(shown)} more)"
+        return text
+    if isinstance(value, dict):
+        lines = []
+        for key, item in value.items():
+            if is_empty(item):
+                continue
+            if isinstance(item, (list, tuple)) and any(isinstance(v, dict) for v in item):
+                lines.append(f"{key}:\n{serialize(item, max_items)}")
+            elif isinstance(item, (list, tuple)):
+                lines.append(f"{key}: {serialize(item, max_items)}")
+            elif isinstance(item, dict):
+                lines.append(f"{key}: {compact_json(item)}")
+            else:
+                lines.append(f"{key}: {_scalar(item, max_chars=500)}")
+        return "\n".join(lines)
+    return _scalar(value, max_chars=500)
+
+
+class CompactPrompt:
+    """Prompt sections serialized with `serialize`, skipping the empty ones.
+
+    Each section takes an item cap (applied to every list inside it) and a
+    character cap, so one oversized extraction cannot crowd out the rest.
+    """
+
+    def __init__(self):
+        self._parts: List[str] = []
+        self.dropped: List[str] = []
+
+    def add(self, title: str, value: Any, max_items: Optional[int] = None, max_chars: Optional[int] = None):
+        if is_empty(value):
+            self.dropped.append(title)
+            return
+        text = serialize(value, max_items)
+        if max_chars is not None and len(text) > max_chars:
+            text = text[:max_chars].rsplit("\n", 1)[0] + "\n(truncated)"
+        self._parts.append(f"=== {title} ===\n{text}")
+
+    def add_text(self, title: str, text: str, fence: str = ""):
+        """Free text kept verbatim, optionally in a ``` fence"""
+        if is_empty(text):
+            self.dropped.append(title)
+            return
+        body = f"```{fence}\n{text}\n```" if fence else text
+        self._parts.append(f"=== {title} ===\n{body}")
+
+    def render(self) -> str:
+        return "\n\n".join(self._parts)
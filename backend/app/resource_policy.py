@@ -0,0 +1,153 @@
+import os
+from collections import Counter
+from typing import Any, Dict, FrozenSet, Iterable, Optional
+from urllib.parse import urlparse
+
+from playwright.async_api import Route
+
+# Analytics, tag managers, session replay and ad networks. Matched against the
+# request host and all of its parent domains.
+TRACKER_DOMAINS = frozenset([
+    "google-analytics.com", "googletagmanager.com", "analytics.google.com",
+    "doubleclick.net", "googlesyndication.com", "googleadservices.com", "adservice.google.com",
+    "facebook.net", "connect.facebook.net", "facebook.com/tr",
+    "hotjar.com", "hotjar.io", "fullstory.com", "mouseflow.com", "clarity.ms",
+    "segment.io", "segment.com", "mixpanel.com", "amplitude.com", "heap.io", "heapanalytics.com",
+    "newrelic.com", "nr-data.net", "sentry.io", "bugsnag.com",
+    "optimizely.com", "quantserve.com", "scorecardresearch.com", "chartbeat.com",
+    "criteo.com", "criteo.net", "taboola.com", "outbrain.com", "adnxs.com", "rubiconproject.com",
+    "pubmatic.com", "openx.net", "amazon-adsystem.com", "moatads.com", "adsrvr.org",
+    "bing.com/bat", "bat.bing.com", "ads-twitter.com", "analytics.tiktok.com", "snap.licdn.com",
+    "intercom.io", "intercomcdn.com", "hubspot.com", "hs-analytics.net", "hs-scripts.com"
+])
+
+# Tracker script/XHR responses that pages may wait on get an empty 200 instead
+# of a network error, so error handlers and retry loops never fire
+STUB_BODIES = {
+    "script": ("application/javascript", ""),
+    "xhr": ("application/json", "{}"),
+    "fetch": ("application/json", "{}")
+}
+
+PRESETS: Dict[str, Dict[str, Any]] = {
+    # Everything the page asks for
+    "full": {"block_trackers": False, "block_types": frozenset()},
+    # Whatever can change what the page looks like: drops trackers, ads and
+    # audio/video bodies, keeps images, fonts and stylesheets
+    "visual": {"block_trackers": True, "block_types": frozenset(["media"])},
+    # Image URLs and layout only: image, font and media bodies are never
+    # downloaded, so images report their layout size instead of natural size
+    "images-only-metadata": {"block_trackers": True, "block_types": frozenset(["media", "font", "image"])}
+}
+
+DEFAULT_PRESET = "visual"
+
+
+class ResourcePolicy:
+    """Request interception policy for scrape contexts.
+
+    Installs a `route` handler that aborts resource types the scrape does not
+    need and aborts or stubs requests to tracker and ad domains. Every
+    decision is counted so scrapes can report what they skipped.
+    """
+
+    def __init__(
+        self,
+        name: str = "full",
+        block_trackers: bool = False,
+        block_types: Iterable[str] = (),
+        extra_tracker_domains: Iterable[str] = ()
+    ):
+        self.name = name
+        self.block_trackers = block_trackers
+        self.block_types: FrozenSet[str] = frozenset(block_types)
+        self.tracker_domains: FrozenSet[str] = TRACKER_DOMAINS | frozenset(extra_tracker_domains)
+
+    @classmethod
+    def preset(cls, name: str) -> "ResourcePolicy":
+        if name not in PRESETS:
+            raise ValueError(f"Unknown resource policy: {name} (expected one of {', '.join(PRESETS)})")
+        extra = [d.strip() for d in os.getenv("RESOURCE_BLOCK_EXTRA_DOMAINS", "").split(",") if d.strip()]
+        return cls(name, extra_tracker_domains=extra, **PRESETS[name])
+
+    @classmethod
+    def from_env(cls, name: Optional[str] = None) -> "ResourcePolicy":
+        """The named preset, or SCRAPE_RESOURCE_POLICY when no name is given"""
+        return cls.preset(name or os.getenv("SCRAPE_RESOURCE_POLICY", DEFAULT_PRESET))
+
+    @property
+    def active(self) -> bool:
+        return self.block_trackers or bool(self.block_types)
+
+    def context_options(self) -> Dict[str, Any]:
+        # Service workers fetch outside page routing, so they would bypass the policy
+        return {"service_workers": "block"} if self.active else {}
+
+    def is_tracker(self, url: str) -> bool:
+        parsed = urlparse(url)
+        host = (parsed.hostname or "").lower()
+        parts = host.split(".")
+        for i in range(len(parts) - 1):
+            if ".".join(parts[i:]) in self.tracker_domains:
+                return True
+        # A few entries pin a path on a shared host (facebook.com/tr, bing.com/bat)
+        first_segment = parsed.path.strip("/").split("/")[0]
+        return bool(first_segment) and any(
+            f"{'.'.join(parts[i:])}/{first_segment}" in self.tracker_domains for i in range(len(parts) - 1)
+        )
+
+    async def apply(self, target: Any) -> "BlockLog":
+        """Install the policy on a BrowserContext or Page; returns the live block log"""
+        log = BlockLog(self.name)
+        if self.active:
+            await target.route("**/*", lambda route: self._handle(route, log))
+        return log
+
+    async def _handle(self, route: Route, log: "BlockLog"):
+        request = route.request
+        resource_type = request.resource_type
+        # Never interfere with the page we were asked to scrape
+        if request.is_navigation_request() and request.frame.parent_frame is None:
+            log.allowed += 1
+            await route.continue_()
+            return
+
+        if self.block_trackers and self.is_tracker(request.url):
+            log.record("tracker", request.url)
+            stub = STUB_BODIES.get(resource_type)
+            if stub:
+                await route.fulfill(status=200, content_type=stub[0], body=stub[1])
+            else:
+                await route.abort("blockedbyclient")
+            return
+
+        if resource_type in self.block_types:
+            log.record(resource_type, request.url)
+            await route.abort("blockedbyclient")
+            return
+
+        log.allowed += 1
+        await route.continue_()
+
+
+class BlockLog:
+    """What a ResourcePolicy let through and what it blocked during one scrape"""
+
+    def __init__(self, policy: str):
+        self.policy = policy
+        self.allowed = 0
+        self.blocked: Counter = Counter()
+        self.blocked_hosts: Counter = Counter()
+
+    def record(self, reason: str, url: str):
+        self.blocked[reason] += 1
+        self.blocked_hosts[urlparse(url).hostname or ""] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "policy": self.policy,
+            "allowed": self.allowed,
+            "blocked_total": sum(self.blocked.values()),
+            "blocked": dict(self.blocked),
+            "top_blocked_hosts": dict(self.blocked_hosts.most_common(10))
+        }
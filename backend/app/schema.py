@@ -0,0 +1,141 @@
+import re
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional
+
+# Computed-style values that are colors rather than font stacks
+_COLOR_RE = re.compile(r"^(?:#|rgba?\(|hsla?\()", re.IGNORECASE)
+
+
+def _known(cls, data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """The entries of `data` that are fields of `cls`, so old or foreign payloads still load"""
+    names = {f.name for f in fields(cls)}
+    return {key: value for key, value in (data or {}).items() if key in names}
+
+
+@dataclass(slots=True)
+class HtmlStructure:
+    cleaned_html: str = ""
+    # {"level", "text", "id", "class"} per heading, in document order
+    headings: List[Dict[str, Any]] = field(default_factory=list)
+    text_content: str = ""
+
+
+@dataclass(slots=True)
+class VisualElements:
+    buttons: List[Dict[str, Any]] = field(default_factory=list)
+    cards: List[Dict[str, Any]] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class InteractiveElements:
+    forms: List[str] = field(default_factory=list)
+    modals: List[str] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class MediaContent:
+    images: List[Dict[str, Any]] = field(default_factory=list)
+    videos: List[Dict[str, Any]] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class DesignSystem:
+    # Distinct computed color, background-color and font-family values
+    collected_styles: List[str] = field(default_factory=list)
+
+    @property
+    def colors(self) -> List[str]:
+        return [value for value in self.collected_styles if _COLOR_RE.match(value)]
+
+
+@dataclass(slots=True)
+class LayoutAnalysis:
+    width: int = 0
+    height: int = 0
+    # First 100 characters of text per <section>
+    sections: List[str] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class Typography:
+    fonts: List[str] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class Animations:
+    animated_elements: int = 0
+
+
+# Typed sections of a ScrapeResult; every other field is a plain dict
+_SECTIONS = {
+    "html_structure": HtmlStructure,
+    "visual_elements": VisualElements,
+    "interactive_elements": InteractiveElements,
+    "media_content": MediaContent,
+    "design_system": DesignSystem,
+    "layout_analysis": LayoutAnalysis,
+    "typography": Typography,
+    "animations": Animations
+}
+
+
+@dataclass(slots=True)
+class ScrapeResult:
+    """What WebsiteScraper produces and LLMWebsiteCloner consumes.
+
+    Fields left out of a projected scrape keep their empty defaults;
+    `to_dict` gives the JSON shape scrape_website has always returned.
+    """
+
+    url: str
+    title: str = ""
+    meta_data: Dict[str, str] = field(default_factory=dict)
+    # Name -> base64 image or artifact URL, with sizes and thumbnails in screenshot_info
+    screenshots: Dict[str, str] = field(default_factory=dict)
+    screenshot_info: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    html_structure: HtmlStructure = field(default_factory=HtmlStructure)
+    visual_elements: VisualElements = field(default_factory=VisualElements)
+    interactive_elements: InteractiveElements = field(default_factory=InteractiveElements)
+    media_content: MediaContent = field(default_factory=MediaContent)
+    design_system: DesignSystem = field(default_factory=DesignSystem)
+    layout_analysis: LayoutAnalysis = field(default_factory=LayoutAnalysis)
+    typography: Typography = field(default_factory=Typography)
+    animations: Animations = field(default_factory=Animations)
+    # Breakpoint width -> {"viewport", "visible_nav"}
+    responsive_behavior: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    performance_metrics: Dict[str, Any] = field(default_factory=dict)
+    accessibility: Dict[str, int] = field(default_factory=dict)
+    extractor_timings: Dict[str, float] = field(default_factory=dict)
+    resource_blocking: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ScrapeResult":
+        values = _known(cls, data)
+        for name, section in _SECTIONS.items():
+            if name in values and not isinstance(values[name], section):
+                values[name] = section(**_known(section, values[name]))
+        values.setdefault("url", "")
+        return cls(**values)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+# Every field a scrape can fill in besides url and title
+SCRAPE_FIELDS: FrozenSet[str] = frozenset(f.name for f in fields(ScrapeResult)) - {
+    "url", "title", "extractor_timings", "resource_blocking"
+}
+
+
+def validate_fields(
+    names: Optional[Iterable[str]],
+    allowed: FrozenSet[str] = SCRAPE_FIELDS
+) -> Optional[FrozenSet[str]]:
+    """None means every field; otherwise the requested names, rejecting any not in `allowed`"""
+    if names is None:
+        return None
+    requested = frozenset(names)
+    unknown = requested - allowed
+    if unknown:
+        raise ValueError(f"Unknown scrape fields: {', '.join(sorted(unknown))}")
+    return requested
@@ -1,8 +1,8 @@
 import asyncio
-import base64
 import json
 import re
-from typing import Dict, List, Optional, Any
+import time
+from typing import Awaitable, Callable, Dict, FrozenSet, Iterable, List, Optional, Any, Tuple
 from urllib.parse import urljoin, urlparse
 from io import BytesIO
 
@@ -11,18 +11,143 @@ from bs4 import BeautifulSoup
 from PIL import Image
 import httpx
 
+from .page_settle import PageSettler
+from .screenshots import ScreenshotEncoder, screenshot_metadata
+from .artifacts import ArtifactStore
+from .resource_policy import ResourcePolicy
+from .schema import ScrapeResult, validate_fields
+
+# lxml is several times faster than the pure-Python parser on large pages
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+
+# Resolves once the layout has stopped changing for `quietFrames` animation frames
+LAYOUT_STABLE_JS = """
+    async ({ quietFrames, timeoutMs }) => {
+        if (document.fonts && document.fonts.ready) await document.fonts.ready;
+        const deadline = performance.now() + timeoutMs;
+        let last = null;
+        let stable = 0;
+        while (performance.now() < deadline) {
+            await new Promise(resolve => requestAnimationFrame(() => resolve()));
+            const images = Array.from(document.images);
+            const signature = [
+                document.documentElement.scrollWidth,
+                document.documentElement.scrollHeight,
+                images.length,
+                images.filter(img => img.complete).length
+            ].join(',');
+            if (signature === last) {
+                if (++stable >= quietFrames) return true;
+            } else {
+                stable = 0;
+                last = signature;
+            }
+        }
+        return false;
+    }
+"""
+
+BREAKPOINT_PROBE_JS = """
+    () => {
+        return {
+            viewport: {
+                width: window.innerWidth,
+                height: window.innerHeight
+            },
+            visible_nav: !!document.querySelector('nav')
+        };
+    }
+"""
+
+
+class ParsedDocument:
+    """Page HTML serialized and parsed once, then shared by every HTML-based extractor"""
+
+    STRIP_TAGS = ['script', 'style', 'noscript', 'meta', 'link']
+
+    def __init__(self, html: str):
+        self.html = html
+        self.soup = BeautifulSoup(html, HTML_PARSER)
+        for tag in self.soup(self.STRIP_TAGS):
+            tag.decompose()
+        self.text = self.soup.get_text(separator=' ', strip=True)
+
+    @classmethod
+    async def from_page(cls, page: Page) -> "ParsedDocument":
+        html = await page.content()
+        # Parsing multi-megabyte pages is CPU heavy, keep it off the event loop
+        return await asyncio.to_thread(cls, html)
+
+
 class WebsiteScraper:
-    def __init__(self):
+    def __init__(
+        self,
+        style_sample_limit: Optional[int] = None,
+        style_visible_only: bool = False,
+        multi_viewport_mode: str = "parallel",
+        max_parallel_viewports: int = 4,
+        artifact_store: Optional[ArtifactStore] = None,
+        resource_policy: Optional[ResourcePolicy] = None
+    ):
         self.viewport_sizes = [
             {"width": 1920, "height": 1080, "name": "desktop"},
             {"width": 1024, "height": 768, "name": "tablet"},
             {"width": 375, "height": 812, "name": "mobile"}
         ]
+        # Computed-style sampling for very large DOMs: cap on elements and/or skip invisible ones
+        self.style_sample_limit = style_sample_limit
+        self.style_visible_only = style_visible_only
+        self.breakpoints = [320, 768, 1024, 1440]
+        # "parallel" renders each screenshot viewport in its own page of the shared
+        # context and probes the breakpoints on one more;
+        # "serial" resizes the scraped page through each viewport in turn
+        self.multi_viewport_mode = multi_viewport_mode
+        self.max_parallel_viewports = max_parallel_viewports
+        self.screenshot_encoder = ScreenshotEncoder.from_env()
+        # When set, screenshots are stored as blobs and `screenshots` maps names to URLs
+        self.artifact_store = artifact_store
+        # Applied to the whole context, so the parallel viewport pages follow it too
+        self.resource_policy = resource_policy or ResourcePolicy.from_env()
+
+        # Read-only extractors only query the DOM, so they run concurrently.
+        # Viewport extractors resize the page and run one at a time afterwards.
+        self.read_only_extractors: Dict[str, Callable[[Page], Awaitable[Any]]] = {
+            "meta_data": self._extract_meta_data,
+            "visual_elements": self._extract_visual_elements,
+            "interactive_elements": self._extract_interactive_elements,
+            "media_content": self._extract_media_content,
+            "layout_analysis": self._analyze_advanced_layout,
+            "performance_metrics": self._measure_performance,
+            "accessibility": self._analyze_accessibility
+        }
+        self.viewport_extractors: Dict[str, Callable[[Page], Awaitable[Any]]] = {
+            "screenshots": self._capture_advanced_screenshots,
+            "responsive_behavior": self._analyze_responsive_advanced
+        }
 
-    async def scrape_website(self, url: str) -> Dict[str, Any]:
+    async def scrape_website(self, url: str, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """JSON-ready scrape; see `scrape` for `fields`"""
+        return (await self.scrape(url, fields)).to_dict()
+
+    async def scrape(self, url: str, fields: Optional[Iterable[str]] = None) -> ScrapeResult:
+        """Scrape `url`, computing only the ScrapeResult fields named in `fields` (all when None).
+
+        Extractors whose output nobody asked for never run; their fields keep
+        the schema's empty defaults.
+        """
+        wanted = validate_fields(fields)
         async with async_playwright() as p:
             browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context(viewport={"width": 1920, "height": 1080})
+            context = await browser.new_context(
+                viewport={"width": 1920, "height": 1080},
+                **self.resource_policy.context_options()
+            )
+            block_log = await self.resource_policy.apply(context)
             page = await context.new_page()
 
             try:
@@ -31,34 +156,98 @@ class WebsiteScraper:
                 await self._handle_overlays(page)
                 await self._comprehensive_scroll(page)
 
-                html_content = await page.content()
                 title = await page.title()
-                soup = BeautifulSoup(html_content, 'html.parser')
-                for tag in soup(['script', 'style', 'noscript', 'meta', 'link']):
-                    tag.decompose()
-
-                body_text = soup.get_text(separator=' ', strip=True)
+                results, timings = await self._run_extractors(page, wanted)
 
-                return {
+                return ScrapeResult.from_dict({
+                    **results,
                     "url": url,
                     "title": title,
-                    "meta_data": await self._extract_meta_data(page),
-                    "screenshots": await self._capture_advanced_screenshots(page),
-                    "html_structure": await self._extract_advanced_html(page),
-                    "visual_elements": await self._extract_visual_elements(page),
-                    "interactive_elements": await self._extract_interactive_elements(page),
-                    "media_content": await self._extract_media_content(page),
-                    "design_system": await self._extract_design_system(page),
-                    "layout_analysis": await self._analyze_advanced_layout(page),
-                    "typography": await self._analyze_typography(page),
-                    "animations": await self._detect_animations(page),
-                    "responsive_behavior": await self._analyze_responsive_advanced(page),
-                    "performance_metrics": await self._measure_performance(page),
-                    "accessibility": await self._analyze_accessibility(page)
-                }
+                    "extractor_timings": timings,
+                    "resource_blocking": block_log.to_dict()
+                })
             finally:
                 await browser.close()
 
+    async def _run_extractors(
+        self,
+        page: Page,
+        wanted: Optional[FrozenSet[str]] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        """Run read-only extractors concurrently, then viewport extractors serially.
+
+        Only extractors feeding a field in `wanted` run (all when None).
+        Returns the results keyed by output field plus per-extractor wall time in ms.
+        """
+        timings: Dict[str, float] = {}
+
+        def needed(*names: str) -> bool:
+            return wanted is None or any(name in wanted for name in names)
+
+        async def timed(name: str, awaitable: Awaitable[Any]) -> Any:
+            start = time.perf_counter()
+            try:
+                return await awaitable
+            finally:
+                timings[name] = round((time.perf_counter() - start) * 1000, 1)
+
+        want_screenshots = needed("screenshots", "screenshot_info")
+        want_breakpoints = needed("responsive_behavior")
+
+        # The HTML parse and the style sweep share the concurrent phase with the DOM queries
+        concurrent = {
+            name: timed(name, extractor(page))
+            for name, extractor in self.read_only_extractors.items()
+            if needed(name)
+        }
+        if needed("html_structure"):
+            concurrent["html_parse"] = timed("html_parse", ParsedDocument.from_page(page))
+        if needed("design_system", "typography", "animations"):
+            concurrent["style_sweep"] = timed("style_sweep", self._collect_styles(page))
+        if self.multi_viewport_mode == "parallel" and (want_screenshots or want_breakpoints):
+            # Separate pages never resize the scraped one, so this overlaps the DOM queries too
+            concurrent["multi_viewport"] = timed(
+                "multi_viewport",
+                self._capture_viewports_parallel(page, want_screenshots, want_breakpoints)
+            )
+
+        start = time.perf_counter()
+        values = await asyncio.gather(*concurrent.values())
+        timings["concurrent_total"] = round((time.perf_counter() - start) * 1000, 1)
+        results = dict(zip(concurrent.keys(), values))
+
+        document = results.pop("html_parse", None)
+        styles = results.pop("style_sweep", None)
+        if document is not None:
+            results["html_structure"] = self._extract_advanced_html(document)
+        if styles is not None:
+            results["design_system"] = self._extract_design_system(styles)
+            results["typography"] = self._analyze_typography(styles)
+            results["animations"] = self._detect_animations(styles)
+
+        viewports = results.pop("multi_viewport", None)
+        if viewports is not None:
+            results.update(viewports)
+        elif self.multi_viewport_mode != "parallel":
+            wanted_viewports = {"screenshots": want_screenshots, "responsive_behavior": want_breakpoints}
+            for name, extractor in self.viewport_extractors.items():
+                if wanted_viewports.get(name, needed(name)):
+                    results[name] = await timed(name, extractor(page))
+
+        # `screenshots` maps name -> base64 image (or artifact URL); sizes and thumbnails go alongside
+        encoded = results.pop("screenshots", {})
+        if self.artifact_store:
+            results["screenshots"], results["screenshot_info"] = {}, {}
+            for name, shot in encoded.items():
+                url, info = await self.artifact_store.externalize_screenshot(shot)
+                results["screenshots"][name] = url
+                results["screenshot_info"][name] = info
+        else:
+            results["screenshots"] = {name: shot["data"] for name, shot in encoded.items()}
+            results["screenshot_info"] = {name: screenshot_metadata(shot) for name, shot in encoded.items()}
+
+        return results, timings
+
     async def _smart_navigation(self, page: Page, url: str):
         strategies = [
             {"wait_until": "networkidle", "timeout": 30000},
@@ -163,15 +352,11 @@ class WebsiteScraper:
             }
         """)
 
-    async def _extract_advanced_html(self, page: Page) -> Dict[str, Any]:
-        html_content = await page.content()
-        soup = BeautifulSoup(html_content, 'html.parser')
-        for tag in soup(['script', 'style', 'noscript', 'meta', 'link']):
-            tag.decompose()
+    def _extract_advanced_html(self, document: ParsedDocument) -> Dict[str, Any]:
         return {
-            "cleaned_html": str(soup)[:15000],
-            "headings": self._extract_headings_hierarchy(soup),
-            "text_content": soup.get_text(separator=' ', strip=True)[:500]
+            "cleaned_html": str(document.soup)[:15000],
+            "headings": self._extract_headings_hierarchy(document.soup),
+            "text_content": document.text[:500]
         }
 
     def _extract_headings_hierarchy(self, soup: BeautifulSoup) -> List[Dict[str, Any]]:
@@ -187,12 +372,12 @@ class WebsiteScraper:
         return headings
 
     async def _capture_advanced_screenshots(self, page: Page) -> Dict[str, Any]:
+        """Encoded screenshot per viewport name (see ScreenshotEncoder.encode)"""
         screenshots = {}
         for viewport in self.viewport_sizes:
             await page.set_viewport_size({"width": viewport["width"], "height": viewport["height"]})
             await page.wait_for_timeout(2000)
-            screenshot = await page.screenshot(full_page=True)
-            screenshots[viewport["name"]] = base64.b64encode(screenshot).decode()
+            screenshots[viewport["name"]] = await self.screenshot_encoder.capture(page)
         return screenshots
 
     async def _extract_visual_elements(self, page: Page) -> Dict[str, Any]:
@@ -241,19 +426,45 @@ class WebsiteScraper:
             }
         """)
 
-    async def _extract_design_system(self, page: Page) -> Dict[str, Any]:
+    async def _collect_styles(self, page: Page) -> Dict[str, Any]:
+        """Single getComputedStyle sweep feeding the design system, typography and animation analyses"""
         return await page.evaluate("""
-            () => {
+            ({ limit, visibleOnly }) => {
+                let elements = Array.from(document.querySelectorAll('*'));
+                const total = elements.length;
+                if (visibleOnly) {
+                    elements = elements.filter(el => el.getClientRects().length > 0);
+                }
+                if (limit && elements.length > limit) {
+                    const step = elements.length / limit;
+                    const sampled = [];
+                    for (let i = 0; i < limit; i++) sampled.push(elements[Math.floor(i * step)]);
+                    elements = sampled;
+                }
+
                 const styles = new Set();
-                document.querySelectorAll('*').forEach(el => {
+                const fonts = new Set();
+                let animated = 0;
+                for (const el of elements) {
                     const s = window.getComputedStyle(el);
                     styles.add(s.color);
                     styles.add(s.backgroundColor);
                     styles.add(s.fontFamily);
-                });
-                return { collected_styles: Array.from(styles).filter(Boolean) };
+                    if (s.fontFamily) fonts.add(s.fontFamily);
+                    if (s.animationName !== 'none' || s.transition !== 'all 0s ease 0s') animated++;
+                }
+                return {
+                    collected_styles: Array.from(styles).filter(Boolean),
+                    fonts: Array.from(fonts),
+                    animated_elements: animated,
+                    sampled_elements: elements.length,
+                    total_elements: total
+                };
             }
-        """)
+        """, {"limit": self.style_sample_limit, "visibleOnly": self.style_visible_only})
+
+    def _extract_design_system(self, styles: Dict[str, Any]) -> Dict[str, Any]:
+        return {"collected_styles": styles["collected_styles"]}
 
     async def _analyze_advanced_layout(self, page: Page) -> Dict[str, Any]:
         return await page.evaluate("""
@@ -267,49 +478,87 @@ class WebsiteScraper:
             }
         """)
 
-    async def _analyze_typography(self, page: Page) -> Dict[str, Any]:
-        return await page.evaluate("""
-            () => {
-                const fonts = new Set();
-                document.querySelectorAll('*').forEach(el => {
-                    const font = window.getComputedStyle(el).fontFamily;
-                    if (font) fonts.add(font);
-                });
-                return { fonts: Array.from(fonts) };
-            }
-        """)
+    def _analyze_typography(self, styles: Dict[str, Any]) -> Dict[str, Any]:
+        return {"fonts": styles["fonts"]}
 
-    async def _detect_animations(self, page: Page) -> Dict[str, Any]:
-        return await page.evaluate("""
-            () => {
-                const animated = Array.from(document.querySelectorAll('*')).filter(el => {
-                    const style = window.getComputedStyle(el);
-                    return style.animationName !== 'none' || style.transition !== 'all 0s ease 0s';
-                });
-                return { animated_elements: animated.length };
-            }
-        """)
+    def _detect_animations(self, styles: Dict[str, Any]) -> Dict[str, Any]:
+        return {"animated_elements": styles["animated_elements"]}
 
     async def _analyze_responsive_advanced(self, page: Page) -> Dict[str, Any]:
-        breakpoints = [320, 768, 1024, 1440]
         responsive_data = {}
-        for width in breakpoints:
+        for width in self.breakpoints:
             await page.set_viewport_size({"width": width, "height": 800})
             await page.wait_for_timeout(500)
-            layout_data = await page.evaluate("""
-                () => {
-                    return {
-                        viewport: {
-                            width: window.innerWidth,
-                            height: window.innerHeight
-                        },
-                        visible_nav: !!document.querySelector('nav')
-                    };
-                }
-            """)
+            layout_data = await page.evaluate(BREAKPOINT_PROBE_JS)
             responsive_data[str(width)] = layout_data
         return responsive_data
 
+    async def _capture_viewports_parallel(
+        self,
+        page: Page,
+        screenshots: bool = True,
+        breakpoints: bool = True
+    ) -> Dict[str, Any]:
+        """Render the screenshot viewports and probe the breakpoints on separate pages, concurrently.
+
+        Each screenshot viewport gets its own page; all breakpoints are probed
+        in turn on one more page, resized between probes, so the site is
+        loaded once for them rather than once per width. The pages share the
+        scraped page's context, and with it the HTTP cache and cookies
+        (consent banners already dismissed stay dismissed). The output has the
+        same shape as _capture_advanced_screenshots and
+        _analyze_responsive_advanced combined; either half can be skipped.
+        """
+        url = page.url
+        semaphore = asyncio.Semaphore(self.max_parallel_viewports)
+
+        async def open_view(width: int, height: int) -> Page:
+            view = await page.context.new_page()
+            await view.set_viewport_size({"width": width, "height": height})
+            await view.goto(url, wait_until="domcontentloaded", timeout=30000)
+            return view
+
+        async def capture(width: int, height: int) -> str:
+            async with semaphore:
+                view = await open_view(width, height)
+                try:
+                    # Scroll through so lazy content is in the full-page capture
+                    await PageSettler.from_env().settle(view)
+                    await view.evaluate(LAYOUT_STABLE_JS, {"quietFrames": 10, "timeoutMs": 5000})
+                    return await self.screenshot_encoder.capture(view)
+                finally:
+                    await view.close()
+
+        async def probe(widths: List[int]) -> Dict[str, Any]:
+            async with semaphore:
+                view = await open_view(widths[0], 800)
+                try:
+                    responsive_data = {}
+                    for width in widths:
+                        await view.set_viewport_size({"width": width, "height": 800})
+                        await view.evaluate(LAYOUT_STABLE_JS, {"quietFrames": 10, "timeoutMs": 5000})
+                        responsive_data[str(width)] = await view.evaluate(BREAKPOINT_PROBE_JS)
+                    return responsive_data
+                finally:
+                    await view.close()
+
+        viewports = self.viewport_sizes if screenshots else []
+        widths = list(self.breakpoints) if breakpoints else []
+        jobs = [capture(v["width"], v["height"]) for v in viewports]
+        if widths:
+            jobs.append(probe(widths))
+        values = await asyncio.gather(*jobs)
+
+        output: Dict[str, Any] = {}
+        if screenshots:
+            output["screenshots"] = {
+                viewport["name"]: value
+                for viewport, value in zip(viewports, values[:len(viewports)])
+            }
+        if breakpoints:
+            output["responsive_behavior"] = values[-1] if widths else {}
+        return output
+
     async def _measure_performance(self, page: Page) -> Dict[str, Any]:
         return await page.evaluate("""
             () => JSON.parse(JSON.stringify(window.performance.timing))
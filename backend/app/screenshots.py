@@ -0,0 +1,161 @@
+import asyncio
+import base64
+import os
+from io import BytesIO
+from typing import Any, Dict, List
+
+from PIL import Image
+from playwright.async_api import Page
+
+MIME_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg", "png": "image/png"}
+
+# libwebp cannot encode images taller or wider than this
+WEBP_MAX_DIMENSION = 16383
+
+
+class ScreenshotEncoder:
+    """Turns raw PNG captures into compact, size-bounded WebP/JPEG payloads.
+
+    Pages are downscaled to `max_width`. They are cut off at `max_height`
+    output pixels, or split into `tile_height` tiles when tiling is on. Each
+    capture also gets a small thumbnail, and byte sizes are reported so
+    callers can see what they are shipping.
+    """
+
+    def __init__(
+        self,
+        image_format: str = "webp",
+        quality: int = 70,
+        max_width: int = 1280,
+        max_height: int = 10000,
+        tile_height: int = 0,
+        thumbnail_width: int = 320
+    ):
+        if image_format not in MIME_TYPES:
+            raise ValueError(f"Unsupported screenshot format: {image_format}")
+        self.image_format = image_format
+        self.quality = quality
+        self.max_width = max_width
+        self.max_height = max_height
+        self.tile_height = tile_height
+        self.thumbnail_width = thumbnail_width
+
+    @classmethod
+    def from_env(cls) -> "ScreenshotEncoder":
+        return cls(
+            image_format=os.getenv("SCREENSHOT_FORMAT", "webp").lower(),
+            quality=int(os.getenv("SCREENSHOT_QUALITY", "70")),
+            max_width=int(os.getenv("SCREENSHOT_MAX_WIDTH", "1280")),
+            max_height=int(os.getenv("SCREENSHOT_MAX_HEIGHT", "10000")),
+            tile_height=int(os.getenv("SCREENSHOT_TILE_HEIGHT", "0")),
+            thumbnail_width=int(os.getenv("SCREENSHOT_THUMBNAIL_WIDTH", "320"))
+        )
+
+    @property
+    def mime_type(self) -> str:
+        return MIME_TYPES[self.image_format]
+
+    async def capture(self, page: Page) -> Dict[str, Any]:
+        """Full-page capture clipped to the height we will actually keep, then encoded off the event loop"""
+        size = await page.evaluate("""
+            () => ({
+                width: window.innerWidth,
+                height: Math.max(document.body ? document.body.scrollHeight : 0,
+                                 document.documentElement.scrollHeight)
+            })
+        """)
+        scale = min(1.0, self.max_width / max(size["width"], 1))
+        capture_height = min(size["height"], int(self.max_height / scale))
+        png = await page.screenshot(
+            full_page=True,
+            type="png",
+            clip={"x": 0, "y": 0, "width": size["width"], "height": max(capture_height, 1)}
+        )
+        encoded = await asyncio.to_thread(self.encode, png)
+        encoded["page_height"] = size["height"]
+        encoded["truncated"] = encoded["truncated"] or capture_height < size["height"]
+        return encoded
+
+    def encode(self, png_bytes: bytes) -> Dict[str, Any]:
+        """Encode a PNG capture; returns base64 data plus size metadata"""
+        with Image.open(BytesIO(png_bytes)) as source:
+            image = source.convert("RGB")
+
+        if image.width > self.max_width:
+            height = round(image.height * self.max_width / image.width)
+            image = image.resize((self.max_width, height), Image.LANCZOS)
+
+        truncated = image.height > self.max_height
+        if truncated:
+            image = image.crop((0, 0, image.width, self.max_height))
+
+        tile_height = self.tile_height
+        if self.image_format == "webp" and image.height > WEBP_MAX_DIMENSION:
+            tile_height = min(tile_height or WEBP_MAX_DIMENSION, WEBP_MAX_DIMENSION)
+
+        tiles: List[Dict[str, Any]] = []
+        main_bytes = None
+        if tile_height and image.height > tile_height:
+            for top in range(0, image.height, tile_height):
+                tile = image.crop((0, top, image.width, min(top + tile_height, image.height)))
+                data = self._encode_image(tile)
+                # The above-the-fold tile doubles as the primary image
+                main_bytes = main_bytes or data
+                tiles.append({
+                    "y": top,
+                    "width": tile.width,
+                    "height": tile.height,
+                    "bytes": len(data),
+                    "data": base64.b64encode(data).decode()
+                })
+        else:
+            main_bytes = self._encode_image(image)
+
+        thumbnail = image.copy()
+        thumbnail.thumbnail((self.thumbnail_width, self.thumbnail_width * 4))
+        thumbnail_bytes = self._encode_image(thumbnail)
+
+        return {
+            "format": self.image_format,
+            "mime_type": self.mime_type,
+            "width": image.width,
+            "height": image.height,
+            "truncated": truncated,
+            "original_bytes": len(png_bytes),
+            "bytes": len(main_bytes),
+            "data": base64.b64encode(main_bytes).decode(),
+            "tiles": tiles,
+            "thumbnail": {
+                "width": thumbnail.width,
+                "height": thumbnail.height,
+                "bytes": len(thumbnail_bytes),
+                "data": base64.b64encode(thumbnail_bytes).decode()
+            }
+        }
+
+    def _encode_image(self, image: Image.Image) -> bytes:
+        buffer = BytesIO()
+        if self.image_format == "png":
+            image.save(buffer, format="PNG", optimize=True)
+        elif self.image_format == "jpeg":
+            image.save(buffer, format="JPEG", quality=self.quality, optimize=True, progressive=True)
+        else:
+            image.save(buffer, format="WEBP", quality=self.quality, method=4)
+        return buffer.getvalue()
+
+
+def screenshot_metadata(encoded: Dict[str, Any]) -> Dict[str, Any]:
+    """Everything about an encoded screenshot except image data: sizes and byte counts only.
+
+    The tiles and thumbnail lose their base64 too; without an artifact store
+    there is nowhere to point them, and inlining them would grow the response
+    by more than the primary image it sits next to.
+    """
+    def strip(part: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in part.items() if key != "data"}
+
+    info = strip(encoded)
+    info["tiles"] = [strip(tile) for tile in encoded.get("tiles", [])]
+    if encoded.get("thumbnail"):
+        info["thumbnail"] = strip(encoded["thumbnail"])
+    return info
@@ -0,0 +1,71 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+class _Call:
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.waiters = 0
+        self.listeners: List[Callable[..., None]] = []
+
+    def broadcast(self, *args):
+        for listener in list(self.listeners):
+            try:
+                listener(*args)
+            except Exception as e:
+                print("⚠️ Single-flight listener failed:", str(e))
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one execution.
+
+    The first caller for a key starts `fn`; later callers arriving while it
+    runs await the same task and get the same result or exception. A caller
+    that is cancelled (e.g. its client disconnected) only stops waiting; the
+    shared work is cancelled once the last waiter has gone.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self.shared = 0
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"in_flight": self.in_flight(), "shared": self.shared}
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[Callable[..., None]], Awaitable[Any]],
+        listener: Optional[Callable[..., None]] = None
+    ) -> Any:
+        """Run `fn(broadcast)` once per key; `broadcast(*args)` reaches every waiter's listener"""
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call()
+            call.task = asyncio.create_task(fn(call.broadcast))
+            call.task.add_done_callback(lambda _: self._release(key, call))
+            self._calls[key] = call
+        else:
+            self.shared += 1
+
+        call.waiters += 1
+        if listener:
+            call.listeners.append(listener)
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if listener:
+                call.listeners.remove(listener)
+            if call.waiters == 0 and not call.task.done():
+                # Nobody is left to use the result; callers arriving from
+                # now on must start a fresh call rather than join this one
+                self._release(key, call)
+                call.task.cancel()
+
+    def _release(self, key: str, call: _Call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
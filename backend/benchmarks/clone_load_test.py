@@ -0,0 +1,189 @@
+"""Load test /clone against a running server, ideally with an offline LLM.
+
+Usage (from backend/):
+    LLM_BACKEND=stub uvicorn main:app --port 8000 &
+    python -m benchmarks.clone_load_test --concurrency 8 --requests 64 --unique
+
+By default the target site is a fixture page served locally (see
+fixture_server.py), so neither the scrape nor the generation leaves the
+machine. --unique adds a query string per request so every clone misses the
+scrape and generation caches. The report gives throughput, latency
+percentiles (and time to first token for --endpoint stream), and the server's
+event-loop lag over the run, read from /metrics.
+"""
+import argparse
+import asyncio
+import json
+import re
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.fixture_server import FIXTURE_PAGES, FixtureServer
+from benchmarks.scrape_benchmark import percentile
+
+_BUCKET_RE = re.compile(r'^cloner_event_loop_lag_seconds_bucket\{le="([^"]+)"\} (\S+)$')
+_TOTAL_RE = re.compile(r'^cloner_event_loop_lag_seconds_(sum|count) (\S+)$')
+
+
+async def read_loop_lag(client: httpx.AsyncClient, api: str) -> Optional[Dict[str, Any]]:
+    """Cumulative event-loop lag histogram from the server's /metrics"""
+    try:
+        response = await client.get(f"{api}/metrics")
+        response.raise_for_status()
+    except httpx.HTTPError:
+        return None
+    buckets: List[Tuple[float, float]] = []
+    totals: Dict[str, float] = {}
+    for line in response.text.splitlines():
+        match = _BUCKET_RE.match(line)
+        if match:
+            buckets.append((float(match.group(1).replace("+Inf", "inf")), float(match.group(2))))
+            continue
+        match = _TOTAL_RE.match(line)
+        if match:
+            totals[match.group(1)] = float(match.group(2))
+    return {"buckets": buckets, "sum": totals.get("sum", 0.0), "count": totals.get("count", 0.0)}
+
+
+def lag_delta(before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Mean and bucket-resolution p99/max lag for the ticks that happened between two reads"""
+    if not before or not after:
+        return None
+    count = after["count"] - before["count"]
+    if count <= 0:
+        return None
+    previous = dict(before["buckets"])
+    cumulative = [(bound, value - previous.get(bound, 0.0)) for bound, value in after["buckets"]]
+
+    def upper_bound(fraction: float) -> float:
+        for bound, value in cumulative:
+            if value >= count * fraction:
+                return bound
+        return float("inf")
+
+    return {
+        "ticks": int(count),
+        "mean_ms": round((after["sum"] - before["sum"]) / count * 1000, 2),
+        "p99_le_ms": upper_bound(0.99) * 1000,
+        "max_le_ms": upper_bound(1.0) * 1000
+    }
+
+
+async def clone_once(client: httpx.AsyncClient, api: str, endpoint: str, site: str) -> Dict[str, Any]:
+    start = time.perf_counter()
+    first_token = None
+    try:
+        if endpoint == "stream":
+            success = False
+            async with client.stream("POST", f"{api}/clone/stream", json={"url": site}) as response:
+                response.raise_for_status()
+                event = None
+                async for line in response.aiter_lines():
+                    if line.startswith("event: "):
+                        event = line[7:]
+                        if event == "token" and first_token is None:
+                            first_token = time.perf_counter() - start
+                    elif line.startswith("data: ") and event in ("done", "error"):
+                        success = event == "done" and json.loads(line[6:]).get("success", False)
+        else:
+            response = await client.post(f"{api}/clone", json={"url": site})
+            response.raise_for_status()
+            success = response.json().get("success", False)
+        error = None if success else "clone reported failure"
+    except httpx.HTTPError as e:
+        success, error = False, f"{type(e).__name__}: {e}"
+    return {
+        "ok": success,
+        "error": error,
+        "latency_ms": (time.perf_counter() - start) * 1000,
+        "ttft_ms": first_token * 1000 if first_token is not None else None
+    }
+
+
+async def run(args: argparse.Namespace, site: str) -> int:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+        lag_before = await read_loop_lag(client, args.api)
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def worker(i: int) -> Dict[str, Any]:
+            url = f"{site}?load={i}" if args.unique else site
+            async with semaphore:
+                return await clone_once(client, args.api, args.endpoint, url)
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(worker(i) for i in range(args.requests)))
+        wall = time.perf_counter() - start
+        lag = lag_delta(lag_before, await read_loop_lag(client, args.api))
+
+    ok = [r for r in results if r["ok"]]
+    latencies = [r["latency_ms"] for r in ok]
+    ttfts = [r["ttft_ms"] for r in ok if r["ttft_ms"] is not None]
+    report = {
+        "endpoint": args.endpoint,
+        "concurrency": args.concurrency,
+        "requests": len(results),
+        "succeeded": len(ok),
+        "failed": len(results) - len(ok),
+        "errors": sorted({r["error"] for r in results if r["error"]})[:5],
+        "wall_s": round(wall, 2),
+        "throughput_rps": round(len(ok) / wall, 2) if wall else 0.0,
+        "latency_ms": {
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": round(max(latencies), 1) if latencies else 0.0
+        },
+        "ttft_ms": {"p50": percentile(ttfts, 50), "p95": percentile(ttfts, 95)} if ttfts else None,
+        "server_event_loop_lag": lag
+    }
+
+    print(
+        f"{'✅' if not report['failed'] else '❌'} {report['succeeded']}/{report['requests']} clones in "
+        f"{report['wall_s']}s at concurrency {args.concurrency}: {report['throughput_rps']} req/s"
+    )
+    print(f"    latency p50 {report['latency_ms']['p50']}ms  p95 {report['latency_ms']['p95']}ms  "
+          f"p99 {report['latency_ms']['p99']}ms  max {report['latency_ms']['max']}ms")
+    if report["ttft_ms"]:
+        print(f"    first token p50 {report['ttft_ms']['p50']}ms  p95 {report['ttft_ms']['p95']}ms")
+    if lag:
+        print(f"    server loop lag mean {lag['mean_ms']}ms  p99 <= {lag['p99_le_ms']}ms  "
+              f"max <= {lag['max_le_ms']}ms over {lag['ticks']} ticks")
+    else:
+        print("    server loop lag unavailable (is /metrics reachable?)")
+    for error in report["errors"]:
+        print(f"    error: {error}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.output}")
+    return 0 if not report["failed"] else 1
+
+
+def main(args: argparse.Namespace) -> int:
+    if args.site:
+        return asyncio.run(run(args, args.site))
+    with FixtureServer(host=args.fixture_host, latency_ms=args.fixture_latency_ms) as server:
+        site = server.url_for(args.fixture)
+        print(f"📦 Target fixture: {site}")
+        return asyncio.run(run(args, site))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--api", default="http://127.0.0.1:8000")
+    parser.add_argument("--endpoint", choices=("clone", "stream"), default="clone")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--unique", action="store_true", help="Make every request a cache miss")
+    parser.add_argument("--site", help="Clone this URL instead of a local fixture")
+    parser.add_argument("--fixture", choices=list(FIXTURE_PAGES), default="static")
+    parser.add_argument("--fixture-host", default="127.0.0.1")
+    parser.add_argument("--fixture-latency-ms", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--output", help="Write the JSON report here")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,175 @@
+"""Local HTTP server for the benchmark fixture corpus.
+
+Serves the HTML files in benchmarks/fixtures/ plus two generated routes:
+    /img/<width>x<height>/<seed>.svg   a solid-colour placeholder image
+    /large_dom.html                    a page with ~10k elements
+
+Every response is counted, so a benchmark can report how many bytes a
+scrape pulled over the network.
+"""
+import os
+import re
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+FIXTURE_PAGES = {
+    "static": "/static.html",
+    "lazy_gallery": "/lazy_gallery.html",
+    "large_dom": "/large_dom.html",
+    "spa": "/spa.html",
+    "cookie_banner": "/cookie_banner.html",
+    "css_backgrounds": "/css_backgrounds.html"
+}
+
+_IMAGE_RE = re.compile(r"^/img/(\d+)x(\d+)/(\d+)\.svg$")
+
+
+def placeholder_svg(width: int, height: int, seed: int) -> bytes:
+    hue = (seed * 47) % 360
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}">'
+        f'<rect width="100%" height="100%" fill="hsl({hue},55%,55%)"/>'
+        f'<text x="50%" y="50%" font-size="24" text-anchor="middle" fill="#fff">{seed}</text>'
+        f"</svg>"
+    ).encode()
+
+
+def large_dom_html(sections: int = 100, items_per_section: int = 24) -> bytes:
+    """~10k elements: sections of nested lists with links, text and the odd image"""
+    parts = [
+        "<!DOCTYPE html><html lang=\"en\"><head><meta charset=\"utf-8\"><title>Large DOM Fixture</title>",
+        "<style>body{font-family:Arial,sans-serif;margin:0 40px}section{margin:24px 0}"
+        "li{padding:2px 0}.item img{width:48px;height:48px;vertical-align:middle}</style></head><body>",
+        "<header><nav><a href=\"#\">Index</a> <a href=\"#\">Archive</a> <a href=\"#\">Search</a></nav></header>"
+    ]
+    for s in range(sections):
+        parts.append(f"<section class=\"section\"><h2>Section {s + 1}</h2><ul>")
+        for i in range(items_per_section):
+            image = f"<img src=\"/img/48x48/{1000 + s}.svg\" alt=\"\">" if i == 0 else ""
+            parts.append(
+                f"<li class=\"item\">{image}<a href=\"#s{s}-{i}\"><span>Entry {s}.{i}</span></a> "
+                f"<em>meta</em></li>"
+            )
+        parts.append("</ul></section>")
+    parts.append("</body></html>")
+    return "".join(parts).encode()
+
+
+class _FixtureHandler(SimpleHTTPRequestHandler):
+    server: "_FixtureHTTPServer"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory=FIXTURE_DIR, **kwargs)
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        match = _IMAGE_RE.match(path)
+        if match:
+            width, height, seed = (int(g) for g in match.groups())
+            self._send_generated(placeholder_svg(width, height, seed), "image/svg+xml")
+        elif path == "/large_dom.html":
+            self._send_generated(self.server.large_dom, "text/html; charset=utf-8")
+        else:
+            super().do_GET()
+
+    def _send_generated(self, body: bytes, content_type: str):
+        if self.server.latency_ms:
+            time.sleep(self.server.latency_ms / 1000)
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_response(self, code, message=None):
+        self.server.record_request()
+        super().send_response(code, message)
+
+    def setup(self):
+        super().setup()
+        # Counts headers and bodies of every response as they are written
+        self.wfile = _CountingWriter(self.wfile, self.server.record_bytes)
+
+
+class _CountingWriter:
+    def __init__(self, raw, on_write):
+        self.raw = raw
+        self.on_write = on_write
+
+    def write(self, data):
+        self.on_write(len(data))
+        return self.raw.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+
+class _FixtureHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency_ms: int):
+        super().__init__(address, _FixtureHandler)
+        self.latency_ms = latency_ms
+        self.large_dom = large_dom_html()
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.bytes_sent = 0
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def record_bytes(self, count: int):
+        with self._lock:
+            self.bytes_sent += count
+
+
+class FixtureServer:
+    """Runs the fixture server on a background thread; use as a context manager"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: int = 0):
+        self._server = _FixtureHTTPServer((host, port), latency_ms)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url_for(self, fixture: str) -> str:
+        return self.base_url + FIXTURE_PAGES[fixture]
+
+    def counters(self) -> Dict[str, int]:
+        return {"requests": self._server.requests, "bytes": self._server.bytes_sent}
+
+    def start(self) -> "FixtureServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FixtureServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    with FixtureServer(port=8765) as server:
+        print(f"Serving fixtures at {server.base_url}")
+        for name, path in FIXTURE_PAGES.items():
+            print(f"  {name:16} {server.base_url}{path}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,237 @@
+"""Benchmark the single-pass image walker against the original per-selector script.
+
+Usage (from backend/):
+    python -m benchmarks.image_extraction_benchmark https://example.com --runs 5
+
+For every URL both scripts run against the same settled page. The script
+prints median and max evaluate time and checks that both return identical
+image lists.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Any, Dict, List
+
+from playwright.async_api import async_playwright
+
+from app.image_extraction import COLLECT_IMAGES_JS
+from app.page_settle import PageSettler
+from main import SuperImageScraper
+
+# The image part of the extraction script as it was before the single-pass walker
+LEGACY_IMAGE_EXTRACTION_JS = r"""
+(imageSelectors) => {
+    const data = {};
+    const seenUrls = new Set();
+    const allImages = [];
+
+    // Helper function
+    function resolveUrl(url) {
+        if (!url) return null;
+        if (url.startsWith('data:')) return url;
+        if (url.startsWith('//')) return 'https:' + url;
+        if (url.startsWith('/')) return window.location.origin + url;
+        if (!url.startsWith('http')) return window.location.origin + '/' + url;
+        return url;
+    }
+
+    function getImageFormat(src) {
+        if (src.startsWith('data:')) {
+            const match = src.match(/data:image\/(\w+)/);
+            return match ? match[1] : 'unknown';
+        }
+        const match = src.match(/\.([a-zA-Z0-9]+)(?:\?|$)/);
+        return match ? match[1].toLowerCase() : 'unknown';
+    }
+
+    // MEGA IMAGE EXTRACTION
+    const selectors = imageSelectors;
+
+    for (const selector of selectors) {
+        try {
+            const elements = document.querySelectorAll(selector);
+
+            for (const el of elements) {
+                let src = null;
+                let width = 0;
+                let height = 0;
+                let alt = '';
+                let context = '';
+
+                if (el.tagName === 'IMG') {
+                    src = el.src || el.getAttribute('data-src') || 
+                          el.getAttribute('data-lazy') || el.getAttribute('data-original') ||
+                          el.getAttribute('data-img') || el.getAttribute('data-image');
+                    width = el.naturalWidth || el.width || el.offsetWidth || 0;
+                    height = el.naturalHeight || el.height || el.offsetHeight || 0;
+                    alt = el.alt || el.title || '';
+                    context = 'img-element';
+
+                } else if (el.tagName === 'SOURCE') {
+                    src = el.srcset?.split(',')[0]?.trim()?.split(' ')[0] || el.src;
+                    width = parseInt(el.getAttribute('width')) || 0;
+                    height = parseInt(el.getAttribute('height')) || 0;
+                    alt = 'source-element';
+                    context = 'source-element';
+
+                } else if (el.tagName === 'VIDEO') {
+                    src = el.poster;
+                    width = el.videoWidth || el.width || el.offsetWidth || 0;
+                    height = el.videoHeight || el.height || el.offsetHeight || 0;
+                    alt = 'video-thumbnail';
+                    context = 'video-poster';
+
+                } else if (el.tagName === 'SVG') {
+                    try {
+                        const serializer = new XMLSerializer();
+                        const svgString = serializer.serializeToString(el);
+                        src = 'data:image/svg+xml;base64,' + btoa(unescape(encodeURIComponent(svgString)));
+                        width = el.width?.baseVal?.value || el.offsetWidth || 0;
+                        height = el.height?.baseVal?.value || el.offsetHeight || 0;
+                        alt = 'svg-image';
+                        context = 'svg-element';
+                    } catch (e) { continue; }
+
+                } else if (el.tagName === 'CANVAS') {
+                    try {
+                        src = el.toDataURL();
+                        width = el.width || el.offsetWidth || 0;
+                        height = el.height || el.offsetHeight || 0;
+                        alt = 'canvas-image';
+                        context = 'canvas-element';
+                    } catch (e) { continue; }
+
+                } else {
+                    // Data attributes
+                    src = el.getAttribute('data-src') || el.getAttribute('data-lazy') ||
+                          el.getAttribute('data-original') || el.getAttribute('data-img') ||
+                          el.getAttribute('data-image') || el.getAttribute('data-background');
+                    width = el.offsetWidth || 0;
+                    height = el.offsetHeight || 0;
+                    alt = el.getAttribute('aria-label') || el.getAttribute('title') || '';
+                    context = 'data-attribute';
+                }
+
+                if (src) {
+                    const resolvedUrl = resolveUrl(src);
+                    if (resolvedUrl && !seenUrls.has(resolvedUrl)) {
+                        seenUrls.add(resolvedUrl);
+                        allImages.push({
+                            src: resolvedUrl,
+                            alt: alt,
+                            width: width,
+                            height: height,
+                            format: getImageFormat(resolvedUrl),
+                            context: context,
+                            is_base64: resolvedUrl.startsWith('data:')
+                        });
+                    }
+                }
+            }
+        } catch (e) {
+            console.log('Selector failed:', selector);
+        }
+    }
+
+    // Extract CSS background images
+    try {
+        const allElements = document.querySelectorAll('*');
+        for (const el of allElements) {
+            const style = window.getComputedStyle(el);
+            const bgImage = style.backgroundImage;
+
+            if (bgImage && bgImage !== 'none' && bgImage.includes('url(')) {
+                const matches = bgImage.match(/url\(["']?([^"')]+)["']?\)/g);
+                if (matches) {
+                    for (const match of matches) {
+                        const url = match.match(/url\(["']?([^"')]+)["']?\)/)[1];
+                        const resolvedUrl = resolveUrl(url);
+
+                        if (resolvedUrl && !seenUrls.has(resolvedUrl)) {
+                            seenUrls.add(resolvedUrl);
+                            allImages.push({
+                                src: resolvedUrl,
+                                alt: 'background-image',
+                                width: el.offsetWidth || 0,
+                                height: el.offsetHeight || 0,
+                                format: getImageFormat(resolvedUrl),
+                                context: 'css-background',
+                                is_base64: resolvedUrl.startsWith('data:')
+                            });
+                        }
+                    }
+                }
+            }
+        }
+    } catch (e) {
+        console.log('Background extraction failed');
+    }
+
+    // Sort images by size
+    allImages.sort((a, b) => (b.width * b.height) - (a.width * a.height));
+    return allImages;
+}
+"""
+
+WALKER_IMAGE_EXTRACTION_JS = "(selectorSpecs) => {\n" + COLLECT_IMAGES_JS + "\nreturn collectImages(selectorSpecs);\n}"
+
+
+async def time_evaluate(page, script: str, arg: Any, runs: int):
+    timings = []
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = await page.evaluate(script, arg)
+        timings.append((time.perf_counter() - start) * 1000)
+    return result, timings
+
+
+async def benchmark_url(browser, url: str, runs: int) -> Dict[str, Any]:
+    scraper = SuperImageScraper()
+    context = await browser.new_context(viewport={"width": 1920, "height": 1080})
+    try:
+        page = await context.new_page()
+        await page.goto(url, wait_until="domcontentloaded", timeout=60000)
+        await PageSettler.from_env().settle(page)
+
+        legacy_images, legacy_ms = await time_evaluate(page, LEGACY_IMAGE_EXTRACTION_JS, scraper.image_selectors, runs)
+        walker_images, walker_ms = await time_evaluate(page, WALKER_IMAGE_EXTRACTION_JS, scraper.selector_specs, runs)
+
+        return {
+            "url": url,
+            "images": len(walker_images),
+            "identical": json.dumps(legacy_images) == json.dumps(walker_images),
+            "legacy_median_ms": round(statistics.median(legacy_ms), 1),
+            "legacy_max_ms": round(max(legacy_ms), 1),
+            "walker_median_ms": round(statistics.median(walker_ms), 1),
+            "walker_max_ms": round(max(walker_ms), 1)
+        }
+    finally:
+        await context.close()
+
+
+async def main(urls: List[str], runs: int):
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        try:
+            for url in urls:
+                result = await benchmark_url(browser, url, runs)
+                speedup = result["legacy_median_ms"] / max(result["walker_median_ms"], 0.1)
+                print(
+                    f"{'✅' if result['identical'] else '❌'} {url}: {result['images']} images | "
+                    f"legacy {result['legacy_median_ms']}ms (max {result['legacy_max_ms']}) | "
+                    f"walker {result['walker_median_ms']}ms (max {result['walker_max_ms']}) | "
+                    f"{speedup:.1f}x"
+                )
+        finally:
+            await browser.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("urls", nargs="+")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.urls, args.runs))
@@ -0,0 +1,91 @@
+"""Local stand-in for the Anthropic Messages API.
+
+Usage (from backend/):
+    python -m benchmarks.llm_stub_server --port 8100 --first-token-ms 800 --tokens-per-second 60
+
+Then point the app at it instead of the real API:
+    LLM_BASE_URL=http://127.0.0.1:8100 ANTHROPIC_API_KEY=stub uvicorn main:app
+
+POST /v1/messages answers both plain and `"stream": true` requests with the
+same event sequence the real API sends. Timing comes from StubBackend, so the
+official SDK, HTTP connection pool and SSE parsing are exercised end to end.
+Set LLM_BACKEND=stub instead to skip HTTP entirely.
+"""
+import argparse
+import json
+import time
+from typing import Any, Dict
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+from app.llm_backends import StubBackend, estimate_tokens, prompt_text
+
+app = FastAPI(title="Anthropic Messages API stub")
+backend = StubBackend.from_env()
+
+
+def sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps({'type': event, **data})}\n\n"
+
+
+@app.post("/v1/messages")
+async def create_message(request: Request):
+    body = await request.json()
+    message_id = f"msg_stub_{int(time.time() * 1000)}"
+    input_tokens = estimate_tokens(prompt_text(body))
+    usage = {"input_tokens": input_tokens, "cache_creation_input_tokens": 0, "cache_read_input_tokens": 0}
+
+    if not body.get("stream"):
+        message = await backend.create_message(timeout=0, **body)
+        return {
+            "id": message_id,
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model"),
+            "content": [{"type": "text", "text": message.content[0].text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {**usage, "output_tokens": message.usage.output_tokens}
+        }
+
+    async def events():
+        yield sse("message_start", {"message": {
+            "id": message_id,
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model"),
+            "content": [],
+            "stop_reason": None,
+            "stop_sequence": None,
+            "usage": {**usage, "output_tokens": 1}
+        }})
+        yield sse("content_block_start", {"index": 0, "content_block": {"type": "text", "text": ""}})
+        yield sse("ping", {})
+        output_tokens = 0
+        async for text in backend.stream_text(timeout=0, **body):
+            output_tokens += estimate_tokens(text)
+            yield sse("content_block_delta", {"index": 0, "delta": {"type": "text_delta", "text": text}})
+        yield sse("content_block_stop", {"index": 0})
+        yield sse("message_delta", {
+            "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+            "usage": {"output_tokens": output_tokens}
+        })
+        yield sse("message_stop", {})
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--first-token-ms", type=float, default=backend.first_token_ms)
+    parser.add_argument("--tokens-per-second", type=float, default=backend.tokens_per_second)
+    parser.add_argument("--output-tokens", type=int, default=backend.output_tokens)
+    args = parser.parse_args()
+    backend.first_token_ms = args.first_token_ms
+    backend.tokens_per_second = args.tokens_per_second
+    backend.output_tokens = args.output_tokens
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,129 @@
+"""Measure LLMWebsiteCloner user-prompt size before and after compact serialization.
+
+Usage (from backend/):
+    python -m benchmarks.prompt_size_benchmark
+    python -m benchmarks.prompt_size_benchmark --min-reduction 0.3
+
+For every fixtures/scrape_*.json the script builds the user prompt twice:
+with the original pretty-printed JSON layout (kept below) and with the
+current compact one. It prints estimated tokens for both and exits non-zero
+if any fixture saves less than --min-reduction, or if the compact prompt
+lost content the model needs (the first heading, color and image of the
+scrape). The fixtures follow the ScrapeResult schema (app/schema.py).
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+from typing import Any, Dict, List
+
+# The prompt is built locally; never reach for the real API
+os.environ.setdefault("LLM_BACKEND", "stub")
+
+from app.llm_backends import estimate_tokens
+from app.llm_cloner import LLMWebsiteCloner
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def legacy_user_prompt(context: Dict[str, Any]) -> str:
+    """The user prompt as it was built before compact serialization"""
+    return f"""WEBSITE CLONING REQUEST
+
+Target Website: {context['url']}
+Page Title: {context['title']}
+
+=== VISUAL HIERARCHY ===
+{json.dumps(context.get('visual_hierarchy', {}), indent=2)}
+
+=== LAYOUT STRUCTURE ===
+Layout Analysis:
+{json.dumps(context.get('layout', {}), indent=2)}
+
+Responsive Breakpoints:
+{json.dumps(context.get('responsive_behavior', {}), indent=2)}
+
+=== UI COMPONENTS IDENTIFIED ===
+{json.dumps(context.get('components', {}), indent=2)}
+
+=== DESIGN SYSTEM ===
+Primary Colors (use these exact colors):
+{context.get('colors', [])[:8]}
+
+Typography Stack:
+{context.get('fonts', [])[:3]}
+
+=== CONTENT STRUCTURE ===
+Navigation Items: {context.get('html_structure', {}).get('navigation', [])[:10]}
+Headings Hierarchy: {context.get('html_structure', {}).get('headings', [])[:15]}
+
+Text Content:
+{json.dumps(context.get('text_content', {}), indent=2)}
+
+Media Content:
+{json.dumps(context.get('media_content', {}), indent=2)}
+
+=== INTERACTIVE ELEMENTS ===
+{json.dumps(context.get('interactions', {}), indent=2)}
+
+=== HTML STRUCTURE REFERENCE ===
+```html
+{context.get('html_structure', {}).get('body_html_preview', '')}
+```
+
+Following the cloning requirements above, generate a complete, production-ready HTML page that perfectly replicates this website's design and functionality."""
+
+
+def must_keep(context: Dict[str, Any]) -> List[str]:
+    """Strings from the scrape that have to survive into the compact prompt"""
+    html_structure = context.get("html_structure", {})
+    expected = []
+    for items, key in (
+        (html_structure.get("headings", []), "text"),
+        (context.get("media_content", {}).get("images", []), "src")
+    ):
+        if items and items[0].get(key):
+            expected.append(items[0][key])
+    if context.get("colors"):
+        expected.append(context["colors"][0])
+    return expected
+
+
+def main(args: argparse.Namespace) -> int:
+    cloner = LLMWebsiteCloner()
+    paths = sorted(glob.glob(os.path.join(FIXTURES, "scrape_*.json")))
+    if not paths:
+        print(f"❌ No scrape fixtures in {FIXTURES}")
+        return 1
+
+    failed = False
+    for path in paths:
+        with open(path) as f:
+            scrape_data = json.load(f)
+        context = cloner._prepare_context(scrape_data)
+        prompt = cloner._create_user_prompt(context)
+        before = estimate_tokens(legacy_user_prompt(context))
+        after = estimate_tokens(prompt)
+        reduction = 1 - after / before if before else 0.0
+        missing = [text for text in must_keep(context) if text not in prompt]
+
+        ok = reduction >= args.min_reduction and not missing
+        failed = failed or not ok
+        print(
+            f"{'✅' if ok else '❌'} {os.path.basename(path)}: {before} -> {after} tokens "
+            f"({reduction:.0%} smaller)"
+        )
+        for text in missing:
+            print(f"    missing from compact prompt: {text!r}")
+        if args.show:
+            print(prompt)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--min-reduction", type=float, default=0.3,
+                        help="Fail when the compact prompt saves less than this fraction of tokens")
+    parser.add_argument("--show", action="store_true", help="Print the compact prompts")
+    sys.exit(main(parser.parse_args()))
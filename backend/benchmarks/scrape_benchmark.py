@@ -0,0 +1,345 @@
+"""Benchmark the scrape pipelines against the local fixture corpus.
+
+Usage (from backend/):
+    python -m benchmarks.scrape_benchmark --runs 5
+    python -m benchmarks.scrape_benchmark --runs 10 --save-baseline benchmarks/baseline.json
+    python -m benchmarks.scrape_benchmark --runs 10 --compare benchmarks/baseline.json
+    python -m benchmarks.scrape_benchmark --pipelines super --include images
+
+Pipelines:
+    super    scrape_with_super_playwright (main.py) on the shared browser pool
+    website  WebsiteScraper.scrape_website (app/scraper.py)
+
+Each fixture is scraped --runs times per pipeline after --warmup discarded
+runs. The report gives p50/p95 wall time in total and per phase, peak RSS of
+this process plus its browser children, the bytes the scrape pulled back from
+the browser over CDP (page HTML, evaluate results and screenshots), the bytes
+served by the fixture server and the size of the JSON result. With --compare
+the script exits non-zero when a metric regressed by more than --threshold
+against the baseline.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from playwright.async_api import Page
+
+from app.metrics import PHASE_SECONDS
+from benchmarks.fixture_server import FIXTURE_PAGES, FixtureServer
+
+PIPELINES = ("super", "website")
+
+# Metrics compared against a baseline, with the smallest absolute change worth flagging
+COMPARED_METRICS = {
+    "total_ms.p50": 50.0,
+    "total_ms.p95": 100.0,
+    "peak_rss_mb": 25.0,
+    "cdp_bytes": 10 * 1024,
+    "fixture_http_bytes": 10 * 1024,
+    "output_bytes": 10 * 1024
+}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return round(ordered[int(rank) - 1], 1)
+
+
+def process_tree_rss_bytes(root_pid: int) -> int:
+    """RSS of a process and all its descendants (Linux /proc); own peak RSS elsewhere"""
+    if not os.path.isdir("/proc"):
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage if sys.platform == "darwin" else usage * 1024
+
+    children: Dict[int, List[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name may contain spaces, so split after its closing paren
+                fields = f.read().rsplit(")", 1)[1].split()
+            children.setdefault(int(fields[1]), []).append(int(entry))
+        except (OSError, IndexError, ValueError):
+            continue
+
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    total = 0
+    pending = [root_pid]
+    while pending:
+        pid = pending.pop()
+        try:
+            with open(f"/proc/{pid}/statm") as f:
+                total += int(f.read().split()[1]) * page_size
+        except (OSError, IndexError, ValueError):
+            pass
+        pending.extend(children.get(pid, []))
+    return total
+
+
+class RSSSampler:
+    """Polls process-tree RSS in the background and keeps the peak"""
+
+    def __init__(self, interval: float = 0.1):
+        self.interval = interval
+        self.peak = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        pid = os.getpid()
+        while True:
+            self.peak = max(self.peak, await asyncio.to_thread(process_tree_rss_bytes, pid))
+            await asyncio.sleep(self.interval)
+
+    async def __aenter__(self) -> "RSSSampler":
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, *exc):
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self.peak = max(self.peak, await asyncio.to_thread(process_tree_rss_bytes, os.getpid()))
+
+
+class ProtocolPayloads:
+    """Counts the result payloads scrapes pull back from the browser.
+
+    Wraps Page.content, Page.evaluate and Page.screenshot for the duration of
+    the `with` block. Sizes are what crosses the protocol: UTF-8 HTML, the
+    JSON of evaluate results and base64 screenshots.
+    """
+
+    MEASURES = {
+        "content": lambda html: len(html.encode()),
+        "evaluate": lambda value: len(json.dumps(value, default=str)),
+        "screenshot": lambda png: -(-len(png) // 3) * 4
+    }
+
+    def __init__(self):
+        self.bytes = 0
+        self._originals: Dict[str, Callable] = {}
+
+    def _wrap(self, name: str) -> Callable:
+        original = self._originals[name]
+        measure = self.MEASURES[name]
+
+        async def counted(page, *args, **kwargs):
+            value = await original(page, *args, **kwargs)
+            self.bytes += measure(value)
+            return value
+        return counted
+
+    def __enter__(self) -> "ProtocolPayloads":
+        for name in self.MEASURES:
+            self._originals[name] = getattr(Page, name)
+            setattr(Page, name, self._wrap(name))
+        return self
+
+    def __exit__(self, *exc):
+        for name, original in self._originals.items():
+            setattr(Page, name, original)
+
+
+def phase_totals() -> Dict[str, float]:
+    return {labels[0]: total for labels, (total, _) in PHASE_SECONDS.totals().items()}
+
+
+async def run_once(
+    scrape: Callable[[], Awaitable[Dict[str, Any]]],
+    server: FixtureServer,
+    payloads: ProtocolPayloads
+) -> Dict[str, Any]:
+    """One scrape with its wall time, per-phase ms, peak RSS, bytes moved and output size"""
+    phases_before = phase_totals()
+    served_before = server.counters()
+    cdp_before = payloads.bytes
+    async with RSSSampler() as rss:
+        start = time.perf_counter()
+        result = await scrape()
+        total_ms = (time.perf_counter() - start) * 1000
+    served_after = server.counters()
+
+    # Spans recorded during this run, plus the website scraper's own extractor timings
+    phases = {
+        phase: round((total - phases_before.get(phase, 0.0)) * 1000, 1)
+        for phase, total in phase_totals().items()
+        if total > phases_before.get(phase, 0.0)
+    }
+    phases.update(result.get("extractor_timings", {}))
+
+    return {
+        "ok": "error" not in result,
+        "error": result.get("error"),
+        "total_ms": total_ms,
+        "phases": phases,
+        "peak_rss_bytes": rss.peak,
+        "cdp_bytes": payloads.bytes - cdp_before,
+        "fixture_http_bytes": served_after["bytes"] - served_before["bytes"],
+        "requests": served_after["requests"] - served_before["requests"],
+        "output_bytes": len(json.dumps(result, default=str))
+    }
+
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    ok_runs = [r for r in runs if r["ok"]]
+    phase_names = sorted({name for r in ok_runs for name in r["phases"]})
+    median = lambda values: percentile(values, 50)
+    return {
+        "runs": len(runs),
+        "failures": len(runs) - len(ok_runs),
+        "errors": sorted({r["error"] for r in runs if r["error"]}),
+        "total_ms": {
+            "p50": percentile([r["total_ms"] for r in ok_runs], 50),
+            "p95": percentile([r["total_ms"] for r in ok_runs], 95)
+        },
+        "phases_ms": {
+            name: {
+                "p50": percentile([r["phases"][name] for r in ok_runs if name in r["phases"]], 50),
+                "p95": percentile([r["phases"][name] for r in ok_runs if name in r["phases"]], 95)
+            }
+            for name in phase_names
+        },
+        "peak_rss_mb": round(max((r["peak_rss_bytes"] for r in runs), default=0) / (1024 * 1024), 1),
+        "cdp_bytes": int(median([r["cdp_bytes"] for r in ok_runs])),
+        "fixture_http_bytes": int(median([r["fixture_http_bytes"] for r in ok_runs])),
+        "requests": int(median([r["requests"] for r in ok_runs])),
+        "output_bytes": int(median([r["output_bytes"] for r in ok_runs]))
+    }
+
+
+def lookup(summary: Dict[str, Any], path: str) -> Optional[float]:
+    value: Any = summary
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Human-readable regressions of `results` against `baseline`"""
+    regressions = []
+    for pipeline, fixtures in results.items():
+        for fixture, summary in fixtures.items():
+            before_summary = baseline.get(pipeline, {}).get(fixture)
+            if not before_summary:
+                continue
+            for metric, min_delta in COMPARED_METRICS.items():
+                before, after = lookup(before_summary, metric), lookup(summary, metric)
+                if not before or after is None:
+                    continue
+                delta = after - before
+                if delta > min_delta and delta / before > threshold:
+                    regressions.append(
+                        f"{pipeline}/{fixture} {metric}: {before} -> {after} (+{delta / before:.0%})"
+                    )
+    return regressions
+
+
+def print_summary(pipeline: str, fixture: str, summary: Dict[str, Any]):
+    status = "✅" if not summary["failures"] else f"❌ {summary['failures']} failed"
+    print(
+        f"{status} {pipeline}/{fixture}: p50 {summary['total_ms']['p50']}ms, p95 {summary['total_ms']['p95']}ms | "
+        f"peak RSS {summary['peak_rss_mb']}MB | CDP {summary['cdp_bytes'] // 1024}KB | "
+        f"fixture HTTP {summary['fixture_http_bytes'] // 1024}KB in {summary['requests']} requests | "
+        f"output {summary['output_bytes'] // 1024}KB"
+    )
+    for name, stats in sorted(summary["phases_ms"].items(), key=lambda item: -item[1]["p50"]):
+        print(f"    {name:24} p50 {stats['p50']:>9}ms   p95 {stats['p95']:>9}ms")
+    for error in summary["errors"]:
+        print(f"    error: {error}")
+
+
+async def main(args: argparse.Namespace) -> int:
+    import main as app_main
+    from app.scraper import WebsiteScraper
+
+    scrapers: Dict[str, Callable[[str], Awaitable[Dict[str, Any]]]] = {
+        "super": lambda url: app_main.scrape_with_super_playwright(
+            url, resource_policy=args.resource_policy, fields=args.include
+        ),
+        "website": lambda url: WebsiteScraper().scrape_website(url, fields=args.website_fields)
+    }
+
+    results: Dict[str, Dict[str, Any]] = {}
+    with FixtureServer(latency_ms=args.latency_ms) as server, ProtocolPayloads() as payloads:
+        print(f"📦 Serving fixtures at {server.base_url}")
+        if "super" in args.pipelines:
+            await app_main.browser_pool.start()
+        try:
+            for pipeline in args.pipelines:
+                results[pipeline] = {}
+                for fixture in args.fixtures:
+                    url = server.url_for(fixture)
+                    scrape = lambda: scrapers[pipeline](url)
+                    for _ in range(args.warmup):
+                        await run_once(scrape, server, payloads)
+                    runs = [await run_once(scrape, server, payloads) for _ in range(args.runs)]
+                    results[pipeline][fixture] = summarize(runs)
+                    print_summary(pipeline, fixture, results[pipeline][fixture])
+        finally:
+            if "super" in args.pipelines:
+                await app_main.browser_pool.stop()
+
+    report = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "runs": args.runs,
+            "warmup": args.warmup,
+            "latency_ms": args.latency_ms,
+            "resource_policy": args.resource_policy,
+            "include": args.include,
+            "website_fields": args.website_fields
+        },
+        "results": results
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.output}")
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Baseline saved to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) against {args.compare}:")
+            for line in regressions:
+                print("    " + line)
+            return 1
+        print(f"✅ No regressions against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pipelines", nargs="+", choices=PIPELINES, default=list(PIPELINES))
+    parser.add_argument("--fixtures", nargs="+", choices=list(FIXTURE_PAGES), default=list(FIXTURE_PAGES))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--latency-ms", type=int, default=0, help="Delay added to every generated image and page")
+    parser.add_argument("--resource-policy", default=None, help="Resource policy preset for the super pipeline")
+    parser.add_argument("--include", nargs="+", help="Field groups for the super pipeline, e.g. images")
+    parser.add_argument("--website-fields", nargs="+", help="ScrapeResult fields for the website pipeline")
+    parser.add_argument("--output", help="Write the full JSON report here")
+    parser.add_argument("--save-baseline", help="Write the report as a baseline file")
+    parser.add_argument("--compare", help="Baseline file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Relative change counted as a regression")
+    sys.exit(asyncio.run(main(parser.parse_args())))
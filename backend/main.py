@@ -1,20 +1,38 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse, Response, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, HttpUrl
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, AsyncIterator, Callable, FrozenSet, Iterable, Literal, Tuple
 import uvicorn
 import os
 import asyncio
 import base64
 import re
+import json
+import time
 from urllib.parse import urljoin, urlparse
 from dotenv import load_dotenv
-from anthropic import Anthropic
+from app.llm_client import get_llm_client, close_llm_client
+from app.cache import ScrapeCache, GenerationCache, normalize_url
+from app.image_extraction import compile_selectors
+from app.page_extractors import IMAGE_FIELDS, SUPER_SCRAPE_FIELDS, SCREENSHOT_FIELD, extraction_script, resolve_fields
+from app.artifacts import ArtifactStore, is_servable_image
+from app.jobs import Job, JobManager, QueueFullError
+from app.single_flight import SingleFlight
+from app.prompt_builder import PromptBuilder, elide_data_uri, rank_images
+from app.metrics import (
+    REGISTRY, REQUEST_SECONDS, SCRAPE_CACHE_LOOKUPS, PLAYWRIGHT_FAILURES, MCP_FALLBACKS, CRAWL_PAGES,
+    EventLoopLagMonitor, span
+)
 
 # Playwright import
 PLAYWRIGHT_AVAILABLE = False
 try:
-    from playwright.async_api import async_playwright
+    from app.browser_pool import BrowserPool
+    from app.page_settle import PageSettler
+    from app.screenshots import ScreenshotEncoder
+    from app.resource_policy import ResourcePolicy
+    from app.crawler import SiteCrawler
     PLAYWRIGHT_AVAILABLE = True
     print("✅ Playwright available")
 except ImportError:
@@ -38,9 +56,36 @@ load_dotenv()
 app = FastAPI(title="Enhanced Website Cloner with Super Image Extraction", version="2.0.0")
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
 
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template, not raw path, so /jobs/{job_id} stays one series
+        route = request.scope.get("route")
+        REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=str(status)
+        )
+
+ResourcePolicyName = Literal["full", "visual", "images-only-metadata"]
+# Field groups a scrape can compute (see app/page_extractors.py)
+ScrapeField = Literal["images", "theme", "logo", "navigation", "headings", "features", "screenshot"]
+
 # Your original models
 class CloneRequest(BaseModel):
     url: HttpUrl
+    force_refresh: bool = False
+    # Which subresources the scrape may download (defaults to SCRAPE_RESOURCE_POLICY)
+    resource_policy: Optional[ResourcePolicyName] = None
+    # Field groups to scrape; anything left out falls back to neutral defaults (all when unset)
+    include: Optional[List[ScrapeField]] = None
 
 class CloneResponse(BaseModel):
     success: bool
@@ -55,6 +100,21 @@ class ImageExtractRequest(BaseModel):
     min_width: Optional[int] = 10
     min_height: Optional[int] = 10
     include_small: Optional[bool] = True
+    force_refresh: bool = False
+    inline_screenshot: bool = False
+    resource_policy: Optional[ResourcePolicyName] = None
+    # Defaults to images + screenshot; ["images"] skips the screenshot too
+    include: Optional[List[ScrapeField]] = None
+
+class CrawlRequest(BaseModel):
+    url: HttpUrl
+    # Clamped to CRAWL_MAX_PAGES / CRAWL_MAX_DEPTH
+    max_pages: Optional[int] = None
+    max_depth: Optional[int] = None
+    respect_robots: bool = True
+    resource_policy: Optional[ResourcePolicyName] = None
+    # Navigation is always scraped, links are discovered from it
+    include: Optional[List[ScrapeField]] = None
 
 class ExtractedImage(BaseModel):
     src: str
@@ -70,9 +130,30 @@ class ImageExtractResponse(BaseModel):
     url: str
     total_images: int
     images: List[ExtractedImage]
+    screenshot_url: Optional[str] = None
     screenshot_base64: Optional[str] = None
+    screenshot_info: Optional[Dict[str, Any]] = None
     error_message: Optional[str] = None
 
+# Shared warm browser pool (started in the startup hook)
+browser_pool = BrowserPool.from_env() if PLAYWRIGHT_AVAILABLE else None
+
+# Scrape results cache (memory LRU + disk)
+scrape_cache = ScrapeCache.from_env()
+
+# Coalesces concurrent scrapes of the same URL + options into one
+scrape_flights = SingleFlight()
+
+# Generated HTML cache keyed by prompt hash
+generation_cache = GenerationCache.from_env()
+
+# Screenshots and inline images are served from here instead of inlined as base64
+artifact_store = ArtifactStore.from_env()
+
+SCRAPE_VIEWPORT = {'width': 1920, 'height': 1080}
+SCRAPE_RESOURCE_POLICY = os.getenv("SCRAPE_RESOURCE_POLICY", "visual")
+SCRAPE_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
 # Your original MCP setup
 mcp_tools = None
 agent_primary = None
@@ -152,310 +233,160 @@ class SuperImageScraper:
             # CDN patterns
             '[src*="cloudinary"]', '[src*="imgix"]', '[src*="amazonaws"]'
         ]
+        # Compiled once so the page walks the DOM a single time instead of once per selector
+        self.selector_specs = compile_selectors(self.image_selectors)
+
+ProgressCallback = Callable[[str, str], None]
+
+def report_progress(on_progress: Optional[ProgressCallback], phase: str, message: str):
+    """Forward a progress update to the caller, if anyone is listening"""
+    if on_progress:
+        try:
+            on_progress(phase, message)
+        except Exception as e:
+            print("⚠️ Progress callback failed:", str(e))
+
+async def scrape_page(
+    page: Any,
+    url: str,
+    on_progress: Optional[ProgressCallback] = None,
+    fields: Optional[Iterable[str]] = None
+) -> Dict[str, Any]:
+    """Navigate an open page to `url` and run the extractors for `fields` (all when None).
+
+    The screenshot is skipped unless "screenshot" is among the fields. Raises
+    on failure; scrape_with_super_playwright turns that into an error dict.
+    """
+    scraper = SuperImageScraper()
+    fields = resolve_fields(fields)
+    
+    print("📸 Navigating to:", url)
+    report_progress(on_progress, "navigate", "Connecting to website...")
+    with span("navigate"):
+        await page.goto(url, wait_until='domcontentloaded', timeout=60000)
+    
+    # Adaptive scrolling for lazy loading: stops as soon as the page goes quiet
+    print("📜 Triggering ALL lazy loading...")
+    report_progress(on_progress, "settle", "Loading lazy content...")
+    with span("settle"):
+        settle_report = await PageSettler.from_env().settle(page)
+    print(f"⏱️ Page settled in {settle_report['total_ms']}ms ({settle_report['scroll_steps']} scroll steps)")
+    
+    screenshot = None
+    if SCREENSHOT_FIELD in fields:
+        print("📷 Taking screenshot...")
+        report_progress(on_progress, "screenshot", "Capturing screenshot...")
+        with span("screenshot"):
+            screenshot = await ScreenshotEncoder.from_env().capture(page)
+        print(f"🗜️ Screenshot {screenshot['original_bytes'] // 1024}KB png -> {screenshot['bytes'] // 1024}KB {screenshot['format']}")
+    
+    print("🔍 Extracting EVERYTHING...")
+    report_progress(on_progress, "extract", "Extracting design elements...")
+    
+    # Super comprehensive extraction
+    with span("extract"):
+        visual_data = await page.evaluate(extraction_script(fields), scraper.selector_specs)
+    
+    with span("artifacts"):
+        # Add screenshot to visual data
+        if screenshot is not None:
+            screenshot_url, screenshot_info = await artifact_store.externalize_screenshot(screenshot)
+            visual_data['screenshot'] = screenshot_url
+            visual_data['screenshot_info'] = screenshot_info
+        
+        # Inline raster data: images (canvas, base64 PNGs) are stored as artifacts too; SVG stays inline
+        for img in visual_data.get('allImages', []):
+            if img['is_base64']:
+                artifact_url = await artifact_store.put_data_uri(img['src'])
+                if artifact_url:
+                    img['src'] = artifact_url
+    visual_data['settle_timings'] = settle_report
+    visual_data['fields'] = sorted(fields)
+    
+    print(f"✅ Super extraction complete ({', '.join(sorted(fields))}): found {visual_data.get('totalImagesFound', 0)} images")
+    return visual_data
 
-async def scrape_with_super_playwright(url: str) -> Dict[str, Any]:
-    """SUPER enhanced Playwright scraping with comprehensive image extraction"""
+async def scrape_with_super_playwright(
+    url: str,
+    on_progress: Optional[ProgressCallback] = None,
+    resource_policy: Optional[str] = None,
+    fields: Optional[Iterable[str]] = None
+) -> Dict[str, Any]:
+    """SUPER enhanced Playwright scraping with comprehensive image extraction.
+
+    Only the extractors for `fields` run (all when None); the screenshot is
+    skipped unless "screenshot" is among them.
+    """
     if not PLAYWRIGHT_AVAILABLE:
         return {"error": "Playwright not available"}
     
     try:
-        scraper = SuperImageScraper()
-        
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(
-                headless=True,
-                args=[
-                    '--disable-blink-features=AutomationControlled',
-                    '--disable-dev-shm-usage',
-                    '--no-sandbox',
-                    '--disable-setuid-sandbox',
-                    '--disable-web-security',
-                    '--disable-features=VizDisplayCompositor'
-                ]
-            )
-            
-            context = await browser.new_context(
-                viewport={'width': 1920, 'height': 1080},
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                ignore_https_errors=True
-            )
-            
+        policy = ResourcePolicy.from_env(resource_policy)
+        
+        async with browser_pool.context(
+            viewport=SCRAPE_VIEWPORT,
+            user_agent=SCRAPE_USER_AGENT,
+            ignore_https_errors=True,
+            **policy.context_options()
+        ) as context:
+            block_log = await policy.apply(context)
             page = await context.new_page()
-            
-            print("📸 Navigating to:", url)
-            await page.goto(url, wait_until='domcontentloaded', timeout=60000)
-            await page.wait_for_timeout(3000)
-            
-            # Aggressive scrolling for lazy loading
-            print("📜 Triggering ALL lazy loading...")
-            for i in range(6):
-                await page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-                await page.wait_for_timeout(1500)
-                await page.evaluate('window.scrollTo(0, 0)')
-                await page.wait_for_timeout(500)
-            
-            print("📷 Taking screenshot...")
-            screenshot = await page.screenshot(
-                full_page=True,
-                type='png'
-            )
-            screenshot_base64 = base64.b64encode(screenshot).decode()
-            
-            print("🔍 Extracting EVERYTHING...")
-            
-            # Super comprehensive extraction
-            visual_data = await page.evaluate(f"""
-                () => {{
-                    const data = {{}};
-                    const seenUrls = new Set();
-                    const allImages = [];
-                    
-                    // Helper function
-                    function resolveUrl(url) {{
-                        if (!url) return null;
-                        if (url.startsWith('data:')) return url;
-                        if (url.startsWith('//')) return 'https:' + url;
-                        if (url.startsWith('/')) return window.location.origin + url;
-                        if (!url.startsWith('http')) return window.location.origin + '/' + url;
-                        return url;
-                    }}
-                    
-                    function getImageFormat(src) {{
-                        if (src.startsWith('data:')) {{
-                            const match = src.match(/data:image\\/(\\w+)/);
-                            return match ? match[1] : 'unknown';
-                        }}
-                        const match = src.match(/\\.([a-zA-Z0-9]+)(?:\\?|$)/);
-                        return match ? match[1].toLowerCase() : 'unknown';
-                    }}
-                    
-                    // MEGA IMAGE EXTRACTION
-                    const selectors = {scraper.image_selectors};
-                    
-                    for (const selector of selectors) {{
-                        try {{
-                            const elements = document.querySelectorAll(selector);
-                            
-                            for (const el of elements) {{
-                                let src = null;
-                                let width = 0;
-                                let height = 0;
-                                let alt = '';
-                                let context = '';
-                                
-                                if (el.tagName === 'IMG') {{
-                                    src = el.src || el.getAttribute('data-src') || 
-                                          el.getAttribute('data-lazy') || el.getAttribute('data-original') ||
-                                          el.getAttribute('data-img') || el.getAttribute('data-image');
-                                    width = el.naturalWidth || el.width || el.offsetWidth || 0;
-                                    height = el.naturalHeight || el.height || el.offsetHeight || 0;
-                                    alt = el.alt || el.title || '';
-                                    context = 'img-element';
-                                    
-                                }} else if (el.tagName === 'SOURCE') {{
-                                    src = el.srcset?.split(',')[0]?.trim()?.split(' ')[0] || el.src;
-                                    width = parseInt(el.getAttribute('width')) || 0;
-                                    height = parseInt(el.getAttribute('height')) || 0;
-                                    alt = 'source-element';
-                                    context = 'source-element';
-                                    
-                                }} else if (el.tagName === 'VIDEO') {{
-                                    src = el.poster;
-                                    width = el.videoWidth || el.width || el.offsetWidth || 0;
-                                    height = el.videoHeight || el.height || el.offsetHeight || 0;
-                                    alt = 'video-thumbnail';
-                                    context = 'video-poster';
-                                    
-                                }} else if (el.tagName === 'SVG') {{
-                                    try {{
-                                        const serializer = new XMLSerializer();
-                                        const svgString = serializer.serializeToString(el);
-                                        src = 'data:image/svg+xml;base64,' + btoa(unescape(encodeURIComponent(svgString)));
-                                        width = el.width?.baseVal?.value || el.offsetWidth || 0;
-                                        height = el.height?.baseVal?.value || el.offsetHeight || 0;
-                                        alt = 'svg-image';
-                                        context = 'svg-element';
-                                    }} catch (e) {{ continue; }}
-                                    
-                                }} else if (el.tagName === 'CANVAS') {{
-                                    try {{
-                                        src = el.toDataURL();
-                                        width = el.width || el.offsetWidth || 0;
-                                        height = el.height || el.offsetHeight || 0;
-                                        alt = 'canvas-image';
-                                        context = 'canvas-element';
-                                    }} catch (e) {{ continue; }}
-                                    
-                                }} else {{
-                                    // Data attributes
-                                    src = el.getAttribute('data-src') || el.getAttribute('data-lazy') ||
-                                          el.getAttribute('data-original') || el.getAttribute('data-img') ||
-                                          el.getAttribute('data-image') || el.getAttribute('data-background');
-                                    width = el.offsetWidth || 0;
-                                    height = el.offsetHeight || 0;
-                                    alt = el.getAttribute('aria-label') || el.getAttribute('title') || '';
-                                    context = 'data-attribute';
-                                }}
-                                
-                                if (src) {{
-                                    const resolvedUrl = resolveUrl(src);
-                                    if (resolvedUrl && !seenUrls.has(resolvedUrl)) {{
-                                        seenUrls.add(resolvedUrl);
-                                        allImages.push({{
-                                            src: resolvedUrl,
-                                            alt: alt,
-                                            width: width,
-                                            height: height,
-                                            format: getImageFormat(resolvedUrl),
-                                            context: context,
-                                            is_base64: resolvedUrl.startsWith('data:')
-                                        }});
-                                    }}
-                                }}
-                            }}
-                        }} catch (e) {{
-                            console.log('Selector failed:', selector);
-                        }}
-                    }}
-                    
-                    // Extract CSS background images
-                    try {{
-                        const allElements = document.querySelectorAll('*');
-                        for (const el of allElements) {{
-                            const style = window.getComputedStyle(el);
-                            const bgImage = style.backgroundImage;
-                            
-                            if (bgImage && bgImage !== 'none' && bgImage.includes('url(')) {{
-                                const matches = bgImage.match(/url\\(["']?([^"')]+)["']?\\)/g);
-                                if (matches) {{
-                                    for (const match of matches) {{
-                                        const url = match.match(/url\\(["']?([^"')]+)["']?\\)/)[1];
-                                        const resolvedUrl = resolveUrl(url);
-                                        
-                                        if (resolvedUrl && !seenUrls.has(resolvedUrl)) {{
-                                            seenUrls.add(resolvedUrl);
-                                            allImages.push({{
-                                                src: resolvedUrl,
-                                                alt: 'background-image',
-                                                width: el.offsetWidth || 0,
-                                                height: el.offsetHeight || 0,
-                                                format: getImageFormat(resolvedUrl),
-                                                context: 'css-background',
-                                                is_base64: resolvedUrl.startsWith('data:')
-                                            }});
-                                        }}
-                                    }}
-                                }}
-                            }}
-                        }}
-                    }} catch (e) {{
-                        console.log('Background extraction failed');
-                    }}
-                    
-                    // Original site analysis
-                    const body = document.body;
-                    const bodyStyles = window.getComputedStyle(body);
-                    
-                    let bgColor = bodyStyles.backgroundColor;
-                    if (!bgColor || bgColor === 'rgba(0, 0, 0, 0)') {{
-                        bgColor = '#ffffff';
-                    }}
-                    
-                    const textColor = bodyStyles.color || '#333333';
-                    const isDark = bgColor.includes('rgb(0') || bgColor.includes('#000') || 
-                                  bgColor.includes('#202124') || bgColor.includes('rgb(18');
-                    
-                    // Logo detection
-                    let logo = null;
-                    const logoSelectors = [
-                        'img[alt*="logo" i]', 'img[src*="logo" i]', '.logo img', '.brand img',
-                        'nav img', '.navbar-brand img', '.site-logo img', '.header-logo img'
-                    ];
-                    
-                    for (const selector of logoSelectors) {{
-                        const logoImg = document.querySelector(selector);
-                        if (logoImg && logoImg.src) {{
-                            logo = {{ 
-                                type: 'image', 
-                                src: logoImg.src, 
-                                alt: logoImg.alt || ''
-                            }};
-                            break;
-                        }}
-                    }}
-                    
-                    if (!logo) {{
-                        const textLogoSelectors = ['.logo', '.brand', 'h1', '.site-title'];
-                        for (const selector of textLogoSelectors) {{
-                            const logoText = document.querySelector(selector);
-                            if (logoText && logoText.textContent.trim()) {{
-                                logo = {{ type: 'text', text: logoText.textContent.trim() }};
-                                break;
-                            }}
-                        }}
-                    }}
-                    
-                    // Navigation
-                    const navLinks = [];
-                    const navSelectors = ['nav a', '.nav a', 'header a', '.navbar a', '.menu a'];
-                    
-                    for (const selector of navSelectors) {{
-                        document.querySelectorAll(selector).forEach(link => {{
-                            const text = link.textContent.trim();
-                            if (text && text.length < 50 && navLinks.length < 10) {{
-                                navLinks.push({{
-                                    text: text,
-                                    href: link.href || '#'
-                                }});
-                            }}
-                        }});
-                    }}
-                    
-                    // Headings
-                    const headings = [];
-                    document.querySelectorAll('h1, h2, h3').forEach(h => {{
-                        const text = h.textContent.trim();
-                        if (text && headings.length < 8) {{
-                            headings.push({{
-                                text: text,
-                                level: h.tagName.toLowerCase()
-                            }});
-                        }}
-                    }});
-                    
-                    // Sort images by size
-                    allImages.sort((a, b) => (b.width * b.height) - (a.width * a.height));
-                    
-                    return {{
-                        url: window.location.href,
-                        siteType: 'standard',
-                        backgroundColor: bgColor,
-                        textColor: textColor,
-                        isDark: isDark,
-                        fontFamily: bodyStyles.fontFamily,
-                        title: document.title,
-                        logo: logo,
-                        navigation: navLinks,
-                        headings: headings,
-                        allImages: allImages.slice(0, 100), // Limit to 100 best images
-                        totalImagesFound: allImages.length,
-                        hasSearch: !!document.querySelector('input[type="search"], input[name="q"], .search'),
-                        hasVideo: !!document.querySelector('video')
-                    }};
-                }}
-            """)
-            
-            # Add screenshot to visual data
-            visual_data['screenshot'] = screenshot_base64
-            
-            await browser.close()
-            print(f"✅ Super extraction complete! Found {visual_data['totalImagesFound']} images")
+            visual_data = await scrape_page(page, url, on_progress, fields)
+            visual_data['resource_blocking'] = block_log.to_dict()
             return visual_data
             
     except Exception as e:
         print("❌ Super Playwright failed:", str(e))
+        PLAYWRIGHT_FAILURES.inc()
         return {"error": str(e)}
 
+async def scrape_cached(
+    url: str,
+    force_refresh: bool = False,
+    on_progress: Optional[ProgressCallback] = None,
+    resource_policy: Optional[str] = None,
+    fields: Optional[Iterable[str]] = None
+) -> Dict[str, Any]:
+    """scrape_with_super_playwright behind the scrape cache; errors are never cached"""
+    # Blocked resources change what the scrape sees, so the policy is part of the key
+    resource_policy = resource_policy or SCRAPE_RESOURCE_POLICY
+    fields = resolve_fields(fields)
+
+    def key_for(scraped: FrozenSet[str]) -> str:
+        return ScrapeCache.key_for(
+            url,
+            viewport=SCRAPE_VIEWPORT,
+            user_agent=SCRAPE_USER_AGENT,
+            resource_policy=resource_policy,
+            fields=sorted(scraped)
+        )
+
+    key = key_for(fields)
+    if not force_refresh:
+        # A full scrape answers any partial request too; the keys tried count as one lookup
+        for candidate in dict.fromkeys([key, key_for(SUPER_SCRAPE_FIELDS)]):
+            cached = await scrape_cache.get(candidate, count=False)
+            # Artifacts can expire before the cached scrape that points at them
+            if cached is not None and 'screenshot_info' in cached and not await artifact_store.exists(cached['screenshot_info'].get('artifact_id', '')):
+                cached = None
+            if cached is not None:
+                print("⚡ Scrape cache hit:", url)
+                scrape_cache.record_lookup(True)
+                SCRAPE_CACHE_LOOKUPS.inc(result="hit")
+                report_progress(on_progress, "cache", "Using cached scrape...")
+                return cached
+        scrape_cache.record_lookup(False)
+    SCRAPE_CACHE_LOOKUPS.inc(result="bypass" if force_refresh else "miss")
+    
+    async def scrape(broadcast: ProgressCallback) -> Dict[str, Any]:
+        data = await scrape_with_super_playwright(url, broadcast, resource_policy, fields)
+        if "error" not in data:
+            await scrape_cache.set(key, data)
+        return data
+
+    # Concurrent misses for the same page share one browser scrape
+    return await scrape_flights.do(key, scrape, on_progress)
+
 # Your original scrape functions (keeping for compatibility)
 async def scrape_with_mcp(url: str) -> Dict[str, Any]:
     """Use MCP as backup"""
@@ -472,14 +403,22 @@ async def scrape_with_mcp(url: str) -> Dict[str, Any]:
 
 # Your original HTML Generator class (enhanced)
 class HTMLGenerator:
+    model = "claude-3-5-sonnet-20241022"
+    max_tokens = 8000
+    temperature = 0
+    max_prompt_images = int(os.getenv("PROMPT_MAX_IMAGES", "20"))
+
     def __init__(self):
-        api_key = os.getenv("ANTHROPIC_API_KEY")
-        if not api_key:
-            raise ValueError("ANTHROPIC_API_KEY required")
-        self.client = Anthropic(api_key=api_key)
+        self.client = get_llm_client()
+        self.cache = generation_cache
     
-    def create_html(self, data: Dict[str, Any]) -> str:
-        """Generate HTML from visual data with ALL extracted images"""
+    def build_prompt(self, data: Dict[str, Any]) -> str:
+        """Build the generation prompt from visual data with ALL extracted images"""
+        prompt, _ = self.build_prompt_with_report(data)
+        return prompt
+    
+    def build_prompt_with_report(self, data: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """Build the prompt under PROMPT_TOKEN_BUDGET and report where the tokens went"""
         
         if "error" in data:
             raise Exception("No visual data available: " + data["error"])
@@ -497,37 +436,35 @@ class HTMLGenerator:
         total_images = data.get('totalImagesFound', 0)
         screenshot = data.get('screenshot', '')
         
-        print(f"🎨 Generating HTML with {len(all_images)} images extracted from {total_images} total found")
+        # Biggest images first, one entry per asset however many sizes it was served in
+        images, duplicates = rank_images(all_images)
+        print(f"🎨 Generating HTML with {len(images)} images extracted from {total_images} total found")
         
-        # Build comprehensive prompt with ALL images
-        prompt = f"""Create a PIXEL-PERFECT website clone from {url}.
+        builder = PromptBuilder.from_env()
+        builder.add("header", f"""Create a PIXEL-PERFECT website clone from {url}.
 
 EXTRACTED VISUAL DATA:
 - Background: {bg_color}
 - Text Color: {text_color}
 - Font: {font_family}
 - Title: {title}
+""", required=True)
+        builder.add("logo", f"\nLOGO: {self._describe_logo(logo)}\n", priority=3)
+        builder.add("navigation", f"\nNAVIGATION: {[nav.get('text', '') for nav in navigation[:6]]}\n", priority=2)
+        builder.add("headings", f"\nHEADINGS: {[h.get('text', '') for h in headings[:5]]}\n", priority=2)
+        
+        # Add detailed image information, as many as the budget allows
+        image_lines = [self._describe_image(i, img) for i, img in enumerate(images[:self.max_prompt_images])]
+        builder.add_items(
+            "images",
+            f"\nEXTRACTED IMAGES ({len(images)} of {total_images} total found):\n",
+            image_lines,
+            priority=1,
+            overflow=lambda n: f"\n... and {n} more images available",
+            omitted=len(images) - len(image_lines)
+        )
 
-LOGO: {logo}
-
-NAVIGATION: {[nav.get('text', '') for nav in navigation[:6]]}
-
-HEADINGS: {[h.get('text', '') for h in headings[:5]]}
-
-EXTRACTED IMAGES ({len(all_images)} of {total_images} total found):
-"""
-
-        # Add detailed image information
-        for i, img in enumerate(all_images[:20]):  # Include top 20 images in prompt
-            prompt += f"\n{i+1}. {img['src']}"
-            if img['alt']:
-                prompt += f" (alt: {img['alt']})"
-            prompt += f" - {img['width']}x{img['height']} - {img['context']}"
-
-        if len(all_images) > 20:
-            prompt += f"\n... and {len(all_images) - 20} more images available"
-
-        prompt += f"""
+        builder.add("requirements", f"""
 
 REQUIREMENTS:
 1. Use EXACT colors: background {bg_color}, text {text_color}
@@ -538,36 +475,99 @@ REQUIREMENTS:
 6. Include proper alt text for accessibility
 7. Make it look exactly like the original website
 
-Create complete HTML with embedded CSS that recreates this website perfectly using all the extracted visual data."""
+Create complete HTML with embedded CSS that recreates this website perfectly using all the extracted visual data.""", required=True)
 
         # Add screenshot reference if available
         if screenshot:
-            prompt += f"\n\nIMPORTANT: I have captured a screenshot of the actual website. Please ensure the generated HTML matches the visual layout, spacing, and design shown in the screenshot as closely as possible."
+            builder.add("screenshot", "\n\nIMPORTANT: I have captured a screenshot of the actual website. Please ensure the generated HTML matches the visual layout, spacing, and design shown in the screenshot as closely as possible.", required=True)
+
+        prompt, report = builder.build()
+        included = report["sections"]["images"]["items_included"]
+        report["images"] = {
+            "candidates": len(all_images),
+            "duplicates_removed": duplicates,
+            # Only images that made it into the prompt had a data: URI replaced by a placeholder
+            "data_uris_elided": sum(1 for img in images[:included] if img.get('src', '').startswith('data:')),
+            "included": included
+        }
+        print(
+            f"🧮 Prompt ~{report['estimated_tokens']} tokens (budget {report['token_budget']}), "
+            f"{report['images']['included']} images, {duplicates} duplicates dropped"
+        )
+        return prompt, report
+    
+    @staticmethod
+    def _describe_logo(logo: Any) -> Any:
+        if isinstance(logo, dict) and str(logo.get('src', '')).startswith('data:'):
+            return {**logo, 'src': elide_data_uri(logo['src'])}
+        return logo
+    
+    @staticmethod
+    def _describe_image(index: int, img: Dict[str, Any]) -> str:
+        src = img['src']
+        line = f"\n{index + 1}. {elide_data_uri(src) if src.startswith('data:') else src}"
+        if img.get('alt'):
+            line += f" (alt: {img['alt']})"
+        return line + f" - {img['width']}x{img['height']} - {img['context']}"
+
+    def _request_params(self, prompt: str) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+            "messages": [{"role": "user", "content": prompt}]
+        }
+
+    @staticmethod
+    def clean_html(html_content: str) -> str:
+        """Strip markdown fences and make sure the document has a DOCTYPE"""
+        if "```html" in html_content:
+            start = html_content.find("```html") + 7
+            end = html_content.find("```", start)
+            if end != -1:
+                html_content = html_content[start:end].strip()
+        
+        if not html_content.startswith("<!DOCTYPE"):
+            html_content = "<!DOCTYPE html>\n" + html_content
+        
+        return html_content
+
+    async def create_html(self, data: Dict[str, Any]) -> str:
+        """Generate HTML from visual data with ALL extracted images"""
+        params = self._request_params(self.build_prompt(data))
+        
+        async def generate() -> str:
+            try:
+                with span("llm"):
+                    response = await self.client.create_message(**params)
+                with span("postprocess"):
+                    return self.clean_html(response.content[0].text)
+            except Exception as e:
+                raise Exception("HTML generation failed: " + str(e))
+        
+        return await self.cache.get_or_generate(GenerationCache.key_for(params), generate)
 
+    async def stream_html(self, data: Dict[str, Any]) -> AsyncIterator[str]:
+        """Yield raw HTML text chunks as Claude generates them (not yet cleaned)"""
+        params = self._request_params(self.build_prompt(data))
+        key = GenerationCache.key_for(params)
+        
+        cached = await self.cache.get(key)
+        if cached is not None:
+            print("⚡ Generation cache hit")
+            yield cached
+            return
+        
+        chunks = []
         try:
-            response = self.client.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=8000,
-                temperature=0,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            
-            html_content = response.content[0].text
-            
-            # Clean HTML
-            if "```html" in html_content:
-                start = html_content.find("```html") + 7
-                end = html_content.find("```", start)
-                if end != -1:
-                    html_content = html_content[start:end].strip()
-            
-            if not html_content.startswith("<!DOCTYPE"):
-                html_content = "<!DOCTYPE html>\n" + html_content
-            
-            return html_content
-            
+            # Includes time the consumer spends between chunks, i.e. end-to-end streaming time
+            with span("llm_stream"):
+                async for text in self.client.stream_text(**params):
+                    chunks.append(text)
+                    yield text
         except Exception as e:
             raise Exception("HTML generation failed: " + str(e))
+        await self.cache.set(key, self.clean_html("".join(chunks)))
 
 def safe_data_cleanup(data: Dict[str, Any]) -> Dict[str, Any]:
     """Clean up data to ensure all values are safe for processing"""
@@ -642,104 +642,104 @@ def health():
     return {
         "status": "healthy",
         "playwright": PLAYWRIGHT_AVAILABLE,
+        "browser_pool": browser_pool.stats() if browser_pool else None,
+        "scrape_cache": scrape_cache.stats(),
+        "scrape_flights": scrape_flights.stats(),
+        "generation_cache": generation_cache.stats(),
+        "jobs": job_manager.stats(),
         "mcp": bool(agent_primary),
         "features": [
             "Website cloning with super image extraction",
             "60+ CSS selectors for comprehensive image detection",
             "Background image extraction",
-            "Lazy loading support", 
+            "Adaptive lazy loading settle detection",
             "SVG and Canvas capture",
-            "Screenshot generation",
-            "Smart duplicate removal"
+            "Compressed WebP/JPEG screenshot generation",
+            "Smart duplicate removal",
+            "Multi-page same-origin crawl honoring robots.txt"
         ]
     }
 
-# MAIN CLONE ENDPOINT (your original endpoint)
-@app.post("/clone")
-async def clone_website(request: CloneRequest):
+def normalize_request_url(url: str) -> str:
+    """Add https if missing"""
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    return url
+
+async def collect_clone_data(
+    url: str,
+    on_progress: Optional[ProgressCallback] = None,
+    force_refresh: bool = False,
+    resource_policy: Optional[str] = None,
+    fields: Optional[Iterable[str]] = None
+) -> Dict[str, Any]:
+    """Scrape a site with Playwright, falling back to MCP, and return generator-safe data"""
+    # Try super Playwright first
     try:
-        url = str(request.url)
-        print("🎯 Super Cloning:", url)
-        
-        # Add https if missing
-        if not url.startswith(('http://', 'https://')):
-            url = 'https://' + url
-        
-        # Try super Playwright first
+        data = await scrape_cached(url, force_refresh, on_progress, resource_policy, fields)
+        if "error" in data:
+            raise Exception("Super Playwright failed: " + str(data["error"]))
+    except Exception as playwright_error:
+        print("❌ Super Playwright failed:", str(playwright_error))
+        data = {"error": str(playwright_error)}
+    
+    # Try MCP as backup if Playwright failed
+    if "error" in data and agent_primary:
+        print("🔄 Trying MCP backup...")
+        report_progress(on_progress, "fallback", "Trying MCP backup...")
         try:
-            data = await scrape_with_super_playwright(url)
-            if "error" in data:
-                raise Exception("Super Playwright failed: " + str(data["error"]))
-        except Exception as playwright_error:
-            print("❌ Super Playwright failed:", str(playwright_error))
-            data = {"error": str(playwright_error)}
-        
-        # Try MCP as backup if Playwright failed
-        if "error" in data and agent_primary:
-            print("🔄 Trying MCP backup...")
-            try:
-                mcp_data = await scrape_with_mcp(url)
-                if mcp_data and mcp_data.get("mcp_data"):
-                    data = {
-                        "url": url,
-                        "siteType": "standard",
-                        "backgroundColor": "#ffffff",
-                        "textColor": "#333333",
-                        "fontFamily": "arial, sans-serif",
-                        "title": "Website",
-                        "navigation": ["Home", "About", "Contact"],
-                        "headings": ["Welcome", "About Us"],
-                        "logo": {"type": "text", "text": "Brand"},
-                        "isDark": False,
-                        "hasSearch": False,
-                        "hasVideo": False,
-                        "allImages": [],
-                        "totalImagesFound": 0,
-                        "mcp_data": mcp_data.get("mcp_data", "")
-                    }
-                    print("✅ MCP provided backup data")
-                else:
-                    raise Exception("MCP also failed")
-            except Exception as mcp_error:
-                print("❌ MCP also failed:", str(mcp_error))
-                # Create minimal fallback data
+            mcp_data = await scrape_with_mcp(url)
+            if mcp_data and mcp_data.get("mcp_data"):
                 data = {
                     "url": url,
                     "siteType": "standard",
                     "backgroundColor": "#ffffff",
                     "textColor": "#333333",
-                    "fontFamily": "system-ui, sans-serif",
+                    "fontFamily": "arial, sans-serif",
                     "title": "Website",
                     "navigation": ["Home", "About", "Contact"],
-                    "headings": ["Welcome to Our Website"],
-                    "logo": {"type": "text", "text": "Website"},
+                    "headings": ["Welcome", "About Us"],
+                    "logo": {"type": "text", "text": "Brand"},
                     "isDark": False,
                     "hasSearch": False,
                     "hasVideo": False,
                     "allImages": [],
-                    "totalImagesFound": 0
+                    "totalImagesFound": 0,
+                    "mcp_data": mcp_data.get("mcp_data", "")
                 }
-                print("⚠️ Using fallback data structure")
-        
-        # Ensure all data is safe for processing
-        data = safe_data_cleanup(data)
-        
-        # Generate HTML
-        generator = HTMLGenerator()
-        html_content = generator.create_html(data)
-        
-        print("✅ Super clone completed successfully")
-        return CloneResponse(
-            success=True,
-            generated_html=html_content,
-            original_url=url
-        )
-        
-    except Exception as e:
-        error_msg = str(e)
-        print("❌ Super clone failed:", error_msg)
-        
-        error_html = f"""<!DOCTYPE html>
+                print("✅ MCP provided backup data")
+                MCP_FALLBACKS.inc(outcome="mcp")
+            else:
+                raise Exception("MCP also failed")
+        except Exception as mcp_error:
+            print("❌ MCP also failed:", str(mcp_error))
+            # Create minimal fallback data
+            data = {
+                "url": url,
+                "siteType": "standard",
+                "backgroundColor": "#ffffff",
+                "textColor": "#333333",
+                "fontFamily": "system-ui, sans-serif",
+                "title": "Website",
+                "navigation": ["Home", "About", "Contact"],
+                "headings": ["Welcome to Our Website"],
+                "logo": {"type": "text", "text": "Website"},
+                "isDark": False,
+                "hasSearch": False,
+                "hasVideo": False,
+                "allImages": [],
+                "totalImagesFound": 0
+            }
+            print("⚠️ Using fallback data structure")
+            MCP_FALLBACKS.inc(outcome="minimal")
+    
+    # Ensure all data is safe for processing
+    with span("cleanup"):
+        return safe_data_cleanup(data)
+
+def build_error_html(error_msg: str, url: str) -> str:
+    """Render the friendly error page returned when cloning fails"""
+    return f"""<!DOCTYPE html>
 <html>
 <head>
     <title>Super Clone Failed</title>
@@ -762,7 +762,7 @@ async def clone_website(request: CloneRequest):
     <div class="error">
         <h1>🚫 Super Clone Failed</h1>
         <p><strong>Error:</strong> {error_msg}</p>
-        <div class="url"><strong>URL:</strong> {str(request.url)}</div>
+        <div class="url"><strong>URL:</strong> {url}</div>
         
         <div class="status">
             <h3>System Status:</h3>
@@ -775,7 +775,7 @@ async def clone_website(request: CloneRequest):
             <li>🎯 60+ CSS selectors for comprehensive image detection</li>
             <li>📸 Full page screenshot capture</li>
             <li>🔍 Background image extraction from CSS</li>
-            <li>⚡ Lazy loading trigger via aggressive scrolling</li>
+            <li>⚡ Lazy loading trigger via adaptive scrolling</li>
             <li>🎨 SVG and Canvas element capture</li>
             <li>🔄 Smart duplicate removal</li>
             <li>📊 Size and format detection</li>
@@ -793,14 +793,240 @@ async def clone_website(request: CloneRequest):
     </div>
 </body>
 </html>"""
+
+# MAIN CLONE ENDPOINT (your original endpoint)
+@app.post("/clone")
+async def clone_website(request: CloneRequest):
+    try:
+        url = normalize_request_url(str(request.url))
+        print("🎯 Super Cloning:", url)
+        
+        data = await collect_clone_data(
+            url,
+            force_refresh=request.force_refresh,
+            resource_policy=request.resource_policy,
+            fields=request.include
+        )
+        
+        # Generate HTML
+        generator = HTMLGenerator()
+        html_content = await generator.create_html(data)
+        
+        print("✅ Super clone completed successfully")
+        return CloneResponse(
+            success=True,
+            generated_html=html_content,
+            original_url=url
+        )
+        
+    except Exception as e:
+        error_msg = str(e)
+        print("❌ Super clone failed:", error_msg)
         
         return CloneResponse(
             success=False,
-            generated_html=error_html,
+            generated_html=build_error_html(error_msg, str(request.url)),
             original_url=str(request.url),
             error_message=error_msg
         )
 
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+# STREAMING CLONE ENDPOINT
+@app.post("/clone/stream")
+async def clone_website_stream(request: CloneRequest):
+    """Clone a website, streaming progress, HTML tokens and the final document over SSE"""
+    url = normalize_request_url(str(request.url))
+
+    async def event_stream():
+        print("🎯 Super Cloning (stream):", url)
+        queue: asyncio.Queue = asyncio.Queue()
+
+        def on_progress(phase: str, message: str):
+            queue.put_nowait((phase, message))
+
+        scrape_task = asyncio.create_task(collect_clone_data(
+            url, on_progress, request.force_refresh, request.resource_policy, request.include
+        ))
+        try:
+            # Relay scrape progress until the scrape finishes
+            while not scrape_task.done() or not queue.empty():
+                getter = asyncio.ensure_future(queue.get())
+                done, _ = await asyncio.wait({getter, scrape_task}, return_when=asyncio.FIRST_COMPLETED)
+                if getter in done:
+                    phase, message = getter.result()
+                    yield sse_event("progress", {"phase": phase, "message": message})
+                else:
+                    getter.cancel()
+            data = scrape_task.result()
+
+            yield sse_event("progress", {"phase": "generate", "message": "Generating clone with AI..."})
+            generator = HTMLGenerator()
+            chunks = []
+            async for text in generator.stream_html(data):
+                chunks.append(text)
+                yield sse_event("token", {"text": text})
+
+            with span("postprocess"):
+                html_content = generator.clean_html("".join(chunks))
+            print("✅ Super clone (stream) completed successfully")
+            yield sse_event("done", {
+                "success": True,
+                "generated_html": html_content,
+                "original_url": url
+            })
+
+        except Exception as e:
+            error_msg = str(e)
+            print("❌ Super clone (stream) failed:", error_msg)
+            yield sse_event("error", {
+                "success": False,
+                "generated_html": build_error_html(error_msg, str(request.url)),
+                "original_url": str(request.url),
+                "error_message": error_msg
+            })
+        finally:
+            if not scrape_task.done():
+                scrape_task.cancel()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Rough share of a clone job's runtime spent before each phase starts
+CLONE_PHASE_PROGRESS = {
+    "cache": 0.05,
+    "navigate": 0.1,
+    "settle": 0.2,
+    "screenshot": 0.35,
+    "extract": 0.45,
+    "fallback": 0.45,
+    "generate": 0.55
+}
+
+async def run_clone_job(job: Job) -> Dict[str, Any]:
+    """Worker body for a queued clone: scrape, then generate"""
+    url = job.payload["url"]
+
+    def on_progress(phase: str, message: str):
+        job.update(phase, message, CLONE_PHASE_PROGRESS.get(phase))
+
+    print("🎯 Super Cloning (job):", url)
+    data = await collect_clone_data(
+        url, on_progress, job.payload["force_refresh"], job.payload["resource_policy"], job.payload["include"]
+    )
+    on_progress("generate", "Generating clone with AI...")
+    html_content = await HTMLGenerator().create_html(data)
+    print("✅ Super clone (job) completed successfully")
+    return CloneResponse(success=True, generated_html=html_content, original_url=url).model_dump()
+
+# Background clone jobs (workers started in the startup hook)
+job_manager = JobManager.from_env(run_clone_job)
+
+# ASYNC JOB ENDPOINTS
+@app.post("/jobs/clone", status_code=202)
+async def submit_clone_job(request: CloneRequest):
+    """Queue a clone and return immediately; identical in-flight URLs share one job"""
+    url = normalize_request_url(str(request.url))
+    include = sorted(set(request.include)) if request.include is not None else None
+    key = f"{normalize_url(url)}|refresh={request.force_refresh}|policy={request.resource_policy}|include={include}"
+    payload = {
+        "url": url,
+        "force_refresh": request.force_refresh,
+        "resource_policy": request.resource_policy,
+        "include": include
+    }
+    try:
+        job, deduplicated = job_manager.submit(key, payload)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {
+        **job.to_dict(),
+        "deduplicated": deduplicated,
+        "status_url": f"/jobs/{job.id}",
+        "result_url": f"/jobs/{job.id}/result"
+    }
+
+@app.get("/jobs/{job_id}")
+async def get_clone_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job.to_dict()
+
+@app.get("/jobs/{job_id}/result")
+async def get_clone_job_result(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    if not job.done:
+        # Not ready yet: same shape as the status endpoint, but 202 so clients keep polling
+        return Response(content=json.dumps(job.to_dict()), status_code=202, media_type="application/json")
+    if job.status == "failed":
+        url = job.payload["url"]
+        return CloneResponse(
+            success=False,
+            generated_html=build_error_html(job.error, url),
+            original_url=url,
+            error_message=job.error
+        )
+    return job.result
+
+# MULTI-PAGE CRAWL
+@app.post("/crawl")
+async def crawl_site(request: CrawlRequest):
+    """Scrape a small site page by page, streaming each page's data over SSE.
+
+    Same-origin links in the extracted navigation are followed breadth-first
+    by a bounded pool of tabs in one browser context (see SiteCrawler).
+    Events: "page" and "skipped" per URL, then "done" with the summary.
+    """
+    if not PLAYWRIGHT_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Playwright not available")
+    url = normalize_request_url(str(request.url))
+    fields = resolve_fields(request.include) | {"navigation"}
+    policy = ResourcePolicy.from_env(request.resource_policy)
+    crawler = SiteCrawler.from_env(
+        lambda page, page_url: scrape_page(page, page_url, fields=fields),
+        max_pages=request.max_pages,
+        max_depth=request.max_depth,
+        respect_robots=request.respect_robots
+    )
+
+    async def event_stream():
+        print(f"🕸️ Crawling {url} (up to {crawler.max_pages} pages, depth {crawler.max_depth})")
+        try:
+            async with browser_pool.context(
+                viewport=SCRAPE_VIEWPORT,
+                user_agent=SCRAPE_USER_AGENT,
+                ignore_https_errors=True,
+                **policy.context_options()
+            ) as context:
+                block_log = await policy.apply(context)
+                async for event in crawler.crawl(context, url):
+                    name = event.pop("event")
+                    if name == "page":
+                        CRAWL_PAGES.inc(outcome="failed" if "error" in event else "scraped")
+                    elif name == "skipped":
+                        CRAWL_PAGES.inc(outcome="skipped")
+                    else:
+                        event["resource_blocking"] = block_log.to_dict()
+                        print(f"✅ Crawl finished: {event['pages_scraped']} pages, {event['assets']['shared']} shared assets")
+                    yield sse_event(name, event)
+        except Exception as e:
+            print("❌ Crawl failed:", str(e))
+            yield sse_event("error", {"success": False, "error_message": str(e)})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # NEW IMAGE EXTRACTION ENDPOINT
 @app.post("/extract-images")
 async def extract_images(request: ImageExtractRequest):
@@ -813,8 +1039,10 @@ async def extract_images(request: ImageExtractRequest):
         if not url.startswith(('http://', 'https://')):
             url = 'https://' + url
         
-        # Use super Playwright extraction
-        data = await scrape_with_super_playwright(url)
+        # Use super Playwright extraction (served from cache when fresh), computing only
+        # the images and screenshot unless the caller narrowed or widened that
+        fields = request.include if request.include is not None else IMAGE_FIELDS
+        data = await scrape_cached(url, request.force_refresh, resource_policy=request.resource_policy, fields=fields)
         
         if "error" in data:
             raise Exception(data["error"])
@@ -843,12 +1071,22 @@ async def extract_images(request: ImageExtractRequest):
         
         print(f"✅ Extracted {len(filtered_images)} images from {total_found} total found")
         
+        # Screenshot bytes only travel inline when explicitly requested
+        screenshot_info = data.get('screenshot_info') or {}
+        screenshot_base64 = None
+        if request.inline_screenshot and screenshot_info.get('artifact_id'):
+            artifact = await artifact_store.get(screenshot_info['artifact_id'])
+            if artifact:
+                screenshot_base64 = base64.b64encode(artifact.data).decode()
+        
         return ImageExtractResponse(
             success=True,
             url=url,
             total_images=len(filtered_images),
             images=filtered_images,
-            screenshot_base64=data.get('screenshot')
+            screenshot_url=data.get('screenshot'),
+            screenshot_base64=screenshot_base64,
+            screenshot_info=screenshot_info
         )
         
     except Exception as e:
@@ -863,12 +1101,100 @@ async def extract_images(request: ImageExtractRequest):
             error_message=error_msg
         )
 
+# Artifacts hold scraped bytes; never let a browser sniff or run them as a document
+ARTIFACT_SECURITY_HEADERS = {
+    "X-Content-Type-Options": "nosniff",
+    "Content-Security-Policy": "default-src 'none'; sandbox"
+}
+
+# SCRAPE ARTIFACTS (screenshots, inline images) by content hash
+@app.get("/artifacts/{artifact_id}")
+async def get_artifact(artifact_id: str, request: Request):
+    artifact = await artifact_store.get(artifact_id)
+    if artifact is None:
+        raise HTTPException(status_code=404, detail="Artifact not found or expired", headers=ARTIFACT_SECURITY_HEADERS)
+    
+    headers = {
+        **ARTIFACT_SECURITY_HEADERS,
+        "ETag": artifact.etag,
+        "Accept-Ranges": "bytes",
+        # Content-addressed: the bytes behind an id never change
+        "Cache-Control": "public, max-age=31536000, immutable"
+    }
+    if request.headers.get("if-none-match") == artifact.etag:
+        return Response(status_code=304, headers=headers)
+    
+    # Blobs stored before types were checked may not be images; serve those as opaque bytes
+    media_type = artifact.content_type if is_servable_image(artifact.content_type) else "application/octet-stream"
+    total = len(artifact.data)
+    range_header = request.headers.get("range")
+    # Multiple ranges would need a multipart/byteranges body; a server may ignore Range and send it all
+    if range_header and "," not in range_header:
+        match = re.fullmatch(r"bytes=(\d*)-(\d*)", range_header.strip())
+        if not match or match.groups() == ('', ''):
+            raise HTTPException(status_code=416, detail="Invalid range", headers={**ARTIFACT_SECURITY_HEADERS, "Content-Range": f"bytes */{total}"})
+        start_text, end_text = match.groups()
+        if start_text:
+            start = int(start_text)
+            end = min(int(end_text), total - 1) if end_text else total - 1
+        else:
+            # Suffix range: the last N bytes
+            start = max(total - int(end_text), 0)
+            end = total - 1
+        if start > end or start >= total:
+            raise HTTPException(status_code=416, detail="Range not satisfiable", headers={**ARTIFACT_SECURITY_HEADERS, "Content-Range": f"bytes */{total}"})
+        headers["Content-Range"] = f"bytes {start}-{end}/{total}"
+        return Response(
+            content=artifact.data[start:end + 1],
+            status_code=206,
+            media_type=media_type,
+            headers=headers
+        )
+    
+    return Response(content=artifact.data, media_type=media_type, headers=headers)
+
+# Gauges and cache counters are read from the owning objects when /metrics is scraped
+if browser_pool:
+    REGISTRY.gauge("cloner_browser_active_contexts", "Browser contexts currently checked out",
+                   fn=lambda: browser_pool.stats()["active_contexts"])
+    REGISTRY.gauge("cloner_browsers", "Running pooled Chromium processes (including retiring ones)",
+                   fn=lambda: browser_pool.stats()["browsers"])
+REGISTRY.gauge("cloner_job_queue_depth", "Clone jobs waiting for a worker", fn=lambda: job_manager.queue_depth)
+REGISTRY.gauge("cloner_jobs_in_flight", "Clone jobs queued or running", fn=lambda: job_manager.stats()["in_flight"])
+REGISTRY.gauge("cloner_scrapes_in_flight", "Distinct scrapes currently running", fn=scrape_flights.in_flight)
+REGISTRY.counter("cloner_scrapes_shared_total", "Scrape calls served by joining an in-flight scrape",
+                 fn=lambda: scrape_flights.shared)
+REGISTRY.counter("cloner_generation_cache_hits_total", "Generated HTML cache hits", fn=lambda: generation_cache.hits)
+REGISTRY.counter("cloner_generation_cache_misses_total", "Generated HTML cache misses", fn=lambda: generation_cache.misses)
+
+loop_lag_monitor = EventLoopLagMonitor()
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus text exposition of all in-process metrics"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.on_event("startup")
 async def startup():
     print("🚀 Starting Enhanced Website Cloner with Super Image Extraction...")
+    if browser_pool:
+        try:
+            await browser_pool.start()
+        except Exception as e:
+            print("❌ Browser pool start failed:", str(e))
+    loop_lag_monitor.start()
+    await job_manager.start()
     if MCP_AVAILABLE:
         await initialize_mcp()
     print("✅ Ready to clone websites with comprehensive image detection!")
 
+@app.on_event("shutdown")
+async def shutdown():
+    await job_manager.stop()
+    await loop_lag_monitor.stop()
+    if browser_pool:
+        await browser_pool.stop()
+    await close_llm_client()
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,20 @@
+import os
+
+# The prompt is built locally; never reach for the real API
+os.environ.setdefault("LLM_BACKEND", "stub")
+
+from app.llm_backends import estimate_tokens
+from app.llm_cloner import PROMPT_CACHE_MIN_TOKENS, LLMWebsiteCloner
+
+
+def cached_prefix(system):
+    """Text of the system blocks up to and including the last cache breakpoint"""
+    last = max(i for i, block in enumerate(system) if "cache_control" in block)
+    return "".join(block["text"] for block in system[:last + 1])
+
+
+def test_system_prefix_is_long_enough_to_cache():
+    for model in ("claude-3.5", "claude-4"):
+        cloner = LLMWebsiteCloner(model=model)
+        prefix = cached_prefix(cloner._create_system_prompt())
+        assert estimate_tokens(prefix) >= PROMPT_CACHE_MIN_TOKENS[cloner.model_name], model
@@ -2,6 +2,9 @@
 
 import { useState } from 'react';
 
+// Streamed tokens are applied to the preview at most this often; each update re-renders the iframe
+const PREVIEW_INTERVAL_MS = 150;
+
 interface CloneResponse {
   success: boolean;
   generated_html: string;
@@ -24,26 +27,14 @@ export default function Home() {
     setResult(null);
     setProgress('Initializing...');
 
-    try {
-      // Simulate progress updates
-      const progressSteps = [
-        'Connecting to website...',
-        'Capturing screenshots...',
-        'Analyzing page structure...',
-        'Extracting design elements...',
-        'Generating clone with AI...',
-        'Finalizing HTML...'
-      ];
-
-      let stepIndex = 0;
-      const progressInterval = setInterval(() => {
-        if (stepIndex < progressSteps.length) {
-          setProgress(progressSteps[stepIndex]);
-          stepIndex++;
-        }
-      }, 2000);
+    let previewTimer: ReturnType<typeof setTimeout> | null = null;
+    const cancelPreview = () => {
+      if (previewTimer !== null) clearTimeout(previewTimer);
+      previewTimer = null;
+    };
 
-      const response = await fetch('http://localhost:8000/clone', {
+    try {
+      const response = await fetch('http://localhost:8000/clone/stream', {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -51,19 +42,70 @@ export default function Home() {
         body: JSON.stringify({ url }),
       });
 
-      clearInterval(progressInterval);
-
-      if (!response.ok) {
+      if (!response.ok || !response.body) {
         throw new Error(`HTTP error! status: ${response.status}`);
       }
 
-      const data: CloneResponse = await response.json();
-      setResult(data);
-      setProgress('Complete!');
+      // Parse server-sent events and render the preview as tokens arrive
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let partialHtml = '';
+
+      const showPreview = () => {
+        previewTimer = null;
+        // Hide the markdown fence Claude sometimes opens with until the final cleaned document arrives
+        const previewHtml = partialHtml.replace(/^\s*```html\s*/, '');
+        setResult({ success: true, generated_html: previewHtml, original_url: url });
+      };
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let boundary = buffer.indexOf('\n\n');
+        while (boundary !== -1) {
+          const rawEvent = buffer.slice(0, boundary);
+          buffer = buffer.slice(boundary + 2);
+          boundary = buffer.indexOf('\n\n');
+
+          let eventName = 'message';
+          let eventData = '';
+          for (const line of rawEvent.split('\n')) {
+            if (line.startsWith('event: ')) eventName = line.slice(7);
+            else if (line.startsWith('data: ')) eventData += line.slice(6);
+          }
+          if (!eventData) continue;
+          const payload = JSON.parse(eventData);
+
+          if (eventName === 'progress') {
+            setProgress(payload.message);
+          } else if (eventName === 'token') {
+            partialHtml += payload.text;
+            if (previewTimer === null) previewTimer = setTimeout(showPreview, PREVIEW_INTERVAL_MS);
+          } else if (eventName === 'done') {
+            cancelPreview();
+            setResult(payload as CloneResponse);
+            setProgress('Complete!');
+          } else if (eventName === 'error') {
+            cancelPreview();
+            setResult(null);
+            throw new Error(payload.error_message || 'Clone failed');
+          }
+        }
+      }
+
+      // The stream ended without a final document: show everything that arrived
+      if (previewTimer !== null) {
+        cancelPreview();
+        showPreview();
+      }
     } catch (err) {
       setError(err instanceof Error ? err.message : 'An error occurred');
       setProgress('');
     } finally {
+      cancelPreview();
       setLoading(false);
     }
   };
@@ -150,7 +192,7 @@ export default function Home() {
             <div className="flex items-center justify-between mb-8">
               <h2 className="text-3xl font-bold text-white">Clone Results</h2>
               <div className="bg-green-500/20 text-green-100 px-4 py-2 rounded-full text-sm font-medium border border-green-500/20">
-                ✅ Successfully Cloned
+                {loading ? '⏳ Streaming Clone...' : '✅ Successfully Cloned'}
               </div>
             </div>
             